@@ -0,0 +1,135 @@
+"""
+A Bayesian optimization engine, for runs where every print is dear.
+
+A Gaussian process (see Surrogate) is fitted to every genome printed so
+far, and each generation is a batch of new genomes picked by expected
+improvement over the fittest fitness yet.  The candidates are random
+genomes, along with genomes near the fittest ones.  A batch is picked one
+genome at a time: once a genome is picked, the process is refitted as if
+it had been printed with its predicted fitness, so its neighbours look less
+uncertain and the rest of the batch is spread out.  The batch is as large
+as the number of models the fitness calculator prints at once.
+"""
+
+from __future__ import unicode_literals, print_function, division
+
+import math
+
+import numpy
+
+import EvolveProfile
+
+_erf = numpy.vectorize(math.erf)
+
+def expected_improvement(mean, std, best, margin=0.):
+    """
+    @param numpy.ndarray mean: Predicted fitnesses
+    @param numpy.ndarray std: Standard deviations of the predictions
+    @param float best: Fittest fitness so far
+    @param float margin: Improvement that does not count, to favour exploration
+    @return numpy.ndarray: The expected improvement over best of each prediction
+    """
+    gain = mean - best - margin
+    safe = numpy.where(std > 0, std, 1.)
+    z = gain / safe
+    cdf = .5 * (1 + _erf(z / math.sqrt(2)))
+    pdf = numpy.exp(-.5 * z ** 2) / math.sqrt(2 * math.pi)
+    return numpy.where(std > 0, gain * cdf + std * pdf, numpy.maximum(gain, 0))
+
+class BayesianOptimizer(EvolveProfile.GeneticAlgorithm):
+
+    def __init__(self, profilemap, population_size=None, ingenomes=[], seed=None, rng=None,
+                 fitness_calculator=None, candidates=1000, exploration=.01):
+        """
+        @param dict profilemap: Map of the profile the genotypes use
+        @param int population_size: Number of genotypes printed a generation.  The number
+            of models of the fitness calculator if not given, or 1 if it has none.
+        @param list ingenomes: Genotypes to start the population with
+        @param int seed: Seed of the run, used when no rng is given
+        @param RandomStream rng: Stream every random draw of the run comes from
+        @param fitness_calculator: Evaluates genotypes, e.g. a PhysicalFitnessCalculator
+        @param int candidates: Number of genomes to pick each batch from, half of them
+            random and half near the fittest genomes
+        @param float exploration: Improvement, in standard deviations of the fitnesses so
+            far, a genome must promise before it counts
+        """
+        if population_size is None:
+            population_size = len(getattr(fitness_calculator, 'model_paths', None) or [None])
+        super(BayesianOptimizer, self).__init__(
+            profilemap, population_size, ingenomes, seed, rng, fitness_calculator,
+        )
+        # Only used to build candidates and move genomes to the unit cube
+        self.space = EvolveProfile.Population(self.schema, rng=self.rng)
+        self.model = EvolveProfile.Surrogate(self.schema, min_examples=2)
+        self.candidates = candidates
+        self.exploration = exploration
+        # Spread of the candidates near the fittest genomes, in the unit cube
+        self.local_scale = .05
+        self.local_parents = 5
+
+    def offspring_count(self):
+        return self.population_size
+
+    def update_hall_of_fame(self, genotypes=None):
+        """
+        Hands scored genotypes to the hall of fame, and to the model
+        """
+        super(BayesianOptimizer, self).update_hall_of_fame(genotypes)
+        self.model.update(self.population if genotypes is None else genotypes)
+
+    def cull_population(self):
+        """
+        Every printed genome lives on in the model, so the population is
+        emptied for the next batch
+        """
+        self.update_hall_of_fame()
+        self.population = []
+
+    def breed(self, count):
+        """
+        Picks count genomes by expected improvement.  Until the model has
+        enough examples the genomes are random.
+
+        @param int count: Number of genomes to pick
+        @return list: The genomes
+        """
+        if not self.model.ready():
+            return self.space.randomize(count).to_genotypes(self.profilemap)
+        pool = self._candidates()
+        features = pool.features()
+        examples = self.space.from_genotypes(self.model.examples).features()
+        fitnesses = numpy.array([g.fitness for g in self.model.examples], dtype=float)
+        best = fitnesses.max()
+        margin = self.exploration * fitnesses.std()
+        process = EvolveProfile.GaussianProcess()
+        picked = []
+        for i in range(min(count, len(features))):
+            process.fit(examples, fitnesses)
+            mean, std = process.predict(features)
+            improvement = expected_improvement(mean, std, best, margin)
+            improvement[picked] = -numpy.inf
+            index = int(improvement.argmax())
+            picked.append(index)
+            # Believe the prediction until the genome is printed
+            examples = numpy.vstack([examples, features[index]])
+            fitnesses = numpy.append(fitnesses, mean[index])
+        return EvolveProfile.Population(
+            self.schema, pool.genes[picked], self.rng,
+        ).to_genotypes(self.profilemap)
+
+    def _candidates(self):
+        """
+        @return Population: Random genomes, and genomes near the fittest ones
+        """
+        local = self.candidates // 2
+        randoms = self.space.randomize(self.candidates - local)
+        parents = EvolveProfile.RankedPopulation(self.model.examples).top(self.local_parents)
+        encoded = self.space.from_genotypes(parents)
+        rows = numpy.arange(local) % len(parents)
+        unit = encoded.unit()[rows]
+        unit = unit + self.local_scale * self.rng.numpy.standard_normal(unit.shape)
+        nearby = self.space.from_unit(unit, encoded.genes[rows][:, ~self.space.ranged])
+        nearby = nearby.mutate(self.mutation_rate)
+        return EvolveProfile.Population(
+            self.schema, numpy.vstack([randoms.genes, nearby.genes]), self.rng,
+        )
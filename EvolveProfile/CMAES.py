@@ -0,0 +1,162 @@
+"""
+A CMA-ES engine for the range parameters of a profile.
+
+The range ('r') genes are scaled to the unit cube and sampled from a
+multivariate normal distribution whose mean, step size and covariance are
+adapted each generation from the fittest children, so correlated settings
+(e.g. feedrate and layer height) are searched along the directions that
+pay off.  Int ranges are rounded when a genome is built, and their spread
+is kept from collapsing below one step.  List ('l') genes are sampled from
+one categorical distribution each, which is moved towards the options of
+the fittest children with the same weights.
+"""
+
+from __future__ import unicode_literals, print_function, division
+
+import math
+
+import numpy
+
+import EvolveProfile
+
+class CMAES(EvolveProfile.GeneticAlgorithm):
+
+    def __init__(self, profilemap, population_size=None, ingenomes=[], seed=None, rng=None,
+                 fitness_calculator=None, sigma=.3):
+        """
+        @param dict profilemap: Map of the profile the genotypes use
+        @param int population_size: Number of genotypes in each generation.  The usual
+            4 + 3 ln(n) for n range genes if not given.
+        @param list ingenomes: Genotypes to start the population with
+        @param int seed: Seed of the run, used when no rng is given
+        @param RandomStream rng: Stream every random draw of the run comes from
+        @param fitness_calculator: Evaluates genotypes, e.g. a PhysicalFitnessCalculator
+        @param float sigma: Starting step size, as a fraction of each range
+        """
+        if population_size is None:
+            schema = EvolveProfile.ProfileSchema(profilemap)
+            dimension = len([spec for spec in schema.specs if spec[0] == 'r'])
+            population_size = 4 + int(3 * math.log(max(dimension, 1)))
+        super(CMAES, self).__init__(
+            profilemap, population_size, ingenomes, seed, rng, fitness_calculator,
+        )
+        # Only used to move genomes to and from the unit cube
+        self.space = EvolveProfile.Population(self.schema, rng=self.rng)
+        self.dimension = dimension = int(self.space.ranged.sum())
+        self.mu = max(population_size // 2, 1)
+        weights = numpy.log(self.mu + .5) - numpy.log(numpy.arange(1, self.mu + 1))
+        self.weights = weights / weights.sum()
+        self.mueff = 1 / (self.weights ** 2).sum()
+        n = max(dimension, 1)
+        self.cc = (4 + self.mueff / n) / (n + 4 + 2 * self.mueff / n)
+        self.cs = (self.mueff + 2) / (n + self.mueff + 5)
+        self.c1 = 2 / ((n + 1.3) ** 2 + self.mueff)
+        self.cmu = min(1 - self.c1, 2 * (self.mueff - 2 + 1 / self.mueff) / ((n + 2) ** 2 + self.mueff))
+        self.damps = 1 + 2 * max(0, math.sqrt((self.mueff - 1) / (n + 1)) - 1) + self.cs
+        self.chi = math.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n ** 2))
+        self.sigma = sigma
+        self.mean = numpy.full(dimension, .5)
+        self.covariance = numpy.eye(dimension)
+        self.path_c = numpy.zeros(dimension)
+        self.path_sigma = numpy.zeros(dimension)
+        self._decompose()
+        # Smallest spread of each int range, so it can still move a step
+        discrete = self.space.discrete[self.space.ranged]
+        self.min_std = numpy.where(discrete, .5 / self.space.span[self.space.ranged], 0)
+        self.categories = [
+            numpy.full(len(options), 1 / len(options))
+            for options in self.space.options if options is not None
+        ]
+        self.category_rate = .5
+        self.updates = 0
+
+    def _decompose(self):
+        self.covariance = numpy.triu(self.covariance) + numpy.triu(self.covariance, 1).T
+        eigenvalues, self.basis = numpy.linalg.eigh(self.covariance)
+        self.scales = numpy.sqrt(numpy.maximum(eigenvalues, 1e-20))
+        self.inverse_root = self.basis.dot(numpy.diag(1 / self.scales)).dot(self.basis.T)
+
+    def offspring_count(self):
+        return self.population_size - min(self.elitism, len(self.hall_of_fame))
+
+    def breed(self, count):
+        """
+        Samples count children from the current distribution
+
+        @param int count: Number of children to sample
+        @return list: The children
+        """
+        normal = self.rng.numpy.standard_normal((count, self.dimension))
+        unit = self.mean + self.sigma * (normal * self.scales).dot(self.basis.T)
+        categories = numpy.empty((count, len(self.categories)))
+        for column, probabilities in enumerate(self.categories):
+            cumulative = numpy.cumsum(probabilities)
+            draws = self.rng.random_sample(count) * cumulative[-1]
+            categories[:, column] = numpy.searchsorted(cumulative, draws, side='right')
+        return self.space.from_unit(unit, categories).to_genotypes(self.profilemap)
+
+    def cull_population(self):
+        """
+        Adapts the distribution to the fittest members of the population.
+        Children are sampled anew each generation, so only the elitism
+        fittest genotypes of the hall of fame are kept.
+        """
+        self.update_hall_of_fame()
+        ranked = EvolveProfile.RankedPopulation(
+            genotype for genotype in self.population if genotype.fitness is not None
+        )
+        if len(ranked):
+            self.update_distribution(ranked.top(self.mu))
+        self.population = self.hall_of_fame.top(self.elitism)
+
+    def update_distribution(self, parents):
+        """
+        One CMA-ES update of the mean, the evolution paths, the covariance
+        and the step size, and a move of the categorical distributions.
+
+        @param list parents: The fittest genotypes, fittest first
+        """
+        weights = self.weights[:len(parents)] / self.weights[:len(parents)].sum()
+        encoded = self.space.from_genotypes(parents)
+        self.updates += 1
+        if self.dimension:
+            unit = encoded.unit()
+            old_mean = self.mean
+            self.mean = weights.dot(unit)
+            step = (self.mean - old_mean) / self.sigma
+            self.path_sigma = (1 - self.cs) * self.path_sigma + math.sqrt(
+                self.cs * (2 - self.cs) * self.mueff
+            ) * self.inverse_root.dot(step)
+            norm = numpy.linalg.norm(self.path_sigma)
+            # Stall the covariance path while the step size path is long
+            length = norm / math.sqrt(1 - (1 - self.cs) ** (2 * self.updates)) / self.chi
+            hsig = length < 1.4 + 2 / (self.dimension + 1)
+            self.path_c = (1 - self.cc) * self.path_c + hsig * math.sqrt(
+                self.cc * (2 - self.cc) * self.mueff
+            ) * step
+            steps = (unit - old_mean) / self.sigma
+            self.covariance = (
+                (1 - self.c1 - self.cmu) * self.covariance
+                + self.c1 * (
+                    numpy.outer(self.path_c, self.path_c)
+                    + (1 - hsig) * self.cc * (2 - self.cc) * self.covariance
+                )
+                + self.cmu * (steps.T * weights).dot(steps)
+            )
+            # At most an e-fold increase a generation, so children far from the
+            # distribution (e.g. the uniform first generation) can not blow it up
+            self.sigma *= math.exp(min(1, self.cs / self.damps * (norm / self.chi - 1)))
+            # Keep int ranges able to move at least a step
+            floor = (self.min_std / self.sigma) ** 2
+            diagonal = numpy.diag(self.covariance)
+            self.covariance[numpy.diag_indices(self.dimension)] = numpy.maximum(diagonal, floor)
+            self._decompose()
+        chosen = encoded.genes[:, ~self.space.ranged].astype(int)
+        for column, probabilities in enumerate(self.categories):
+            frequencies = numpy.bincount(
+                chosen[:, column], weights=weights, minlength=len(probabilities),
+            )
+            probabilities = (1 - self.category_rate) * probabilities + self.category_rate * frequencies
+            # Never rule an option out altogether
+            probabilities = numpy.maximum(probabilities, .05 / len(probabilities))
+            self.categories[column] = probabilities / probabilities.sum()
@@ -0,0 +1,160 @@
+"""
+A differential evolution engine (DE/rand/1/bin).
+
+Half of each generation are targets and half are trials: every target gets
+one trial, built by adding the scaled difference of two random targets to
+a third and crossing the result over with the target, and after
+evaluation the fitter of each pair becomes the target of the next
+generation.  Range ('r') genes are moved in the unit cube, with int ranges
+rounded when a genome is built.  List ('l') genes have no differences, so
+a trial takes the option of the base target, switched to a random option
+with probability differential_weight where the two difference targets
+disagree.
+"""
+
+from __future__ import unicode_literals, print_function, division
+
+import numpy
+
+import EvolveProfile
+
+class DifferentialEvolution(EvolveProfile.GeneticAlgorithm):
+
+    def __init__(self, profilemap, population_size, ingenomes=[], seed=None, rng=None,
+                 fitness_calculator=None, differential_weight=.5, crossover_probability=.9):
+        """
+        @param dict profilemap: Map of the profile the genotypes use
+        @param int population_size: Number of genotypes in each generation, targets and
+            trials together.  At least 8, so every trial has three other targets to be
+            built from.
+        @param list ingenomes: Genotypes to start the population with
+        @param int seed: Seed of the run, used when no rng is given
+        @param RandomStream rng: Stream every random draw of the run comes from
+        @param fitness_calculator: Evaluates genotypes, e.g. a PhysicalFitnessCalculator
+        @param float differential_weight: Scale of the difference added to the base target
+        @param float crossover_probability: Probability of a trial gene coming from the
+            mutant rather than the target
+        """
+        if population_size < 8:
+            raise ValueError(
+                'DifferentialEvolution needs a population of at least 8, got %d' % population_size
+            )
+        super(DifferentialEvolution, self).__init__(
+            profilemap, population_size, ingenomes, seed, rng, fitness_calculator,
+        )
+        # Only used to move genomes to and from the unit cube
+        self.space = EvolveProfile.Population(self.schema, rng=self.rng)
+        self.differential_weight = differential_weight
+        self.crossover_probability = crossover_probability
+        # Number of targets at the front of the population, each paired
+        # with the trial at the same offset behind them
+        self._targets = None
+
+    def generate_population(self):
+        """
+        Builds a trial for every target.  With a surrogate, screening_factor
+        trials are built for each target and the surrogate picks which of
+        them is printed.  Trials which copy a member or a genome evaluated
+        before are rebuilt, up to duplicate_redraws times; rebuilt trials
+        are not screened.
+        """
+        targets = self.population
+        encoded = self.space.from_genotypes(targets)
+        unit = encoded.unit()
+        categories = encoded.genes[:, ~self.space.ranged]
+        known = set(genotype.fingerprint for genotype in targets)
+        screening = False
+        if self.surrogate is not None:
+            self.surrogate.update(targets)
+            screening = self.surrogate.ready()
+        if screening:
+            trials = self._screen_trials(unit, categories, known)
+        else:
+            trials = self._trials(unit, categories, numpy.arange(len(targets)))
+        redraws = 0
+        while True:
+            repeats = []
+            for index, trial in enumerate(trials):
+                if self.is_duplicate(trial, known):
+                    repeats.append(index)
+                else:
+                    known.add(trial.fingerprint)
+            if not repeats or redraws >= self.duplicate_redraws:
+                break
+            redraws += len(repeats)
+            for index, trial in zip(repeats, self._trials(unit, categories, numpy.array(repeats))):
+                trials[index] = trial
+        self.population = targets + trials
+        self._targets = len(targets)
+        self.generation += 1
+
+    def _screen_trials(self, unit, categories, known):
+        """
+        @param numpy.ndarray unit: Range genes of the targets, in the unit cube
+        @param numpy.ndarray categories: List genes of the targets, as option indices
+        @param set known: Fingerprints of the members of the population
+        @return list: For each target, the one of screening_factor trials the
+            surrogate scores highest, skipping duplicates while there are others
+        """
+        known = set(known)
+        indices = numpy.arange(len(unit))
+        candidates = [self._trials(unit, categories, indices) for i in range(self.screening_factor)]
+        flat = [trial for trials in candidates for trial in trials]
+        scores = self.surrogate.score(flat).reshape((len(candidates), len(unit)))
+        trials = []
+        for index, order in enumerate(numpy.argsort(-scores, axis=0, kind='mergesort').T):
+            choices = [candidates[row][index] for row in order]
+            fresh = [trial for trial in choices if not self.is_duplicate(trial, known)]
+            trial = (fresh or choices)[0]
+            known.add(trial.fingerprint)
+            trials.append(trial)
+        return trials
+
+    def _trials(self, unit, categories, indices):
+        """
+        @param numpy.ndarray unit: Range genes of the targets, in the unit cube
+        @param numpy.ndarray categories: List genes of the targets, as option indices
+        @param numpy.ndarray indices: Targets to build trials for
+        @return list: A trial genotype for each of the targets
+        """
+        count = len(unit)
+        # Three distinct targets other than the one the trial is for
+        draws = numpy.argsort(self.rng.random_sample((len(indices), count - 1)), axis=1)[:, :3]
+        base, first, second = (draws + (draws >= indices[:, None])).T
+        mutant = unit[base] + self.differential_weight * (unit[first] - unit[second])
+        cross = self.rng.random_sample(mutant.shape) < self.crossover_probability
+        if unit.shape[1]:
+            # Every trial takes at least one range gene from the mutant
+            forced = (self.rng.random_sample(len(indices)) * unit.shape[1]).astype(int)
+            cross[numpy.arange(len(indices)), forced] = True
+        trial_unit = numpy.where(cross, mutant, unit[indices])
+        options = numpy.array([len(o) for o in self.space.options if o is not None], dtype=float)
+        switch = (categories[first] != categories[second]) & (
+            self.rng.random_sample((len(indices), len(options))) < self.differential_weight
+        )
+        random_options = numpy.floor(self.rng.random_sample(switch.shape) * options)
+        mutant_categories = numpy.where(switch, random_options, categories[base])
+        cross = self.rng.random_sample(switch.shape) < self.crossover_probability
+        trial_categories = numpy.where(cross, mutant_categories, categories[indices])
+        return self.space.from_unit(trial_unit, trial_categories).to_genotypes(self.profilemap)
+
+    def cull_population(self):
+        """
+        Keeps the fitter of each target and its trial.  Before the first
+        trials, the fittest half of the population become the targets.
+        """
+        if self._targets is None:
+            return super(DifferentialEvolution, self).cull_population()
+        self.update_hall_of_fame()
+        count = self._targets
+        survivors = []
+        for target, trial in zip(self.population[:count], self.population[count:2 * count]):
+            beaten = trial.fitness is not None and (
+                target.fitness is None or trial.fitness >= target.fitness
+            )
+            survivors.append(trial if beaten else target)
+        self.population = survivors
+        self._targets = None
+
+    def offspring_count(self):
+        return self.population_size // 2 if self._targets is None else self._targets
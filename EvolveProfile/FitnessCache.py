@@ -0,0 +1,96 @@
+"""
+A fitness cache on disk, shared between runs.
+
+Fitnesses are kept in an SQLite database keyed by the genome fingerprint,
+a fingerprint of the models printed and the printer they were printed on,
+so a campaign on the same printer and models never prints a genome that
+an earlier campaign already printed.  The fidelity of a Fitness is kept
+with it.
+"""
+
+from __future__ import unicode_literals, print_function
+
+import json
+import sqlite3
+
+import EvolveProfile
+
+# Stay below the default SQLite limit on variables in a statement
+_CHUNK = 500
+
+class FitnessCache(object):
+
+    def __init__(self, path, models='', printer=''):
+        """
+        @param str path: Path of the database, created if it does not exist
+        @param str models: Fingerprint of the models printed, see
+            PhysicalFitnessCalculator.models_fingerprint
+        @param str printer: Name of the printer
+        """
+        self.path = path
+        self.models = models
+        self.printer = printer
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS fitness ('
+                'genome TEXT NOT NULL, models TEXT NOT NULL, printer TEXT NOT NULL, '
+                'fitness TEXT NOT NULL, PRIMARY KEY (genome, models, printer))'
+            )
+
+    def __len__(self):
+        """
+        @return int: Number of fitnesses cached for these models and this printer
+        """
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM fitness WHERE models = ? AND printer = ?',
+            (self.models, self.printer),
+        ).fetchone()[0]
+
+    def get(self, genotype):
+        """
+        @param Genotype genotype: A genotype
+        @return fitness: Its cached fitness, or None if it was never printed
+        """
+        return self.get_many([genotype])[0]
+
+    def get_many(self, genotypes):
+        """
+        @param list genotypes: Genotypes
+        @return list: The cached fitness of each genotype, None for those never printed
+        """
+        fingerprints = [genotype.fingerprint for genotype in genotypes]
+        found = {}
+        for start in range(0, len(fingerprints), _CHUNK):
+            chunk = fingerprints[start:start + _CHUNK]
+            rows = self.connection.execute(
+                'SELECT genome, fitness FROM fitness WHERE models = ? AND printer = ? '
+                'AND genome IN (%s)' % (', '.join(['?'] * len(chunk))),
+                [self.models, self.printer] + chunk,
+            )
+            for genome, fitness in rows:
+                found[genome] = EvolveProfile.load_fitness(json.loads(fitness))
+        return [found.get(fingerprint) for fingerprint in fingerprints]
+
+    def put(self, genotype):
+        """
+        @param Genotype genotype: A printed genotype, with its fitness set
+        """
+        self.put_many([genotype])
+
+    def put_many(self, genotypes):
+        """
+        Caches the fitness of scored genotypes.  A genome which is cached
+        already keeps its first fitness.
+
+        @param list genotypes: Printed genotypes, with their fitness set
+        """
+        rows = [
+            (genotype.fingerprint, self.models, self.printer, json.dumps(EvolveProfile.dump_fitness(genotype.fitness)))
+            for genotype in genotypes if genotype.fitness is not None
+        ]
+        with self.connection:
+            self.connection.executemany('INSERT OR IGNORE INTO fitness VALUES (?, ?, ?, ?)', rows)
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,43 @@
+"""
+The result of one generation of a run, as yielded by GeneticAlgorithm.evolve
+"""
+
+from __future__ import absolute_import, division
+
+import numbers
+
+import numpy
+
+class Generation(object):
+
+    def __init__(self, number, population, evaluations, elapsed, stop_reason=None):
+        """
+        @param int number: Number of the generation, 0 being the starting population
+        @param list population: The evaluated members of the generation
+        @param int evaluations: Number of genotypes printed so far in the run
+        @param float elapsed: Seconds the generation took, evaluation included
+        @param str stop_reason: Why the run stopped after this generation: 'generations',
+            'budget', 'stagnation' or 'target'.  None if the run goes on.
+        """
+        self.number = number
+        self.population = list(population)
+        self.evaluations = evaluations
+        self.elapsed = elapsed
+        self.stop_reason = stop_reason
+        scored = [g for g in self.population if isinstance(g.fitness, numbers.Real)]
+        # Stats only make sense for single number fitnesses
+        if scored:
+            fitnesses = numpy.array([genotype.fitness for genotype in scored], dtype=float)
+            self.best = scored[int(fitnesses.argmax())]
+            self.best_fitness = fitnesses.max()
+            self.mean_fitness = fitnesses.mean()
+            self.worst_fitness = fitnesses.min()
+            self.std_fitness = fitnesses.std()
+        else:
+            self.best = None
+            self.best_fitness = self.mean_fitness = self.worst_fitness = self.std_fitness = None
+
+    def __repr__(self):
+        return '<Generation %d: best %s, mean %s, %d evaluations>' % (
+            self.number, self.best_fitness, self.mean_fitness, self.evaluations,
+        )
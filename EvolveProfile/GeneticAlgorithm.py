@@ -4,32 +4,146 @@ The main genetic algorithm that breeds, culls and derives fitness
 
 from __future__ import unicode_literals, print_function
 
-import random
+import collections
+import time
+
+import numpy
 
 import EvolveProfile
 
 class GeneticAlgorithm(object):
 
-    def __init__(self, profilemap, population_size, ingenomes=[]):
+    def __init__(self, profilemap, population_size, ingenomes=[], seed=None, rng=None,
+                 fitness_calculator=None):
+        """
+        @param dict profilemap: Map of the profile the genotypes use
+        @param int population_size: Number of genotypes in each generation
+        @param list ingenomes: Genotypes to start the population with
+        @param int seed: Seed of the run, used when no rng is given
+        @param RandomStream rng: Stream every random draw of the run comes from
+        @param fitness_calculator: Evaluates genotypes, e.g. a PhysicalFitnessCalculator
+        """
         self.profilemap = profilemap
+        self.fitness_calculator = fitness_calculator
+        self.rng = rng if rng is not None else EvolveProfile.RandomStream(seed)
+        self.schema = EvolveProfile.ProfileSchema(self.profilemap)
         self.population_size = population_size
-        self.population = ingenomes[:self.population_size]
-        while len(self.population) < self.population_size:
-            self.population.append(EvolveProfile.Genotype(self.profilemap))
+        population = ingenomes[:self.population_size]
+        missing = self.population_size - len(population)
+        if missing > 0:
+            randoms = EvolveProfile.Population(self.schema, rng=self.rng).randomize(missing)
+            population.extend(randoms.to_genotypes(self.profilemap))
+        self.population = population
         self.mutation_rate = .1
+        # Operator used on mutant children, and the probability of mutating
+        # each of their values (None mutates exactly one value)
+        self.mutation_operator = 'reset'
+        self.locus_mutation_rate = None
+        # Children are crossovers and mutants in the ratio crossover_rate to
+        # mutation_rate, see crossover_share
         self.crossover_rate = .5
         self.tournament_size = 3
-        self.uniform = random.uniform
+        self.selection_operator = 'tournament'
+        # The fittest genotypes of the run.  The elitism fittest of them
+        # always survive a cull, and children which copy a member or any
+        # genome evaluated before are redrawn up to duplicate_redraws times
+        # a generation, so a small search space can not stall the run.
+        self.hall_of_fame = EvolveProfile.HallOfFame()
+        self.elitism = 1
+        self.duplicate_redraws = 100
+        # Checkpoints every population and printed batch when set, see resume
+        self.journal = None
+        # Consulted before anything is printed when set
+        self.fitness_cache = None
+        # Every scored genotype is recorded in it when set, see warm_start
+        self.history = None
+        # When set, screening_factor times as many children as are needed
+        # are bred, and the surrogate picks the ones which get printed
+        self.surrogate = None
+        self.screening_factor = 4
+        self.generation = 0
+        # Number of genotypes sent to the fitness calculator so far
+        self.evaluations = 0
+        self.uniform = self.rng.uniform
 
     def generate_population(self):
         """
         Creates new offspring
         """
+        needed = self.population_size - len(self.population)
+        screening = False
+        if self.surrogate is not None:
+            self.surrogate.update(self.population)
+            screening = self.surrogate.ready()
+        bred = needed * self.screening_factor if screening else needed
+        known = set(genotype.fingerprint for genotype in self.population)
         children = []
-        while len(children) < self.population_size - len(self.population):
-            children.extend(self.create_next_child())
-        assert len(children) + len(self.population) == self.population_size
+        redraws = 0
+        while len(children) < bred:
+            for child in self.breed(bred - len(children)):
+                if self.is_duplicate(child, known) and redraws < self.duplicate_redraws:
+                    redraws += 1
+                    continue
+                known.add(child.fingerprint)
+                children.append(child)
+        if screening:
+            children = self.surrogate.screen(children, needed)
         self.population.extend(children)
+        self.generation += 1
+
+    def crossover_share(self):
+        """
+        The share of children made by crossover, the rest being mutants.
+        It is the share create_next_child gives: each call makes a crossover
+        child with probability crossover_rate and a mutant with probability
+        mutation_rate.
+
+        @return float: crossover_rate / (crossover_rate + mutation_rate)
+        """
+        total = self.crossover_rate + self.mutation_rate
+        if total <= 0:
+            raise ValueError('crossover_rate and mutation_rate can not both be 0')
+        return self.crossover_rate / total
+
+    def breed(self, count):
+        """
+        Breeds exactly count children in one pass.  How many are crossovers
+        of two parents and how many are mutants of one is planned up front
+        from crossover_share, rounding up or down at random so the share
+        holds on average.  The parents of all the children are selected at
+        once, and the children are crossed over and mutated as one
+        Population.
+
+        @param int count: Number of children to breed
+        @return list: The children, crossovers first
+        """
+        num_pairs = min(int(count * self.crossover_share() + self.rng.random_sample()), count)
+        parents = EvolveProfile.Population(self.schema, rng=self.rng).from_genotypes(self.population)
+        genes = numpy.empty((count, len(self.schema)))
+        if num_pairs:
+            pairs = self.select_parents(num_pairs)
+            genes[:num_pairs] = parents.uniform_crossover(pairs[:, 0], pairs[:, 1]).genes
+        if count > num_pairs:
+            genes[num_pairs:] = parents.take(self.select_parent(count - num_pairs)).genes
+        mutated = numpy.arange(count) >= num_pairs
+        children = EvolveProfile.Population(self.schema, genes, self.rng)
+        if self.mutation_operator == 'reset':
+            children = children.mutate(self.locus_mutation_rate, mutated)
+            return children.to_genotypes(self.profilemap)
+        # Other operators only exist for one genotype at a time
+        genotypes = children.to_genotypes(self.profilemap)
+        for genotype in genotypes[num_pairs:]:
+            genotype.mutate(self.mutation_operator, self.locus_mutation_rate)
+        return genotypes
+
+    def is_duplicate(self, genotype, known=()):
+        """
+        @param Genotype genotype: A new child
+        @param set known: Fingerprints of the members of the population
+        @return bool: True if the child is a copy of a member, or of a genotype that
+            was evaluated before
+        """
+        return genotype.fingerprint in known or self.hall_of_fame.seen(genotype)
 
     def create_next_child(self):
         """
@@ -53,9 +167,17 @@ class GeneticAlgorithm(object):
             p1: The progenitor.  Used for testing
         """
         p1 = self.get_best(num_candidates)[0]
-        mutant = p1.copy()
-        mutant.mutate()
-        return mutant, p1
+        return self.mutate_child(p1), p1
+
+    def mutate_child(self, parent):
+        """
+        @param Genotype parent: The progenitor
+        @return Genotype: A mutated copy of the parent
+        """
+        mutant = parent.copy()
+        mutant.rng = self.rng
+        mutant.mutate(self.mutation_operator, self.locus_mutation_rate)
+        return mutant
 
     def create_child_with_crossover(self, num_candidates):
         """
@@ -68,9 +190,16 @@ class GeneticAlgorithm(object):
             p1, p2: The progenitors.  Used for testing.
         """
         p1, p2 = self.tournament_selection(num_candidates)
-        new_profile = p1.uniform_crossover(p2)
-        progeny = EvolveProfile.Genotype(self.profilemap, ingenotype=new_profile)
-        return progeny, p1, p2
+        return self.crossover_child(p1, p2), p1, p2
+
+    def crossover_child(self, first, second):
+        """
+        @param Genotype first: The first progenitor
+        @param Genotype second: The second progenitor
+        @return Genotype: A child created by uniform crossover of the progenitors
+        """
+        new_slots = first.crossover_slots(second, self.rng)
+        return EvolveProfile.Genotype(self.profilemap, schema=self.schema, slots=new_slots, rng=self.rng)
 
     def tournament_selection(self, num_candidates):
         """
@@ -82,11 +211,49 @@ class GeneticAlgorithm(object):
             first: First chosen candidate
             second: Second chosen candidate
         """
-        first = self.get_best(num_candidates)[0]
-        second = self.get_best(num_candidates)[0]
-        while first == second:
-            second = self.get_best(num_candidates)[0]
-        return first, second
+        fitness = self.selection_fitness(self.population)
+        first, second = EvolveProfile.select_pairs(
+            'tournament', fitness, 1, self.rng, num_candidates,
+        )[0]
+        return self.population[first], self.population[second]
+
+    def select_parents(self, num_pairs):
+        """
+        Draws the parents for a whole batch of children at once, with
+        self.selection_operator.
+
+        @param int num_pairs: Number of pairs of parents to draw
+        @return numpy.ndarray: A (num_pairs, 2) array of indices into the population,
+            where the two parents of a pair are always different members
+        """
+        fitness = self.selection_fitness(self.population)
+        return EvolveProfile.select_pairs(
+            self.selection_operator, fitness, num_pairs, self.rng, self._selection_size(),
+        )
+
+    def select_parent(self, num_parents):
+        """
+        Draws single parents (e.g. for mutation) at once, with self.selection_operator.
+
+        @param int num_parents: Number of parents to draw
+        @return numpy.ndarray: Indices into the population
+        """
+        fitness = self.selection_fitness(self.population)
+        return EvolveProfile.select(
+            self.selection_operator, fitness, num_parents, self.rng, self._selection_size(),
+        )
+
+    def selection_fitness(self, genotypes):
+        """
+        The scalar fitness parents are selected on, higher being better
+
+        @param list genotypes: Members of the population
+        @return numpy.ndarray: Their fitnesses, with -inf for unscored ones
+        """
+        return EvolveProfile.fitness_array(genotypes)
+
+    def _selection_size(self):
+        return self.tournament_size if self.selection_operator == 'tournament' else None
 
     def get_best(self, num_candidates):
         """
@@ -101,8 +268,8 @@ class GeneticAlgorithm(object):
         if num_candidates == 0:
             return None, self.population
         candidates = self.get_candidates(num_candidates)
-        sorted_candidates = sorted(candidates, cmp=lambda x,y: cmp(x.fitness, y.fitness))
-        return sorted_candidates[-1], candidates
+        best = self.selection_fitness(candidates).argmax()
+        return candidates[best], candidates
 
     def get_candidates(self, num_candidates):
         """
@@ -114,16 +281,189 @@ class GeneticAlgorithm(object):
         """
         if num_candidates >= len(self.population):
             raise EvolveProfile.TournamentSizeError
-        candidates = []
-        new = random.choice(self.population)
-        for i in range(num_candidates):
-            while any(new == chosen for chosen in candidates):
-                new = random.choice(self.population)
-            candidates.append(new)
-        return candidates 
+        return self.rng.sample(self.population, num_candidates)
+
+    def get_top(self, num_genotypes):
+        """
+        Ranks the population afresh, in O(n log n), as fitnesses are set on
+        its members from outside.  SteadyStateGeneticAlgorithm keeps its
+        population ranked instead, as it inserts every member itself.
+
+        @param int num_genotypes: Number of genotypes to get
+        @return list: The fittest genotypes of the population, fittest first
+        """
+        return EvolveProfile.RankedPopulation(self.population).top(num_genotypes)
+
+    def offspring_count(self):
+        """
+        @return int: Number of children the next generation breeds
+        """
+        return self.population_size - self.population_size // 2
 
     def cull_population(self):
-        self.population = self.population[:self.population_size/2]
+        """
+        Keeps the fittest half of the population, along with the elitism
+        fittest genotypes of the hall of fame
+        """
+        self.update_hall_of_fame()
+        survivors = self.get_top(self.population_size // 2)
+        kept = set(genotype.fingerprint for genotype in survivors)
+        elites = [
+            genotype for genotype in self.hall_of_fame.top(self.elitism)
+            if genotype.fingerprint not in kept
+        ]
+        if elites:
+            survivors = elites + survivors[:max(len(survivors) - len(elites), 0)]
+        self.population = survivors
+
+    def update_hall_of_fame(self, genotypes=None):
+        """
+        Hands scored genotypes to the hall of fame
+
+        @param list genotypes: Genotypes to hand over, the population if not given
+        """
+        self.hall_of_fame.update(self.population if genotypes is None else genotypes)
 
     def ascertain_fitness(self):
-        self.fitness_calculator.ascertain_fitness(self.population)
+        """
+        Evaluates the members which have no fitness yet.  Fitnesses in the
+        fitness cache are used as they are, and a genome which is in the
+        population more than once is only printed once.  With a journal the
+        population is checkpointed first, and each batch as soon as it is
+        printed.
+        """
+        if self.journal is not None:
+            self.journal.record_population(self.generation, self.population, self.rng)
+        copies = collections.OrderedDict()
+        for genotype in self.population:
+            if genotype.fitness is None:
+                copies.setdefault(genotype.fingerprint, []).append(genotype)
+        unscored = [group[0] for group in copies.values()]
+        if self.fitness_cache is not None and unscored:
+            cached = self.fitness_cache.get_many(unscored)
+            hits = [genotype for genotype, fitness in zip(unscored, cached) if fitness is not None]
+            self._record_batch(hits, [fitness for fitness in cached if fitness is not None], copies)
+            unscored = [genotype for genotype in unscored if genotype.fitness is None]
+        if unscored:
+            self.evaluations += len(unscored)
+            fitnesses = self.fitness_calculator.ascertain_fitness(
+                unscored,
+                on_batch=lambda genotypes, fitnesses: self._record_batch(genotypes, fitnesses, copies),
+            )
+            # Calculators which do not report batches as they go
+            left = [(g, fitness) for g, fitness in zip(unscored, fitnesses) if g.fitness is None]
+            if left:
+                self._record_batch([g for g, fitness in left], [fitness for g, fitness in left], copies)
+        self.update_hall_of_fame()
+        if self.surrogate is not None:
+            self.surrogate.update(self.population)
+
+    def _record_batch(self, genotypes, fitnesses, copies):
+        """
+        Sets the fitnesses of a batch on every copy of its genomes, and
+        caches and journals them
+        """
+        scored = []
+        for genotype, fitness in zip(genotypes, fitnesses):
+            for copy in copies[genotype.fingerprint]:
+                copy.fitness = fitness
+                scored.append(copy)
+        if self.fitness_cache is not None:
+            self.fitness_cache.put_many(genotypes)
+        if self.history is not None:
+            self.history.record(genotypes)
+        if self.journal is not None:
+            self.journal.record_fitness(scored)
+
+    def resume(self, journal):
+        """
+        Checkpoints the run to a journal, first picking up where the run
+        it holds stopped, if any: the last journaled population comes back
+        with every fitness that was printed, and the random stream with the
+        state it had then.
+
+        @param Journal journal: The journal of the run
+        @return bool: True if a run was resumed
+        """
+        self.journal = journal
+        state = journal.load(self.rng)
+        if state is None:
+            return False
+        self.generation, population, rng_state, evaluated = state
+        self.population = population
+        self.rng.setstate(rng_state)
+        self.evaluations = len(evaluated)
+        self.update_hall_of_fame(evaluated)
+        if self.surrogate is not None:
+            self.surrogate.update(evaluated)
+        return True
+
+    def warm_start(self, history):
+        """
+        Records the run to a profile history, first starting the population
+        over from it: the fittest profiles printed before with the same
+        printer and material, repaired to the profilemap, and genomes which
+        fill the rest of the space evenly.
+
+        @param ProfileHistory history: The history to start from and record to
+        """
+        self.history = history
+        self.population = history.seed(self.profilemap, self.population_size, self.rng)
+
+    def progress(self):
+        """
+        How far the run has got, for evolve: a generation makes progress
+        when this grows.
+
+        @return: The fitness of the fittest genotype so far, None before any is scored
+        """
+        champion = self.hall_of_fame.best()
+        return champion.fitness if champion is not None else None
+
+    def evolve(self, max_generations=None, max_evaluations=None, stagnation=None, target=None):
+        """
+        Runs the algorithm, yielding each generation once it is evaluated:
+        first the starting population, then one per round of culling and
+        breeding.  The run stops after the generation which meets any of
+        the criteria, which is marked with its stop_reason.  Without any
+        criteria the run goes on until the caller stops iterating.
+
+        @param int max_generations: Number of generations to breed
+        @param int max_evaluations: Number of genotypes the run may print.  A generation
+            is only bred if every child could be printed within the budget.
+        @param int stagnation: Number of generations without progress to stop after, see
+            progress
+        @param float target: Fitness to stop at once a genotype reaches it
+        @return generator: A Generation per generation
+        """
+        best = None
+        stale = 0
+        first = True
+        while True:
+            started = time.time()
+            if not first:
+                self.cull_population()
+                self.generate_population()
+            self.ascertain_fitness()
+            progress = self.progress()
+            if progress is not None and (best is None or progress > best):
+                best = progress
+                stale = 0
+            elif progress is not None and not first:
+                stale += 1
+            first = False
+            reason = None
+            if target is not None and best is not None and best >= target:
+                reason = 'target'
+            elif stagnation is not None and stale >= stagnation:
+                reason = 'stagnation'
+            elif max_generations is not None and self.generation >= max_generations:
+                reason = 'generations'
+            elif (max_evaluations is not None and
+                  self.evaluations + self.offspring_count() > max_evaluations):
+                reason = 'budget'
+            yield EvolveProfile.Generation(
+                self.generation, self.population, self.evaluations, time.time() - started, reason,
+            )
+            if reason is not None:
+                return
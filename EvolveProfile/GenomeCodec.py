@@ -0,0 +1,105 @@
+"""
+A compact binary encoding of genotypes against their schema.
+
+Each genome is packed as one fixed width record: range slots are packed
+as numbers of the smallest width that holds their range, and list slots
+as the index of the chosen option.  A population is packed as a header,
+holding the schema fingerprint and the number of genomes, followed by the
+records back to back.
+"""
+
+from __future__ import absolute_import
+
+import binascii
+import struct
+
+import EvolveProfile
+
+_MAGIC = b'EPG1'
+
+class GenomeCodec(object):
+
+    def __init__(self, schema):
+        """
+        @param ProfileSchema schema: The schema of the genotypes to encode
+        """
+        self.schema = schema
+        self.digest = binascii.unhexlify(schema.fingerprint)
+        self.header = struct.Struct('<4s%dsI' % (len(self.digest)))
+        self.options = []
+        fmt = '<'
+        for spec in schema.specs:
+            if spec[0] == 'l':
+                self.options.append(list(spec[1:]))
+                fmt += self._int_format(0, len(spec) - 2, unsigned=True)
+            else:
+                self.options.append(None)
+                if isinstance(spec[1], int):
+                    fmt += self._int_format(spec[1], spec[2])
+                else:
+                    fmt += 'd'
+        self.record = struct.Struct(fmt)
+
+    @staticmethod
+    def _int_format(minimum, maximum, unsigned=False):
+        """
+        @return str: The smallest struct format which holds every int in [minimum, maximum]
+        """
+        for fmt, bits in (('b', 8), ('h', 16), ('i', 32)):
+            if unsigned:
+                fits = minimum >= 0 and maximum < 2 ** bits
+                fmt = fmt.upper()
+            else:
+                fits = minimum >= -2 ** (bits - 1) and maximum < 2 ** (bits - 1)
+            if fits:
+                return fmt
+        return 'Q' if unsigned else 'q'
+
+    def encode(self, genotype):
+        """
+        @param Genotype genotype: Genotype using this codec's schema
+        @return bytes: The record for the genotype
+        """
+        values = []
+        for options, slot in zip(self.options, genotype.slots):
+            values.append(options.index(slot) if options is not None else slot)
+        return self.record.pack(*values)
+
+    def decode(self, data, profilemap, offset=0, rng=None):
+        """
+        @param bytes data: Buffer holding a record
+        @param dict profilemap: Map of the profile the genotype uses
+        @param int offset: Where the record starts in data
+        @param RandomStream rng: Stream the genotype draws from when it is varied
+        @return Genotype: The decoded genotype
+        """
+        values = self.record.unpack_from(data, offset)
+        slots = []
+        for options, value in zip(self.options, values):
+            slots.append(options[value] if options is not None else value)
+        return EvolveProfile.Genotype(profilemap, schema=self.schema, slots=slots, rng=rng)
+
+    def encode_population(self, genotypes):
+        """
+        @param list genotypes: Genotypes using this codec's schema
+        @return bytes: A header followed by a record per genotype
+        """
+        records = [self.encode(genotype) for genotype in genotypes]
+        return self.header.pack(_MAGIC, self.digest, len(records)) + b''.join(records)
+
+    def decode_population(self, data, profilemap, rng=None):
+        """
+        @param bytes data: A population encoded by encode_population
+        @param dict profilemap: Map of the profile the genotypes use
+        @param RandomStream rng: Stream the genotypes draw from when they are varied
+        @return list: The decoded genotypes
+        """
+        magic, digest, count = self.header.unpack_from(data, 0)
+        if magic != _MAGIC or digest != self.digest:
+            raise EvolveProfile.SchemaMismatchError
+        offset = self.header.size
+        genotypes = []
+        for i in range(count):
+            genotypes.append(self.decode(data, profilemap, offset, rng))
+            offset += self.record.size
+        return genotypes
@@ -5,21 +5,120 @@ Contains the profile map template, and the genotype
 
 from __future__ import absolute_import
 
-import random
+import hashlib
+import json
+import math
+
+import EvolveProfile
 
 class Genotype(object):
 
-    def __init__(self, profilemap, ingenotype=None):
+    def __init__(self, profilemap, ingenotype=None, schema=None, slots=None, rng=None):
+        """
+        @param dict profilemap: Map of the profile the genotype uses
+        @param dict ingenotype: A profile to start from.  Randomized if not given
+        @param ProfileSchema schema: Compiled profilemap, shared between genotypes
+        @param list slots: Flat slot values to start from, in schema order
+        @param RandomStream rng: Stream to draw from, the default stream if not given
+        """
         self.profilemap = profilemap
-        self.profile = self.randomize_profile(self.profilemap) if not ingenotype else ingenotype
+        self.rng = rng if rng is not None else EvolveProfile.default_stream
+        # Set once the genotype has been evaluated
+        self.fitness = None
+        self.schema = schema if schema is not None else EvolveProfile.ProfileSchema(profilemap)
+        self._profile = None
+        self._slots = None
+        # Set when the slots and profile are shared with a copy, and must
+        # be cloned before they are written to
+        self._shared = False
+        self._fingerprint = None
+        if slots is not None:
+            self._slots = slots
+        elif ingenotype:
+            self._profile = EvolveProfile.freeze_profile(ingenotype)
+        else:
+            self._slots = self.schema.randomize(self.rng)
 
     def __eq__(self, other):
-        return self.profile == other.profile and self.profilemap == other.profilemap
+        if not isinstance(other, Genotype):
+            return NotImplemented
+        return self is other or self.fingerprint == other.fingerprint
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return int(self.fingerprint[:16], 16)
+
+    @property
+    def fingerprint(self):
+        """
+        A canonical digest of the schema and slots of this genotype.  It is
+        the same across processes and runs, and is cached until the genotype
+        is changed through mutate() or by setting its profile.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = hashlib.sha1(
+                (self.schema.fingerprint + json.dumps(self.slots)).encode('utf-8')
+            ).hexdigest()
+        return self._fingerprint
+
+    @property
+    def profile(self):
+        """
+        The nested profile, built from the slots the first time it is asked
+        for.  It is read-only, as it is shared with this genotype's copies: to
+        change it, set a new profile (e.g. an edited dict(genotype.profile)).
+        """
+        if self._profile is None:
+            self._profile = self.schema.build_profile(self._slots)
+        if not isinstance(self._profile, EvolveProfile.FrozenDict):
+            self._profile = EvolveProfile.freeze_profile(self._profile)
+        return self._profile
+
+    @profile.setter
+    def profile(self, profile):
+        self._profile = EvolveProfile.freeze_profile(profile)
+        self._slots = None
+        self._shared = False
+        self._fingerprint = None
+
+    @property
+    def slots(self):
+        """
+        The flat slot values, read out of the profile the first time they are asked for
+        """
+        if self._slots is None:
+            self._slots = self.schema.flatten(self._profile)
+        return self._slots
+
+    def _set_slot(self, index, value):
+        """
+        Sets one slot.  Slots shared with a copy are cloned first, and the
+        profile (if built) is updated by cloning only the path to the slot,
+        so copies keep sharing every untouched subtree.
+        """
+        slots = self.slots
+        if self._shared:
+            slots = self._slots = list(slots)
+            self._shared = False
+        slots[index] = value
+        self._fingerprint = None
+        if self._profile is not None:
+            self._profile = self.schema.assoc(self._profile, index, value)
 
     def copy(self):
-        profile_copy = self.profile.copy()
-        profilemap_copy = self.profilemap.copy()
-        return Genotype(profilemap_copy, ingenotype=profile_copy)
+        """
+        Copies this genotype.  The copy shares its slots and profile with
+        this genotype until either of them is mutated, and the profilemap
+        and schema are never copied.
+        """
+        copy = Genotype(self.profilemap, schema=self.schema, slots=self.slots, rng=self.rng)
+        copy._profile = self._profile
+        copy._fingerprint = self._fingerprint
+        copy._shared = self._shared = True
+        return copy
 
     def randomize_profile(self, profilemap):
         """
@@ -28,23 +127,8 @@ class Genotype(object):
         @param dict profilemap: Map of the profile the genotype uses
         @return dict: A randomized profile with the same structure as the profilemap
         """
-        rand_prof = {}
-        return self._recursize_randomize(profilemap, rand_prof)
-
-    def _recursize_randomize(self, profilemap, rand_prof):
-        """
-        Recursive funtion to randomize a profile using a profile map
-
-        @param dict profilemap: Profilemap used to randomize a profile
-        @param dict rand_prof: The random profile being created
-        @return dict: The randomized profile
-        """
-        for key in profilemap:
-            if isinstance(profilemap[key], dict):
-                rand_prof[key] = self._recursize_randomize(profilemap[key], {})
-            else:
-                rand_prof[key] = self.randomize_value(profilemap[key])
-        return rand_prof
+        schema = EvolveProfile.ProfileSchema(profilemap)
+        return schema.build_profile(schema.randomize(self.rng))
 
     def randomize_value(self, value):
         """
@@ -55,17 +139,7 @@ class Genotype(object):
         @param list value: Value to randomize
         @return value: Randomized value
         """
-        rval = None
-        if value[0] == 'r':
-            minimum = value[1]
-            maximum = value[2]
-            if isinstance(minimum, int):
-                rval = random.randint(minimum, maximum)
-            elif isinstance(minimum, float):
-                rval = random.uniform(minimum, maximum)
-        elif value[0] == 'l':
-            rval = random.choice(value[1:])
-        return rval
+        return EvolveProfile.ProfileSchema.randomize_value(value, self.rng)
 
     def get_contexts(self, profile, context=[]):
         """
@@ -86,46 +160,80 @@ class Genotype(object):
         list_of_context.sort()
         return list_of_context
             
-    def mutate(self):
-        """
-        Mutates one random value in this profile
-        """
-        contexts = self.get_contexts(self.profile)
-        choice = random.choice(contexts)
-        choice.reverse()
-        mut_prof = self.profile
-        mut_profmap = self.profilemap
-        while len(choice) > 2:
-            next_context = choice.pop()
-            mut_prof = mut_prof[next_context]
-            mut_profmap = mut_profmap[next_context]
-        final_context = choice.pop()
-        old_val = mut_prof[final_context]
-        muted_val = self.randomize_value(mut_profmap[final_context])
-        while old_val == muted_val:
-            muted_val = self.randomize_value(mut_profmap[final_context])
-        mut_prof[final_context] = muted_val
+    def mutate(self, operator='reset', rate=None, sigma=.1):
+        """
+        Mutates this profile.  By default one random value is mutated; given
+        a rate, each value is mutated with that probability instead.
+        Values which can only take one value are never picked.
+
+        @param str operator: Name of the mutation operator, see Mutation.py
+        @param float rate: Probability of mutating each value
+        @param float sigma: Step size of the creep operator, as a fraction of the range
+        @return list: Indices of the mutated slots
+        """
+        mutator = EvolveProfile.mutation_operators.get(operator)
+        if mutator is None:
+            raise EvolveProfile.UnknownOperatorError(operator)
+        mutable = self.schema.mutable
+        if not mutable:
+            return []
+        if rate is None:
+            loci = [self.rng.choice(mutable)]
+        else:
+            loci = [mutable[i] for i in self._sample_loci(len(mutable), rate)]
+        for index in loci:
+            self._set_slot(index, mutator(self.schema.specs[index], self.slots[index], sigma, self.rng))
+        return loci
+
+    def _sample_loci(self, count, rate):
+        """
+        Picks each of count loci with probability rate.  The gaps between
+        picked loci are drawn from a geometric distribution, so the cost is
+        in the number of loci picked rather than the number of loci.
+
+        @param int count: Number of loci
+        @param float rate: Probability of picking each loci
+        @return list: Picked loci, in increasing order
+        """
+        if rate <= 0:
+            return []
+        if rate >= 1:
+            return list(range(count))
+        log_skip = math.log(1 - rate)
+        loci = []
+        locus = int(math.log(1 - self.rng.random()) / log_skip)
+        while locus < count:
+            loci.append(locus)
+            locus += 1 + int(math.log(1 - self.rng.random()) / log_skip)
+        return loci
+
+    def crossover_slots(self, mate, rng=None):
+        """
+        Using another mate, executes a uniform crossover, where each loci
+        in the genome has a 50% chance of being passed on to its progeny.
+
+        @param Genotype mate: The other mate for this parent, sharing this schema
+        @param RandomStream rng: Stream to draw from instead of this genotype's
+        @return list: The slots of the genome created
+        """
+        rng = rng if rng is not None else self.rng
+        new_slots = []
+        for slot, mate_slot in zip(self.slots, mate.slots):
+            if rng.uniform(0, 1) > .5:
+                new_slots.append(slot)
+            else:
+                new_slots.append(mate_slot)
+        return new_slots
 
     def uniform_crossover(self, mate):
         """
         Using another mate, executes a uniform crossover, where each loci 
         in the genome has a 50% chance of being passed on to its progeny.
-        We do this by creating a context list from the python dict, and
-        crossing that over.
 
         @param Genotype mate: The other mate for this parent
         @return dict: The genome created
         """
-        contexts = self.get_contexts(self.profile)
-        mate_contexts = mate.get_contexts(mate.profile)
-        new_contexts = []
-        for context, mate_context in zip(contexts, mate_contexts):
-            if random.uniform(0, 1) > .5:
-                new_context = context
-            else:
-                new_context = mate_context
-            new_contexts.append(new_context)
-        return self.build_dict_from_context(new_contexts)
+        return self.schema.build_profile(self.crossover_slots(mate))
 
     def add_subdicts(self, subdict_list, dct):
         """
@@ -0,0 +1,94 @@
+"""
+The fittest genotypes seen over a whole run.
+
+Genotypes are keyed by their fingerprint, so a genome is only ever kept
+once however many times it is bred.  The fingerprint of every genome
+handed to the hall of fame is remembered as well, whether or not it made
+the cut, so children which are copies of anything already evaluated can be
+rejected before they are printed again.
+"""
+
+from __future__ import absolute_import
+
+import EvolveProfile
+
+class HallOfFame(object):
+
+    def __init__(self, max_size=10):
+        """
+        @param int max_size: Number of genotypes to keep
+        """
+        self.max_size = max_size
+        self._ranked = EvolveProfile.RankedPopulation()
+        self._members = {}
+        self._seen = set()
+
+    def __len__(self):
+        return len(self._ranked)
+
+    def __iter__(self):
+        """
+        Iterates over the members, fittest first
+        """
+        return iter(self._ranked)
+
+    def __contains__(self, genotype):
+        return genotype.fingerprint in self._members
+
+    def seen(self, genotype):
+        """
+        @param Genotype genotype: A genotype
+        @return bool: True if a genotype with the same genome was handed to the hall of fame
+        """
+        return genotype.fingerprint in self._seen
+
+    def see(self, genotypes):
+        """
+        Remembers genomes without ranking them, e.g. children which have been
+        sent off to be evaluated.
+
+        @param list genotypes: Genotypes to remember
+        """
+        self._seen.update(genotype.fingerprint for genotype in genotypes)
+
+    def add(self, genotype):
+        """
+        Adds a scored genotype, dropping the least fit member if the hall of
+        fame is full.  A genome which is already a member keeps its first
+        fitness.
+
+        @param Genotype genotype: The genotype to add
+        @return bool: True if the genotype became a member
+        """
+        if genotype.fitness is None:
+            return False
+        fingerprint = genotype.fingerprint
+        self._seen.add(fingerprint)
+        if fingerprint in self._members:
+            return False
+        self._members[fingerprint] = self._ranked.add(genotype)
+        for dropped in self._ranked.truncate(self.max_size):
+            del self._members[dropped.fingerprint]
+        return fingerprint in self._members
+
+    def update(self, genotypes):
+        """
+        Adds every scored genotype.  Unscored ones are skipped.
+
+        @param list genotypes: Genotypes to add
+        """
+        for genotype in genotypes:
+            self.add(genotype)
+
+    def best(self):
+        """
+        @return Genotype: The fittest genotype seen, or None if nothing was scored yet
+        """
+        return self._ranked.best()
+
+    def top(self, count):
+        """
+        @param int count: Number of genotypes to get
+        @return list: The count fittest genotypes seen, fittest first
+        """
+        return self._ranked.top(count)
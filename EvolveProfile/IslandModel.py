@@ -0,0 +1,143 @@
+"""
+An island model: several populations evolving in their own processes.
+
+Each island is a GeneticAlgorithm with its own random stream, running in
+its own process.  Every migration_interval generations each island sends
+copies of its fittest genomes to its neighbours, which replace their
+least fit members with them.  Genomes travel between processes encoded
+with a GenomeCodec.
+"""
+
+from __future__ import unicode_literals, print_function
+
+import multiprocessing
+import traceback
+
+import EvolveProfile
+
+class IslandModel(object):
+
+    def __init__(self, profilemap, evaluate, num_islands=4, island_size=20,
+                 migration_interval=5, migration_size=2, topology='ring', seed=None):
+        """
+        @param dict profilemap: Map of the profile the genotypes use
+        @param function evaluate: Takes a Genotype and returns its fitness.  It is run in
+            the island processes, so it has to be picklable (e.g. a module level function).
+        @param int num_islands: Number of islands, each run in its own process
+        @param int island_size: Population size of each island
+        @param int migration_interval: Number of generations between migrations
+        @param int migration_size: Number of genomes each island sends to each neighbour
+        @param str topology: 'ring' sends to the next island, 'complete' to every other island
+        @param int seed: Seed of the run
+        """
+        if topology not in ('ring', 'complete'):
+            raise EvolveProfile.UnknownTopologyError(topology)
+        self.profilemap = profilemap
+        self.evaluate = evaluate
+        self.num_islands = num_islands
+        self.island_size = island_size
+        self.migration_interval = migration_interval
+        self.migration_size = migration_size
+        self.topology = topology
+        self.rng = EvolveProfile.RandomStream(seed)
+        self.schema = EvolveProfile.ProfileSchema(profilemap)
+        self.islands = []
+
+    def neighbours(self, index):
+        """
+        @param int index: An island
+        @return list: The islands it sends migrants to
+        """
+        if self.num_islands < 2:
+            return []
+        if self.topology == 'ring':
+            return [(index + 1) % self.num_islands]
+        return [other for other in range(self.num_islands) if other != index]
+
+    def run(self, generations):
+        """
+        Evolves every island for a number of generations.  The final
+        population of each island is kept in self.islands.
+
+        @param int generations: Number of generations to evolve each island for
+        @return Genotype: The fittest genotype over all islands
+        """
+        inboxes = [multiprocessing.Queue() for i in range(self.num_islands)]
+        results = multiprocessing.Queue()
+        streams = self.rng.spawn(self.num_islands)
+        processes = []
+        for index in range(self.num_islands):
+            incoming = len([i for i in range(self.num_islands) if index in self.neighbours(i)])
+            process = multiprocessing.Process(target=_run_island, args=(
+                index, self, streams[index], generations, inboxes, incoming, results,
+            ))
+            process.daemon = True
+            process.start()
+            processes.append(process)
+        codec = EvolveProfile.GenomeCodec(self.schema)
+        self.islands = [None] * self.num_islands
+        try:
+            for i in range(self.num_islands):
+                index, data, fitnesses = results.get()
+                if data is None:
+                    # The other islands may be waiting on its migrants
+                    for process in processes:
+                        process.terminate()
+                    raise EvolveProfile.IslandError('Island %d failed:\n%s' % (index, fitnesses))
+                self.islands[index] = _decode(codec, self.profilemap, data, fitnesses)
+        finally:
+            for process in processes:
+                process.join()
+        members = [genotype for island in self.islands for genotype in island]
+        return EvolveProfile.RankedPopulation(members).best()
+
+def _decode(codec, profilemap, data, fitnesses, rng=None):
+    genotypes = codec.decode_population(data, profilemap, rng)
+    for genotype, fitness in zip(genotypes, fitnesses):
+        genotype.fitness = fitness
+    return genotypes
+
+def _evaluate_population(ga, evaluate):
+    for genotype in ga.population:
+        if genotype.fitness is None:
+            genotype.fitness = evaluate(genotype)
+
+def _run_island(index, model, rng, generations, inboxes, incoming, results):
+    """
+    Runs in the island's process.  Evolves one island, exchanging migrants
+    through the inboxes, and puts its final population on results.
+    """
+    try:
+        ga = EvolveProfile.GeneticAlgorithm(model.profilemap, model.island_size, rng=rng)
+        codec = EvolveProfile.GenomeCodec(ga.schema)
+        _evaluate_population(ga, model.evaluate)
+        early = []
+        for generation in range(1, generations + 1):
+            ga.cull_population()
+            ga.generate_population()
+            _evaluate_population(ga, model.evaluate)
+            if generation % model.migration_interval:
+                continue
+            # The population does not change until the immigrants arrive
+            ranked = EvolveProfile.RankedPopulation(ga.population)
+            emigrants = ranked.top(model.migration_size)
+            message = (generation, index, codec.encode_population(emigrants), [g.fitness for g in emigrants])
+            for neighbour in model.neighbours(index):
+                inboxes[neighbour].put(message)
+            # A neighbour which is ahead may already have sent the migrants
+            # of its next migration; keep those for then
+            messages = [m for m in early if m[0] == generation]
+            early = [m for m in early if m[0] != generation]
+            while len(messages) < incoming:
+                m = inboxes[index].get()
+                (messages if m[0] == generation else early).append(m)
+            # Take messages in order of sender so a run can be replayed from its seed
+            immigrants = []
+            for sent, sender, data, fitnesses in sorted(messages):
+                immigrants.extend(_decode(codec, model.profilemap, data, fitnesses, rng))
+            survivors = ranked.top(max(model.island_size - len(immigrants), 0))
+            ga.population = survivors + immigrants[:model.island_size]
+        population = ga.get_top(len(ga.population))
+        results.put((index, codec.encode_population(population), [g.fitness for g in population]))
+    except Exception:
+        results.put((index, None, traceback.format_exc()))
@@ -0,0 +1,197 @@
+"""
+An append-only journal of a run, so it can be resumed after a crash.
+
+The journal is a file of JSON records, one per line, which are only ever
+appended and synced to disk as they are written.  Genomes are written
+once, packed with a GenomeCodec, and get a journal id; after that each
+generation only costs a record of member ids and the state of the random
+stream, and each printed batch a record of ids and fitnesses.  Replaying
+the records gives back the last population with every fitness that was
+already printed, so a resumed run never prints a genome twice.  A record
+cut short by a crash is ignored.
+"""
+
+from __future__ import unicode_literals, print_function
+
+import base64
+import io
+import json
+import os
+
+import numpy
+
+import EvolveProfile
+
+class Journal(object):
+
+    def __init__(self, path, profilemap):
+        """
+        @param str path: Path of the journal file, created on the first write
+        @param dict profilemap: Map of the profile the genotypes use
+        """
+        self.path = path
+        self.profilemap = profilemap
+        self.schema = EvolveProfile.ProfileSchema(profilemap)
+        self.codec = EvolveProfile.GenomeCodec(self.schema)
+        self._ids = {}
+        self._fitnesses = {}
+        # Set once the journal's ids are known, see _catch_up
+        self._loaded = False
+
+    def _catch_up(self):
+        """
+        Reads the ids of the genomes already in the journal before the
+        first write, if it was not loaded, so new genomes are numbered on
+        from them rather than over them
+        """
+        if not self._loaded:
+            self.load()
+
+    def _append(self, records):
+        """
+        Appends records and waits for them to reach the disk
+        """
+        lines = [json.dumps(record) + '\n' for record in records]
+        if not os.path.exists(self.path) or not os.path.getsize(self.path):
+            lines.insert(0, json.dumps({'type': 'journal', 'schema': self.schema.fingerprint}) + '\n')
+        with io.open(self.path, 'ab') as f:
+            f.write(''.join(lines).encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _genomes_record(self, genotypes):
+        """
+        Gives journal ids to the genomes which do not have one yet
+
+        @return dict: A record of the new genomes, or None if there are none
+        """
+        new = []
+        for genotype in genotypes:
+            if genotype.fingerprint not in self._ids:
+                self._ids[genotype.fingerprint] = len(self._ids)
+                new.append(genotype)
+        if not new:
+            return None
+        return {
+            'type': 'genomes',
+            'data': base64.b64encode(self.codec.encode_population(new)).decode('ascii'),
+        }
+
+    def _fitness_record(self, genotypes):
+        """
+        @return dict: A record of the fitnesses which are not journaled yet, or None
+        """
+        results = []
+        for genotype in genotypes:
+            genome_id = self._ids[genotype.fingerprint]
+            fitness = EvolveProfile.dump_fitness(genotype.fitness)
+            if fitness is not None and self._fitnesses.get(genome_id) != fitness:
+                self._fitnesses[genome_id] = fitness
+                results.append([genome_id, fitness])
+        if not results:
+            return None
+        return {'type': 'fitness', 'results': results}
+
+    def record_population(self, generation, population, rng):
+        """
+        Journals a population before it is evaluated.  Only genomes and
+        fitnesses which are not in the journal yet are written.
+
+        @param int generation: Number of the generation
+        @param list population: Its members
+        @param RandomStream rng: The stream of the run
+        """
+        self._catch_up()
+        records = [self._genomes_record(population), self._fitness_record(population), {
+            'type': 'population',
+            'generation': generation,
+            'members': [self._ids[genotype.fingerprint] for genotype in population],
+            'rng': _dump_state(rng.getstate()),
+        }]
+        self._append([record for record in records if record is not None])
+
+    def record_fitness(self, genotypes):
+        """
+        Journals the fitnesses of a batch as soon as it is printed
+
+        @param list genotypes: Genotypes of the batch, with their fitness set
+        """
+        self._catch_up()
+        records = [self._genomes_record(genotypes), self._fitness_record(genotypes)]
+        records = [record for record in records if record is not None]
+        if records:
+            self._append(records)
+
+    def load(self, rng=None):
+        """
+        Replays the journal.  Genomes journaled after load are numbered on
+        from the ones it read.
+
+        @param RandomStream rng: Stream the loaded genotypes draw from when they are varied
+        @return tuple: None if there is nothing to resume, otherwise
+            generation: Number of the last journaled generation
+            population: Its members, with every journaled fitness set
+            rng_state: State of the run's stream, for RandomStream.setstate
+            evaluated: Every genotype with a journaled fitness
+        """
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return None
+        with io.open(self.path, 'rb') as f:
+            data = f.read()
+        end = data.rfind(b'\n') + 1
+        if end < len(data):
+            # The run crashed while the last record was written
+            with io.open(self.path, 'r+b') as f:
+                f.truncate(end)
+        genotypes = []
+        last = None
+        self._ids = {}
+        self._fitnesses = {}
+        for line in data[:end].decode('utf-8').splitlines():
+            record = json.loads(line)
+            if record['type'] == 'journal':
+                if record['schema'] != self.schema.fingerprint:
+                    raise EvolveProfile.SchemaMismatchError
+            elif record['type'] == 'genomes':
+                genomes = base64.b64decode(record['data'].encode('ascii'))
+                for genotype in self.codec.decode_population(genomes, self.profilemap, rng):
+                    self._ids[genotype.fingerprint] = len(genotypes)
+                    genotypes.append(genotype)
+            elif record['type'] == 'fitness':
+                for genome_id, fitness in record['results']:
+                    self._fitnesses[genome_id] = fitness
+                    genotypes[genome_id].fitness = EvolveProfile.load_fitness(fitness)
+            elif record['type'] == 'population':
+                last = record
+        if last is None:
+            return None
+        population = [genotypes[genome_id] for genome_id in last['members']]
+        evaluated = [genotype for genotype in genotypes if genotype.fitness is not None]
+        return last['generation'], population, _load_state(last['rng']), evaluated
+
+def _dump_state(state):
+    """
+    @param tuple state: State from RandomStream.getstate
+    @return list: The state in a form JSON can hold
+    """
+    python_state, numpy_state, spawned = state
+    name, keys, position, has_gauss, cached_gaussian = numpy_state
+    return [
+        [python_state[0], list(python_state[1]), python_state[2]],
+        [name, [int(key) for key in keys], position, has_gauss, cached_gaussian],
+        spawned,
+    ]
+
+def _load_state(data):
+    """
+    @param list data: A state written by _dump_state
+    @return tuple: The state, for RandomStream.setstate
+    """
+    python_state, numpy_state, spawned = data
+    name, keys, position, has_gauss, cached_gaussian = numpy_state
+    return (
+        (python_state[0], tuple(python_state[1]), python_state[2]),
+        (str(name), numpy.array(keys, dtype=numpy.uint32), position, has_gauss, cached_gaussian),
+        spawned,
+    )
@@ -0,0 +1,91 @@
+"""
+Mutation operators for single profile entries.
+
+Every operator takes a profilemap entry and the current value, and returns
+a different value in constant time.  Operators are looked up by name in
+mutation_operators.  Entries which can only take a single value can not be
+mutated; see can_mutate.
+"""
+
+from __future__ import absolute_import, division
+
+import EvolveProfile
+
+def can_mutate(spec):
+    """
+    @param list spec: Profilemap entry
+    @return bool: True if the entry can take more than one value
+    """
+    if spec[0] == 'r':
+        return spec[2] > spec[1]
+    return len(spec) > 2
+
+def uniform_reset(spec, value, sigma=None, rng=None):
+    """
+    Draws a new value uniformly from the values other than the current one.
+    Instead of redrawing until the value changes, one of the remaining
+    values is drawn directly.
+
+    @param list spec: Profilemap entry
+    @param value: Current value
+    @param float sigma: Unused; accepted so all operators share a signature
+    @param RandomStream rng: Stream to draw from, the default stream if not given
+    @return value: The new value
+    """
+    rng = rng if rng is not None else EvolveProfile.default_stream
+    if spec[0] == 'l':
+        options = spec[1:]
+        if value not in options:
+            return rng.choice(options)
+        other = rng.randrange(len(options) - 1)
+        if other >= options.index(value):
+            other += 1
+        return options[other]
+    minimum = spec[1]
+    maximum = spec[2]
+    if isinstance(minimum, int):
+        if not minimum <= value <= maximum:
+            return rng.randint(minimum, maximum)
+        other = rng.randint(minimum, maximum - 1)
+        if other >= value:
+            other += 1
+        return other
+    other = rng.uniform(minimum, maximum)
+    if other == value:
+        other = maximum if value != maximum else minimum
+    return other
+
+def gaussian_creep(spec, value, sigma=.1, rng=None):
+    """
+    Moves a range entry by a gaussian step, scaled to the width of the
+    range and clamped to it.  Ints always move by at least one.  List
+    entries have no notion of distance, so they are reset uniformly.
+
+    @param list spec: Profilemap entry
+    @param value: Current value
+    @param float sigma: Standard deviation of the step, as a fraction of the range
+    @param RandomStream rng: Stream to draw from, the default stream if not given
+    @return value: The new value
+    """
+    rng = rng if rng is not None else EvolveProfile.default_stream
+    if spec[0] == 'l':
+        return uniform_reset(spec, value, rng=rng)
+    minimum = spec[1]
+    maximum = spec[2]
+    step = rng.gauss(0, sigma * (maximum - minimum))
+    other = min(max(value + step, minimum), maximum)
+    if isinstance(minimum, int):
+        other = int(round(other))
+        if other == value:
+            upwards = step > 0 if minimum < value < maximum else value == minimum
+            other = value + 1 if upwards else value - 1
+    elif other == value:
+        other = min(max(value - step, minimum), maximum)
+        if other == value:
+            other = uniform_reset(spec, value, rng=rng)
+    return other
+
+mutation_operators = {
+    'reset': uniform_reset,
+    'creep': gaussian_creep,
+}
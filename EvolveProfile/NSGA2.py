@@ -0,0 +1,222 @@
+"""
+A multi-objective engine based on NSGA-II.
+
+Genotypes are scored with a tuple of objectives instead of a single
+fitness, e.g. (print time, filament used, visual quality).  The population
+is sorted into non-dominated fronts, members of the same front are told
+apart by their crowding distance, and every non-dominated genotype seen is
+kept in a Pareto archive, so a run returns the whole trade-off front
+instead of a single winner.
+"""
+
+from __future__ import unicode_literals, print_function, division
+
+import numpy
+
+import EvolveProfile
+
+def dominance_matrix(objectives):
+    """
+    @param numpy.ndarray objectives: (N, M) objectives, all maximized
+    @return numpy.ndarray: (N, N) bool matrix, True where row i dominates row j
+    """
+    better_or_equal = (objectives[:, None, :] >= objectives[None, :, :]).all(axis=2)
+    better = (objectives[:, None, :] > objectives[None, :, :]).any(axis=2)
+    return better_or_equal & better
+
+def fast_non_dominated_sort(objectives):
+    """
+    Sorts members into fronts: front 0 is not dominated by anyone, front 1
+    only by members of front 0, and so on.
+
+    @param numpy.ndarray objectives: (N, M) objectives, all maximized
+    @return list: The fronts, each an array of member indices
+    """
+    dominates = dominance_matrix(objectives)
+    dominated_by = dominates.sum(axis=0)
+    remaining = numpy.ones(len(objectives), dtype=bool)
+    fronts = []
+    while remaining.any():
+        front = numpy.flatnonzero(remaining & (dominated_by == 0))
+        fronts.append(front)
+        remaining[front] = False
+        dominated_by = dominated_by - dominates[front].sum(axis=0)
+    return fronts
+
+def crowding_distance(objectives):
+    """
+    @param numpy.ndarray objectives: (N, M) objectives of the members of one front
+    @return numpy.ndarray: Crowding distance of each member, inf at the edges of the front
+    """
+    count = len(objectives)
+    distance = numpy.zeros(count)
+    if count < 3:
+        distance[:] = numpy.inf
+        return distance
+    objectives = numpy.where(numpy.isfinite(objectives), objectives, 0)
+    order = numpy.argsort(objectives, axis=0, kind='mergesort')
+    for column in range(objectives.shape[1]):
+        ordered = objectives[order[:, column], column]
+        span = ordered[-1] - ordered[0]
+        distance[order[0, column]] = numpy.inf
+        distance[order[-1, column]] = numpy.inf
+        if span > 0:
+            distance[order[1:-1, column]] += (ordered[2:] - ordered[:-2]) / span
+    return distance
+
+class ParetoArchive(object):
+    """
+    The non-dominated genotypes seen so far.  Dominance is checked against
+    the whole archive at once.  If max_size is given, the most crowded
+    members are dropped when the archive grows past it.
+    """
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        self.members = []
+        self.objectives = None
+        # Number of distinct genomes ever added, so a caller can tell the
+        # archive changed.  A member dropped for crowding which comes back
+        # is not counted again.
+        self.additions = 0
+        self._admitted = set()
+
+    def __len__(self):
+        return len(self.members)
+
+    def add(self, genotype, objectives):
+        """
+        @param Genotype genotype: The genotype to add
+        @param numpy.ndarray objectives: Its objectives, all maximized
+        @return bool: True if the genotype was added
+        """
+        objectives = numpy.asarray(objectives, dtype=float)
+        if self.objectives is None or not len(self.members):
+            self.members = [genotype]
+            self.objectives = objectives[None, :]
+            self._admit(genotype)
+            return True
+        archive = self.objectives
+        dominated = ((archive >= objectives).all(axis=1) & (archive > objectives).any(axis=1)).any()
+        if dominated or any(member == genotype for member in self.members):
+            return False
+        keep = ~((objectives >= archive).all(axis=1) & (objectives > archive).any(axis=1))
+        self.members = [member for member, kept in zip(self.members, keep) if kept] + [genotype]
+        self.objectives = numpy.vstack([archive[keep], objectives])
+        self._admit(genotype)
+        if self.max_size is not None and len(self.members) > self.max_size:
+            crowded = numpy.argmin(crowding_distance(self.objectives))
+            del self.members[crowded]
+            self.objectives = numpy.delete(self.objectives, crowded, axis=0)
+        return True
+
+    def _admit(self, genotype):
+        if genotype.fingerprint not in self._admitted:
+            self._admitted.add(genotype.fingerprint)
+            self.additions += 1
+
+class NSGA2(EvolveProfile.GeneticAlgorithm):
+
+    def __init__(self, profilemap, population_size, weights, ingenomes=[], seed=None, rng=None,
+                 archive_size=None, fitness_calculator=None):
+        """
+        @param dict profilemap: Map of the profile the genotypes use
+        @param int population_size: Number of genotypes in each generation
+        @param list weights: One per objective: 1 to maximize it, -1 to minimize it
+        @param list ingenomes: Genotypes to start the population with
+        @param int seed: Seed of the run, used when no rng is given
+        @param RandomStream rng: Stream every random draw of the run comes from
+        @param int archive_size: Bound on the size of the Pareto archive
+        @param fitness_calculator: Evaluates genotypes, giving a tuple of objectives for each
+        """
+        super(NSGA2, self).__init__(
+            profilemap, population_size, ingenomes, seed, rng, fitness_calculator,
+        )
+        self.weights = numpy.asarray(weights, dtype=float)
+        # NSGA-II uses binary crowded tournaments
+        self.tournament_size = 2
+        self.archive = ParetoArchive(archive_size)
+        self._scores = {}
+
+    def objectives(self, genotypes):
+        """
+        @param list genotypes: Genotypes whose fitness is a tuple of objectives
+        @return numpy.ndarray: (N, M) objectives, weighted so all are maximized.  Unscored
+            genotypes get -inf everywhere.
+        """
+        objectives = numpy.full((len(genotypes), len(self.weights)), -numpy.inf)
+        for row, genotype in enumerate(genotypes):
+            if genotype.fitness is not None:
+                objectives[row] = numpy.asarray(genotype.fitness, dtype=float) * self.weights
+        return objectives
+
+    def rank_population(self):
+        """
+        Sorts the population into fronts and scores each member for
+        selection: lower fronts score higher, and within a front a larger
+        crowding distance scores higher.  Scored members are offered to
+        the archive.
+
+        @return list: The fronts, each a list of genotypes
+        """
+        objectives = self.objectives(self.population)
+        fronts = fast_non_dominated_sort(objectives)
+        self._scores = {}
+        for rank, front in enumerate(fronts):
+            crowding = crowding_distance(objectives[front])
+            squashed = 1 - 1 / (1 + crowding)
+            for index, spread in zip(front, squashed):
+                # Keyed by genome, as ids are reused once genotypes are freed
+                self._scores[self.population[index].fingerprint] = -rank + .5 * spread
+        for genotype, row in zip(self.population, objectives):
+            if genotype.fitness is not None:
+                self.archive.add(genotype, row)
+        return [[self.population[index] for index in front] for front in fronts]
+
+    def selection_fitness(self, genotypes):
+        return numpy.array(
+            [self._scores.get(genotype.fingerprint, -numpy.inf) for genotype in genotypes],
+            dtype=float,
+        )
+
+    def get_top(self, num_genotypes):
+        self.rank_population()
+        scores = self.selection_fitness(self.population)
+        order = numpy.argsort(-scores, kind='mergesort')[:num_genotypes]
+        return [self.population[index] for index in order]
+
+    def generate_population(self):
+        self.rank_population()
+        super(NSGA2, self).generate_population()
+
+    def update_hall_of_fame(self, genotypes=None):
+        # Objectives can not be ranked on one scale, so the Pareto archive
+        # keeps the best genotypes and the hall of fame only tells duplicates
+        genotypes = self.population if genotypes is None else genotypes
+        scored = [genotype for genotype in genotypes if genotype.fitness is not None]
+        self.hall_of_fame.see(scored)
+        for genotype, row in zip(scored, self.objectives(scored)):
+            self.archive.add(genotype, row)
+
+    def progress(self):
+        """
+        @return int: Number of distinct genomes ever added to the Pareto archive, None
+            before any
+        """
+        return self.archive.additions or None
+
+    def evolve(self, max_generations=None, max_evaluations=None, stagnation=None, target=None):
+        """
+        Runs the algorithm as GeneticAlgorithm.evolve does, where a
+        generation makes progress if it adds to the Pareto archive.  There
+        is no single fitness to reach, so target can not be given.
+        """
+        if target is not None:
+            raise ValueError('NSGA2 has no single fitness to stop at a target of')
+        return super(NSGA2, self).evolve(max_generations, max_evaluations, stagnation)
+
+    def pareto_front(self):
+        """
+        @return list: Every non-dominated genotype seen so far
+        """
+        return list(self.archive.members)
@@ -3,12 +3,18 @@ The physical fitness calculator
 """
 
 
-from ___future___ import unicode_literals, print_function
+from __future__ import unicode_literals, print_function
+import hashlib
 import json
+import math
+import multiprocessing
+import multiprocessing.pool
 import os
 import subprocess
 import tempfile
 
+import numpy
+
 import EvolveProfile
 
 class PhysicalFitnessCalculator(object):
@@ -29,6 +35,14 @@ class PhysicalFitnessCalculator(object):
             'G1 X0 Y0 Z150 F2500; Transition from one model to the next\n',
             'G92 A0 B0\n',
         ]
+        # When set, ascertain_fitness races the genotypes over the models,
+        # keeping the racing_keep fittest fraction each round, see race
+        self.racing = False
+        self.racing_keep = .5
+        # Number of models sliced at once, the number of cores if None
+        self.slice_workers = None
+        # Fitness of a genotype whose profile the slicer fails on
+        self.rejected_fitness = -1000.
 
     def copy_genotypes(self, genotypes):
         """
@@ -39,28 +53,159 @@ class PhysicalFitnessCalculator(object):
             copys.append(genotype.copy())
         return copys
 
-    def ascertain_fitness(self, genotypes):
+    def ascertain_fitness(self, genotypes, on_batch=None):
         """
         Gets the fitnesses for a set of genotypes
+
+        @param list genotypes: Genotypes to evaluate
+        @param function on_batch: Called with the genotypes of each printed batch and
+            their fitnesses as soon as the batch is done, e.g. to checkpoint them
+        @return list: The fitness of each genotype
         """
+        if self.racing:
+            return self.race(genotypes, on_batch)
         num_models = len(self.model_paths)
         copy_genotypes = self.copy_genotypes(genotypes)
         fitnesses = []
-        path_to_print_exe = '/examples/print_gcode_file.py'
         while len(copy_genotypes) > 0:
             to_print = copy_genotypes[:num_models]
-            profiles = self.get_profiles(to_print)
-            all_path = self.slice_models(self.model_paths[:len(to_print)], profiles)
+            fitness = self.print_batch(self.model_paths[:len(to_print)], to_print)
+            if on_batch is not None:
+                on_batch(genotypes[len(fitnesses):len(fitnesses) + len(to_print)], fitness)
+            fitnesses.extend(fitness)
+            copy_genotypes = copy_genotypes[num_models:]
+        return fitnesses
+
+    def race(self, genotypes, on_batch=None):
+        """
+        Gets the fitnesses of a set of genotypes by successive halving.
+        Every genotype is printed on the cheapest model, then only the
+        racing_keep fittest fraction of them go on to the next cheapest
+        model, and so on until the last genotype left was printed on one
+        more model or every model was printed.  Scores must be single
+        numbers.
+
+        A genotype's fitness is its mean score over the models it was
+        printed on, and fitnesses keep the order of the race: a genotype
+        which lasted more rounds is always fitter than one which dropped
+        out before it.  When the genotypes dropping out of a round have a
+        lower mean than an earlier dropout, the fitnesses of all of them
+        are raised by the same amount to just above it.
+
+        @param list genotypes: Genotypes to evaluate
+        @param function on_batch: Called with the genotypes which drop out of the race
+            each round and their fitnesses
+        @return list: The fitness of each genotype
+        """
+        models = self.racing_models()
+        num_models = len(self.model_paths)
+        copy_genotypes = self.copy_genotypes(genotypes)
+        scores = [[] for genotype in genotypes]
+        fitnesses = [None] * len(genotypes)
+        racing = list(range(len(genotypes)))
+        # Fittest fitness of the genotypes dropped so far
+        ceiling = None
+        for rnd, model_path in enumerate(models):
+            for start in range(0, len(racing), num_models):
+                batch = racing[start:start + num_models]
+                fitness = self.print_batch(
+                    [model_path] * len(batch), [copy_genotypes[i] for i in batch],
+                )
+                for index, score in zip(batch, fitness):
+                    scores[index].append(score)
+            means = dict((i, sum(scores[i]) / float(len(scores[i]))) for i in racing)
+            survivors = []
+            if rnd < len(models) - 1 and len(racing) > 1:
+                ranked = sorted(racing, key=lambda i: -means[i])
+                survivors = sorted(ranked[:int(math.ceil(len(racing) * self.racing_keep))])
+            dropped = [i for i in racing if i not in survivors]
+            if dropped:
+                lowest = min(means[i] for i in dropped)
+                raise_by = max(ceiling - lowest, 0) if ceiling is not None else 0
+                for index in dropped:
+                    fitness = means[index] + raise_by
+                    if ceiling is not None and fitness <= ceiling:
+                        fitness = float(numpy.nextafter(ceiling, numpy.inf))
+                    fitnesses[index] = fitness
+                ceiling = max(fitnesses[i] for i in dropped)
+            if on_batch is not None:
+                on_batch([genotypes[i] for i in dropped], [fitnesses[i] for i in dropped])
+            racing = survivors
+            if not racing:
+                break
+        return fitnesses
+
+    def racing_models(self):
+        """
+        @return list: The models in the order they are raced on, cheapest first
+        """
+        return sorted(self.model_paths, key=lambda path: (self.model_cost(path), os.path.basename(path)))
+
+    def model_cost(self, model_path):
+        """
+        How dear a model is to print.  The size of its file, which grows
+        with the number of facets.
+
+        @param str model_path: Path of the model
+        @return number: Its cost
+        """
+        return os.path.getsize(model_path)
+
+    def print_batch(self, model_paths, genotypes):
+        """
+        Prints each genotype on the model at the same position, on one
+        plate, and asks how they came out
+
+        @param list model_paths: The model of each genotype
+        @param list genotypes: Genotypes to print
+        @return list: The fitness of each genotype
+        """
+        path_to_print_exe = '/examples/print_gcode_file.py'
+        profiles = self.get_profiles(genotypes)
+        fitnesses = [self.rejected_fitness] * len(genotypes)
+        printed = list(range(len(genotypes)))
+        try:
+            all_path = self.slice_models(model_paths, profiles)
+        except EvolveProfile.SliceError as e:
+            for index, model_path, error in e.failures:
+                if not isinstance(error, subprocess.CalledProcessError):
+                    raise error
+            # Print the rest of the plate, and reject the failed profiles
+            failed = set(index for index, model_path, error in e.failures)
+            printed = [index for index in printed if index not in failed]
+            all_path = e.path
+        if printed:
             self.check_call([
                 'python', 
                 os.path.join(EvolveProfile.s3g_path, path_to_print_exe),
                 '-f %s' % (all_path)
             ])
-            fitness = self.HCI.ask_fitness(num_models)
-            fitnesses.extend(fitness)
-            copy_genotypes = copy_genotypes[num_models:]
+            for index, fitness in zip(printed, self.HCI.ask_fitness(len(printed))):
+                fitnesses[index] = fitness
         return fitnesses
 
+    def evaluate(self, genotype):
+        """
+        Gets the fitness of a single genotype, e.g. for a steady state run
+
+        @param Genotype genotype: The genotype to evaluate
+        @return fitness: Its fitness
+        """
+        return self.ascertain_fitness([genotype])[0]
+
+    def models_fingerprint(self):
+        """
+        Fingerprints what a genotype is printed with: the models and the
+        master profile merged into every profile.  Used to key a FitnessCache.
+
+        @return str: Hex digest of the models and the master profile
+        """
+        digest = hashlib.sha1(json.dumps(self.master_profile, sort_keys=True).encode('utf-8'))
+        for model_path in sorted(self.model_paths, key=os.path.basename):
+            with open(model_path, 'rb') as f:
+                digest.update(hashlib.sha1(f.read()).digest())
+        return digest.hexdigest()
+
     def get_profiles(self, genotypes):
         profiles = [genotype.profile for genotype in genotypes]
         return profiles
@@ -93,28 +238,73 @@ class PhysicalFitnessCalculator(object):
         return path
 
     def slice_models(self, model_paths, profiles):
+        """
+        Slices each profile for the model at the same position, and joins
+        the G-code in model order.  A slice which fails does not stop the
+        others: the G-code of the ones which worked is still joined, and a
+        SliceError reports the failures once they are all done.
+
+        @param list model_paths: Models to slice
+        @param list profiles: The profile of each model
+        @return str: Path of the joined G-code
+        """
         assert(len(model_paths) == len(profiles)) 
+        results = self.slice_all(model_paths, profiles)
+        failures = []
         with tempfile.NamedTemporaryFile(suffix='.gcode', delete=False) as f:
             allpath = f.name
-            for model_path, profile in zip(model_paths, profiles):
-                info = self._slice(model_path, profile)
+            for index, (model_path, (info, error)) in enumerate(zip(model_paths, results)):
+                if error is not None:
+                    failures.append((index, model_path, error))
+                    continue
                 for code in self._create_transition(model_path):
                     f.write(code)
                 with open(info['output_path']) as o:
                     f.write(o.read())
+        if failures:
+            raise EvolveProfile.SliceError(allpath, failures)
         return allpath
 
+    def slice_all(self, model_paths, profiles):
+        """
+        Slices each profile for the model at the same position, up to
+        slice_workers at once
+
+        @param list model_paths: Models to slice
+        @param list profiles: The profile of each model
+        @return list: An (info, error) pair per model, in order: the output of _slice and
+            None, or None and the exception slicing raised
+        """
+        jobs = list(zip(model_paths, profiles))
+        workers = self.slice_workers or multiprocessing.cpu_count()
+        workers = max(min(workers, len(jobs)), 1)
+        if workers == 1:
+            return [self._try_slice(job) for job in jobs]
+        # Each slice waits on the slicer process, so threads are enough
+        pool = multiprocessing.pool.ThreadPool(workers)
+        try:
+            return pool.map(self._try_slice, jobs)
+        finally:
+            pool.close()
+            pool.join()
+
+    def _try_slice(self, job):
+        try:
+            return self._slice(*job), None
+        except Exception as e:
+            return None, e
+
     def _slice(self, model_path, profile):
         assert(os.path.exists(model_path))
         with tempfile.NamedTemporaryFile(suffix='.gcode', delete=False) as f:
             output_path = f.name
-        total_profile = self.master_profile.copy()
-        total_profile.update(profile)
+        total_profile = EvolveProfile.merge_profile(self.master_profile, profile)
         profile_path = self.write_out_profile(total_profile)
         call = self.build_call(model_path, output_path, profile_path)
         try:
             self.check_call(call)
-        except Exception as e:
+        except OSError as e:
+            # The slicer itself is missing, rather than failing on the profile
             print("Make sure MG is in your path bro.")
             raise e
         return {
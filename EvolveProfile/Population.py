@@ -0,0 +1,258 @@
+"""
+A whole population of genomes, stored as a matrix.
+
+Each row is a genome and each column is a slot of the schema.  Range ('r')
+columns hold the value itself, list ('l') columns hold the index of the
+chosen option.  Randomizing, mutating and crossing over act on the whole
+matrix at once, so the cost of a generation does not depend on creating
+a python object per genome.
+"""
+
+from __future__ import absolute_import, division
+
+import numpy
+
+import EvolveProfile
+
+class Population(object):
+
+    def __init__(self, schema, genes=None, rng=None):
+        """
+        @param ProfileSchema schema: The schema every genome in this population uses
+        @param numpy.ndarray genes: One row per genome, one column per slot
+        @param RandomStream rng: Stream to draw from, the default stream if not given
+        """
+        self.schema = schema
+        self.rng = rng if rng is not None else EvolveProfile.default_stream
+        if genes is None:
+            genes = numpy.empty((0, len(schema)))
+        self.genes = genes
+        self.options = []
+        lows = []
+        highs = []
+        for spec in schema.specs:
+            if spec[0] == 'l':
+                self.options.append(list(spec[1:]))
+                lows.append(0)
+                highs.append(len(spec) - 2)
+            else:
+                self.options.append(None)
+                lows.append(spec[1])
+                highs.append(spec[2])
+        self.lows = numpy.array(lows, dtype=float)
+        self.highs = numpy.array(highs, dtype=float)
+        # Columns which only take whole values: list indices and int ranges
+        self.discrete = numpy.array(
+            [spec[0] == 'l' or isinstance(spec[1], int) for spec in schema.specs],
+            dtype=bool,
+        )
+        self.ranged = numpy.array([options is None for options in self.options], dtype=bool)
+        self.span = numpy.where(self.highs > self.lows, self.highs - self.lows, 1)
+
+    def __len__(self):
+        return self.genes.shape[0]
+
+    def randomize(self, size):
+        """
+        Creates a population of random genomes
+
+        @param int size: Number of genomes to create
+        @return Population: The random population
+        """
+        draws = self.rng.random_sample((size, len(self.schema)))
+        spans = self.highs - self.lows + self.discrete
+        genes = self.lows + draws * spans
+        genes[:, self.discrete] = numpy.floor(genes[:, self.discrete])
+        # A draw of exactly 1 would otherwise land one past the top
+        genes = numpy.minimum(genes, self.highs)
+        return Population(self.schema, genes, self.rng)
+
+    def latin_hypercube(self, size):
+        """
+        Creates a population of genomes which fill the space evenly: each
+        slot's range is cut into size strata, and every stratum is drawn
+        from exactly once, in a random order per slot.
+
+        @param int size: Number of genomes to create
+        @return Population: The population
+        """
+        shape = (size, len(self.schema))
+        strata = numpy.argsort(self.rng.random_sample(shape), axis=0)
+        draws = (strata + self.rng.random_sample(shape)) / max(size, 1)
+        spans = self.highs - self.lows + self.discrete
+        genes = self.lows + draws * spans
+        genes[:, self.discrete] = numpy.floor(genes[:, self.discrete])
+        genes = numpy.minimum(genes, self.highs)
+        return Population(self.schema, genes, self.rng)
+
+    def mutate(self, rate=None, rows=None):
+        """
+        Mutates every slot with probability rate, or exactly one slot of
+        each genome when no rate is given.  A mutated discrete slot always
+        takes a new value: it is drawn from the remaining values.
+
+        @param float rate: Probability of mutating each slot
+        @param numpy.ndarray rows: Which genomes to mutate, all of them if not given
+        @return Population: A mutated copy of this population
+        """
+        shape = self.genes.shape
+        mutable = numpy.flatnonzero(self.highs > self.lows)
+        if rate is not None:
+            mask = self.rng.random_sample(shape) < rate
+        else:
+            mask = numpy.zeros(shape, dtype=bool)
+            if len(mutable):
+                loci = numpy.floor(self.rng.random_sample(shape[0]) * len(mutable)).astype(int)
+                mask[numpy.arange(shape[0]), mutable[numpy.minimum(loci, len(mutable) - 1)]] = True
+        if rows is not None:
+            mask &= numpy.asarray(rows, dtype=bool)[:, None]
+        draws = self.rng.random_sample(shape)
+        resets = self.lows + draws * (self.highs - self.lows)
+        # For discrete slots, pick one of the (high - low) other values and
+        # skip over the current one.
+        others = numpy.floor(self.lows + draws * (self.highs - self.lows))
+        others += others >= self.genes
+        resets = numpy.where(self.discrete, others, resets)
+        # Single valued slots cannot change
+        mask &= self.highs > self.lows
+        return Population(self.schema, numpy.where(mask, resets, self.genes), self.rng)
+
+    def uniform_crossover(self, first, second):
+        """
+        Crosses over pairs of genomes, where each loci has a 50% chance of
+        coming from either parent.
+
+        @param array first: Row index of the first parent of each child
+        @param array second: Row index of the second parent of each child
+        @return Population: One child per pair of parents
+        """
+        first = self.genes[numpy.asarray(first, dtype=int)]
+        second = self.genes[numpy.asarray(second, dtype=int)]
+        mask = self.rng.random_sample(first.shape) > .5
+        return Population(self.schema, numpy.where(mask, first, second), self.rng)
+
+    def take(self, indices):
+        """
+        @param array indices: Rows to take
+        @return Population: The population made up of those rows
+        """
+        return Population(self.schema, self.genes[numpy.asarray(indices, dtype=int)], self.rng)
+
+    def extend(self, other):
+        """
+        @param Population other: Population to append to this one
+        """
+        self.genes = numpy.vstack([self.genes, other.genes])
+
+    def features(self):
+        """
+        The genomes as points in the unit cube, for a model of fitness:
+        range columns are scaled to [0, 1], and list columns are one-hot
+        encoded and scaled so any two different options are 1 apart.
+
+        @return numpy.ndarray: One row per genome
+        """
+        columns = []
+        for column, options in enumerate(self.options):
+            genes = self.genes[:, column]
+            if options is None:
+                columns.append(((genes - self.lows[column]) / self.span[column])[:, None])
+            else:
+                one_hot = genes[:, None] == numpy.arange(len(options))[None, :]
+                columns.append(one_hot / numpy.sqrt(2))
+        if not columns:
+            return numpy.zeros((len(self), 0))
+        return numpy.hstack(columns)
+
+    def unit(self):
+        """
+        @return numpy.ndarray: The range columns, scaled to [0, 1]
+        """
+        return (self.genes[:, self.ranged] - self.lows[self.ranged]) / self.span[self.ranged]
+
+    def from_unit(self, unit, categories):
+        """
+        The inverse of unit: points outside the unit cube are clipped onto
+        it, and int ranges are rounded to the nearest whole value.
+
+        @param numpy.ndarray unit: One row per genome, one column per range column
+        @param numpy.ndarray categories: Option indices, one column per list column
+        @return Population: The population holding those genomes
+        """
+        genes = numpy.empty((len(unit), len(self.schema)))
+        values = self.lows[self.ranged] + numpy.clip(unit, 0, 1) * self.span[self.ranged]
+        discrete = self.discrete[self.ranged]
+        values[:, discrete] = numpy.round(values[:, discrete])
+        genes[:, self.ranged] = values
+        genes[:, ~self.ranged] = categories
+        return Population(self.schema, genes, self.rng)
+
+    def encode(self, slots):
+        """
+        @param list slots: Slot values, in schema order
+        @return list: Row of the matrix for those slots
+        """
+        row = []
+        for options, slot in zip(self.options, slots):
+            row.append(options.index(slot) if options is not None else slot)
+        return row
+
+    def decode(self, row):
+        """
+        @param list row: Row of the matrix
+        @return list: Slot values for that row, in schema order
+        """
+        slots = []
+        for options, spec, gene in zip(self.options, self.schema.specs, row):
+            if options is not None:
+                slots.append(options[int(gene)])
+            elif isinstance(spec[1], int):
+                slots.append(int(gene))
+            else:
+                slots.append(float(gene))
+        return slots
+
+    def from_genotypes(self, genotypes):
+        """
+        @param list genotypes: Genotypes sharing this population's schema
+        @return Population: The population holding those genotypes
+        """
+        # Encoded a column at a time, as encode would a row at a time
+        slots = numpy.empty((len(genotypes), len(self.schema)), dtype=object)
+        for row, genotype in enumerate(genotypes):
+            slots[row] = genotype.slots
+        genes = numpy.empty(slots.shape)
+        for column, options in enumerate(self.options):
+            if options is None:
+                genes[:, column] = slots[:, column]
+                continue
+            indices = numpy.full(len(genotypes), -1)
+            # The first option equal to a slot wins, as with list.index
+            for index in reversed(range(len(options))):
+                indices[slots[:, column] == options[index]] = index
+            if (indices < 0).any():
+                raise ValueError('%r is not an option' % (slots[indices.argmin(), column],))
+            genes[:, column] = indices
+        return Population(self.schema, genes, self.rng)
+
+    def to_genotypes(self, profilemap):
+        """
+        @param dict profilemap: Map of the profile the genotypes use
+        @return list: A Genotype for each row of this population
+        """
+        # Decoded a column at a time, as decode would a row at a time
+        slots = numpy.empty(self.genes.shape, dtype=object)
+        for column, (options, spec) in enumerate(zip(self.options, self.schema.specs)):
+            genes = self.genes[:, column]
+            if options is not None:
+                choices = numpy.empty(len(options), dtype=object)
+                choices[:] = options
+                slots[:, column] = choices[genes.astype(int)]
+            elif isinstance(spec[1], int):
+                slots[:, column] = genes.astype(int)
+            else:
+                slots[:, column] = genes
+        return [
+            EvolveProfile.Genotype(profilemap, schema=self.schema, slots=row, rng=self.rng)
+            for row in slots.tolist()
+        ]
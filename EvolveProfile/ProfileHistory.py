@@ -0,0 +1,122 @@
+"""
+A history of evaluated profiles on disk, for warm starting new runs.
+
+Every scored genotype is kept in an SQLite database as its profile and
+fitness, along with the printer, material and models it was printed with.
+Profiles are kept as profiles rather than genomes, so a run with a changed
+profilemap can still start from them once they are repaired (see
+ProfileSchema.repair).
+"""
+
+from __future__ import unicode_literals, print_function, division
+
+import json
+import numbers
+import sqlite3
+import time
+
+import EvolveProfile
+
+class ProfileHistory(object):
+
+    def __init__(self, path, printer='', material='', models=''):
+        """
+        @param str path: Path of the database, created if it does not exist
+        @param str printer: Name of the printer
+        @param str material: Name of the material printed
+        @param str models: Fingerprint of the models printed, see
+            PhysicalFitnessCalculator.models_fingerprint
+        """
+        self.path = path
+        self.printer = printer
+        self.material = material
+        self.models = models
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS history ('
+                'printer TEXT NOT NULL, material TEXT NOT NULL, models TEXT NOT NULL, '
+                'profile TEXT NOT NULL, fitness REAL NOT NULL, recorded REAL NOT NULL)'
+            )
+
+    def __len__(self):
+        """
+        @return int: Number of profiles recorded for this printer and material
+        """
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM history WHERE printer = ? AND material = ?',
+            (self.printer, self.material),
+        ).fetchone()[0]
+
+    def record(self, genotypes):
+        """
+        Records scored genotypes.  Fitnesses which are not a single number
+        are skipped.
+
+        @param list genotypes: Evaluated genotypes
+        """
+        now = time.time()
+        rows = [
+            (self.printer, self.material, self.models,
+             json.dumps(genotype.profile, sort_keys=True), float(genotype.fitness), now)
+            for genotype in genotypes
+            if isinstance(genotype.fitness, numbers.Real) and not isinstance(genotype.fitness, bool)
+        ]
+        with self.connection:
+            self.connection.executemany('INSERT INTO history VALUES (?, ?, ?, ?, ?, ?)', rows)
+
+    def profiles(self):
+        """
+        Profiles printed on this printer with this material, those of the
+        same models first, fittest first
+
+        @return generator: (profile, fitness) pairs
+        """
+        rows = self.connection.execute(
+            'SELECT profile, fitness FROM history WHERE printer = ? AND material = ? '
+            'ORDER BY models = ? DESC, fitness DESC, recorded DESC',
+            (self.printer, self.material, self.models),
+        )
+        for profile, fitness in rows:
+            yield json.loads(profile), fitness
+
+    def seed(self, profilemap, size, rng=None, past_fraction=.5):
+        """
+        Starting genotypes for a run: the fittest distinct profiles of the
+        history, repaired to the profilemap, and genomes which fill the rest
+        of the space evenly (see Population.latin_hypercube).
+
+        @param dict profilemap: Map of the profile the run uses
+        @param int size: Number of genotypes, e.g. the population size
+        @param RandomStream rng: Stream to draw from, the default stream if not given
+        @param float past_fraction: Largest share of the genotypes taken from the history
+        @return list: The genotypes, past ones first.  Their fitness is not set, as the
+            profilemap may have changed what they print.
+        """
+        rng = rng if rng is not None else EvolveProfile.default_stream
+        schema = EvolveProfile.ProfileSchema(profilemap)
+        wanted = int(size * past_fraction)
+        seeds = []
+        known = set()
+        for profile, fitness in self.profiles():
+            if len(seeds) >= wanted:
+                break
+            genotype = EvolveProfile.Genotype(
+                profilemap, schema=schema, slots=schema.repair(profile, rng), rng=rng,
+            )
+            if genotype.fingerprint not in known:
+                known.add(genotype.fingerprint)
+                seeds.append(genotype)
+        space = EvolveProfile.Population(schema, rng=rng)
+        for genotype in space.latin_hypercube(size - len(seeds)).to_genotypes(profilemap):
+            if genotype.fingerprint not in known:
+                known.add(genotype.fingerprint)
+                seeds.append(genotype)
+        missing = size - len(seeds)
+        if missing > 0:
+            # Only in a space too small to hold size distinct genomes
+            seeds.extend(space.randomize(missing).to_genotypes(profilemap))
+        return seeds
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,295 @@
+"""
+A compiled, flat layout of a profilemap.
+
+The profilemap is walked once, and every evolvable entry becomes a slot
+with a fixed position.  Genotypes built from the same profilemap share one
+schema, so the variation operators work on a flat list of slots and the
+nested profile is only built when it is handed off to the slicer.
+
+Besides dicts, a profilemap can hold lists of dicts, which address the
+entries of a list in the profile by index (e.g. one entry per extruder in
+extruderProfiles).  A null in such a list leaves that index alone.
+"""
+
+from __future__ import absolute_import
+
+import hashlib
+import json
+
+import EvolveProfile
+
+class ProfileSchema(object):
+
+    def __init__(self, profilemap):
+        self.profilemap = profilemap
+        self.paths = []
+        self.specs = []
+        # Internal nodes of the profile, as (parent node, key, size) triples,
+        # where size is the length of a list node and None for a dict node.
+        # Node 0 is the root of the profile.
+        self.nodes = [(None, None, None)]
+        # Parent node and key of each slot
+        self.leaves = []
+        self._compile(profilemap, (), 0)
+        self.index = dict((path, i) for i, path in enumerate(self.paths))
+        self.accessors = [Accessor(path) for path in self.paths]
+        # Slots which can take more than one value
+        self.mutable = [i for i, spec in enumerate(self.specs) if EvolveProfile.can_mutate(spec)]
+        self.fingerprint = hashlib.sha1(
+            json.dumps([self.paths, self.specs]).encode('utf-8')
+        ).hexdigest()
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __eq__(self, other):
+        if not isinstance(other, ProfileSchema):
+            return NotImplemented
+        return self.fingerprint == other.fingerprint
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def _compile(self, profilemap, prefix, parent):
+        """
+        Walks a profilemap, recording a slot for each of its entries.  Dict
+        keys are visited in sorted order and list indices in order, so the
+        layout is the same on every run.
+
+        @param dict profilemap: The (sub)profilemap to compile, a dict or a list of dicts
+        @param tuple prefix: Keys leading to this profilemap
+        @param int parent: Index of the node this profilemap is compiled into
+        """
+        if isinstance(profilemap, dict):
+            keys = sorted(profilemap)
+        else:
+            keys = range(len(profilemap))
+        for key in keys:
+            entry = profilemap[key]
+            if entry is None:
+                continue
+            if isinstance(entry, dict) or is_list_node(entry):
+                size = len(entry) if isinstance(entry, list) else None
+                self.nodes.append((parent, key, size))
+                self._compile(entry, prefix + (key,), len(self.nodes) - 1)
+            else:
+                self.paths.append(prefix + (key,))
+                self.specs.append(entry)
+                self.leaves.append((parent, key))
+
+    @staticmethod
+    def randomize_value(spec, rng=None):
+        """
+        Creates a random value for a profilemap entry.  For more on these
+        entries, read the README.md file in the root of this repo
+
+        @param list spec: Profilemap entry to randomize
+        @param RandomStream rng: Stream to draw from, the default stream if not given
+        @return value: Randomized value
+        """
+        rng = rng if rng is not None else EvolveProfile.default_stream
+        rval = None
+        if spec[0] == 'r':
+            minimum = spec[1]
+            maximum = spec[2]
+            if isinstance(minimum, int):
+                rval = rng.randint(minimum, maximum)
+            elif isinstance(minimum, float):
+                rval = rng.uniform(minimum, maximum)
+        elif spec[0] == 'l':
+            rval = rng.choice(spec[1:])
+        return rval
+
+    def randomize(self, rng=None):
+        """
+        @param RandomStream rng: Stream to draw from, the default stream if not given
+        @return list: A random value for every slot
+        """
+        return [self.randomize_value(spec, rng) for spec in self.specs]
+
+    def repair(self, profile, rng=None):
+        """
+        Fits a profile evolved under another profilemap to this schema:
+        entries the profilemap no longer has are dropped, ranges are
+        clamped (and int ranges rounded), and entries which are new, or
+        hold an option the list no longer has, are randomized.
+
+        @param dict profile: A profile, e.g. from a ProfileHistory
+        @param RandomStream rng: Stream to draw from, the default stream if not given
+        @return list: Slot values, in schema order
+        """
+        slots = []
+        for spec, value in zip(self.specs, self.flatten(profile)):
+            if spec[0] == 'r' and isinstance(value, (int, float)) and not isinstance(value, bool):
+                value = min(max(value, spec[1]), spec[2])
+                value = int(round(value)) if isinstance(spec[1], int) else float(value)
+            elif spec[0] == 'r' or value not in spec[1:]:
+                value = self.randomize_value(spec, rng)
+            slots.append(value)
+        return slots
+
+    def build_profile(self, slots):
+        """
+        Materializes the nested profile for a list of slots.
+
+        @param list slots: Slot values, in schema order
+        @return dict: A profile with the same structure as the profilemap
+        """
+        nodes = [_new_container(size) for parent, key, size in self.nodes]
+        for i in range(1, len(nodes)):
+            parent, key, size = self.nodes[i]
+            nodes[parent][key] = nodes[i]
+        for (parent, key), value in zip(self.leaves, slots):
+            nodes[parent][key] = value
+        return nodes[0]
+
+    def flatten(self, profile):
+        """
+        Reads the slots out of a nested profile.  Entries missing from the
+        profile are read as None.
+
+        @param dict profile: A profile with the same structure as the profilemap
+        @return list: Slot values, in schema order
+        """
+        return [accessor.get(profile) for accessor in self.accessors]
+
+    def assoc(self, profile, index, value):
+        """
+        Sets one slot of a profile without changing the profile.  Only the
+        dicts and lists on the path to the slot are copied, the rest are
+        shared with the original profile.
+
+        @param dict profile: A profile with the same structure as the profilemap
+        @param int index: The slot to set
+        @param value: The new value for the slot
+        @return dict: The updated profile
+        """
+        root = node = dict(profile)
+        for key in self.paths[index][:-1]:
+            child = node[key] if _has_key(node, key) else None
+            child = list(child) if isinstance(child, list) else dict(child or {})
+            node[key] = child
+            node = child
+        self.accessors[index].set(root, value)
+        return root
+
+class Accessor(object):
+    """
+    Reads and writes the entry at a fixed path of a profile.  The path is
+    split up front, so each access is a fixed number of lookups.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.parents = path[:-1]
+        self.key = path[-1]
+
+    def get(self, profile):
+        """
+        @param dict profile: The profile to read from
+        @return value: The entry, or None if the profile does not have it
+        """
+        node = profile
+        for key in self.path:
+            if not _has_key(node, key):
+                return None
+            node = node[key]
+        return node
+
+    def set(self, profile, value):
+        """
+        Writes the entry in place.  Every dict and list on the way to the
+        entry must exist.
+
+        @param dict profile: The profile to write to
+        @param value: The new value
+        """
+        node = profile
+        for key in self.parents:
+            node = node[key]
+        node[self.key] = value
+
+def is_list_node(entry):
+    """
+    @param entry: A profilemap entry
+    @return bool: True if the entry is a list of (sub)profilemaps, rather than an 'r' or 'l' entry
+    """
+    return (
+        isinstance(entry, list) and len(entry) > 0 and
+        all(isinstance(item, (dict, list)) or item is None for item in entry)
+    )
+
+def _new_container(size):
+    return {} if size is None else [None] * size
+
+def _has_key(node, key):
+    if isinstance(node, dict):
+        return key in node
+    if isinstance(node, list):
+        return isinstance(key, int) and 0 <= key < len(node)
+    return False
+
+def merge_profile(master, profile):
+    """
+    Overlays a profile onto a master profile without changing either.
+    Dicts are merged key by key and lists index by index, where a None in
+    a list of the profile keeps the master's entry.
+
+    @param dict master: The full profile
+    @param dict profile: The (partial) profile to lay over it
+    @return dict: The merged profile
+    """
+    if isinstance(master, dict) and isinstance(profile, dict):
+        merged = dict(master)
+        for key, value in profile.items():
+            merged[key] = merge_profile(master[key], value) if key in master else value
+        return merged
+    if isinstance(master, list) and isinstance(profile, list):
+        merged = list(master) + [None] * (len(profile) - len(master))
+        for i, value in enumerate(profile):
+            if value is not None:
+                merged[i] = merge_profile(merged[i], value) if i < len(master) else value
+        return merged
+    return profile
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError('Profiles are read-only, set a new profile on the genotype instead')
+
+class FrozenDict(dict):
+    """
+    A dict of a genotype's profile, which cannot be changed in place as it
+    is shared with the genotype's copies.  dict(frozen) makes a plain copy.
+    """
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+class FrozenList(list):
+    """
+    A list of a genotype's profile, which cannot be changed in place as it
+    is shared with the genotype's copies.  list(frozen) makes a plain copy.
+    """
+    __setitem__ = __delitem__ = __setslice__ = __delslice__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = reverse = sort = _read_only
+
+    def __reduce__(self):
+        return FrozenList, (list(self),)
+
+def freeze_profile(profile):
+    """
+    Makes a read-only copy of a profile.  Frozen dicts and lists are taken
+    as they are, so freezing a profile made by ProfileSchema.assoc only
+    copies the path to the changed slot.
+
+    @param dict profile: The profile to freeze
+    @return FrozenDict: The frozen profile
+    """
+    if isinstance(profile, (FrozenDict, FrozenList)):
+        return profile
+    if isinstance(profile, dict):
+        return FrozenDict((key, freeze_profile(value)) for key, value in profile.items())
+    if isinstance(profile, list):
+        return FrozenList(freeze_profile(value) for value in profile)
+    return profile
@@ -0,0 +1,90 @@
+"""
+Seeded random number streams.
+
+A RandomStream is threaded through everything that draws random numbers,
+so a run can be replayed exactly from its seed.  Streams spawned from a
+stream are derived from its seed and their position, so parallel workers
+each draw an independent stream which is still reproducible.
+"""
+
+from __future__ import absolute_import
+
+import binascii
+import hashlib
+import json
+import os
+import random
+import struct
+
+import numpy
+
+class RandomStream(object):
+
+    def __init__(self, seed=None, key=()):
+        """
+        @param int seed: Seed of the run.  A random seed is picked if not given
+        @param tuple key: Position of this stream in the tree of spawned streams
+        """
+        if seed is None:
+            seed = int(binascii.hexlify(os.urandom(8)), 16)
+        self.seed = seed
+        self.key = tuple(key)
+        self.spawned = 0
+        digest = hashlib.sha256(json.dumps([seed, self.key]).encode('utf-8')).digest()
+        words = struct.unpack('<8I', digest)
+        self.python = random.Random(int(binascii.hexlify(digest), 16))
+        # Used for vectorized draws over whole populations
+        self.numpy = numpy.random.RandomState(numpy.array(words, dtype=numpy.uint32))
+
+    def spawn(self, count):
+        """
+        Creates child streams.  Spawning the same number of children in the
+        same order always gives the same streams.
+
+        @param int count: Number of streams to create
+        @return list: The child streams
+        """
+        children = [
+            RandomStream(self.seed, self.key + (self.spawned + i,))
+            for i in range(count)
+        ]
+        self.spawned += count
+        return children
+
+    def getstate(self):
+        """
+        @return tuple: The state of this stream, to be restored with setstate
+        """
+        return self.python.getstate(), self.numpy.get_state(), self.spawned
+
+    def setstate(self, state):
+        python_state, numpy_state, spawned = state
+        self.python.setstate(python_state)
+        self.numpy.set_state(numpy_state)
+        self.spawned = spawned
+
+    def random_sample(self, size=None):
+        return self.numpy.random_sample(size)
+
+    def uniform(self, a, b):
+        return self.python.uniform(a, b)
+
+    def randint(self, a, b):
+        return self.python.randint(a, b)
+
+    def randrange(self, *args):
+        return self.python.randrange(*args)
+
+    def choice(self, seq):
+        return self.python.choice(seq)
+
+    def sample(self, population, k):
+        return self.python.sample(population, k)
+
+    def gauss(self, mu, sigma):
+        return self.python.gauss(mu, sigma)
+
+    def random(self):
+        return self.python.random()
+
+default_stream = RandomStream()
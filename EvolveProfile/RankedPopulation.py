@@ -0,0 +1,115 @@
+"""
+Genotypes kept in order of fitness.
+
+Members are kept in a sorted array, fittest first, and each one gets a
+stable id when it is added.  Adding a member costs O(log n) comparisons,
+and the top k members, or truncating to them, cost O(k).  Unscored (None)
+fitnesses rank below every scored one, and ties keep the order members
+were added in.
+"""
+
+from __future__ import absolute_import
+
+import bisect
+import itertools
+
+class RankedPopulation(object):
+
+    def __init__(self, genotypes=()):
+        """
+        @param list genotypes: Genotypes to start with
+        """
+        self._ids = itertools.count()
+        self._members = {}
+        self._keys = []
+        for genotype in genotypes:
+            key = (self._rank(genotype.fitness), next(self._ids))
+            self._members[key[1]] = genotype
+            self._keys.append(key)
+        self._keys.sort()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        """
+        Iterates over the members, fittest first
+        """
+        for rank, member_id in self._keys:
+            yield self._members[member_id]
+
+    def __contains__(self, member_id):
+        return member_id in self._members
+
+    @staticmethod
+    def _rank(fitness):
+        return float('inf') if fitness is None else -fitness
+
+    def add(self, genotype):
+        """
+        Adds a genotype, ranked by its current fitness.  A genotype whose
+        fitness changes has to be removed and added again.
+
+        @param Genotype genotype: The genotype to add
+        @return int: The id of the new member
+        """
+        member_id = next(self._ids)
+        self._members[member_id] = genotype
+        bisect.insort(self._keys, (self._rank(genotype.fitness), member_id))
+        return member_id
+
+    def remove(self, member_id):
+        """
+        @param int member_id: Id of the member to remove
+        @return Genotype: The removed genotype
+        """
+        genotype = self._members.pop(member_id)
+        key = (self._rank(genotype.fitness), member_id)
+        del self._keys[bisect.bisect_left(self._keys, key)]
+        return genotype
+
+    def get(self, member_id):
+        return self._members[member_id]
+
+    def at(self, position):
+        """
+        @param int position: Position in order of fitness, 0 being the fittest
+        @return Genotype: The member at that position
+        """
+        return self._members[self._keys[position][1]]
+
+    def ids(self):
+        """
+        @return list: Ids of the members, fittest first
+        """
+        return [member_id for rank, member_id in self._keys]
+
+    def best(self):
+        """
+        @return Genotype: The fittest member, or None if there are no members
+        """
+        return self._members[self._keys[0][1]] if self._keys else None
+
+    def worst(self):
+        """
+        @return Genotype: The least fit member, or None if there are no members
+        """
+        return self._members[self._keys[-1][1]] if self._keys else None
+
+    def top(self, count):
+        """
+        @param int count: Number of members to get
+        @return list: The count fittest members, fittest first
+        """
+        return [self._members[member_id] for rank, member_id in self._keys[:count]]
+
+    def truncate(self, count):
+        """
+        Keeps only the count fittest members.
+
+        @param int count: Number of members to keep
+        @return list: The dropped genotypes, fittest first
+        """
+        dropped = [self._members.pop(member_id) for rank, member_id in self._keys[count:]]
+        del self._keys[count:]
+        return dropped
@@ -0,0 +1,238 @@
+"""
+Selection operators over an array of fitnesses.
+
+Every operator draws all the parents of a generation at once and returns
+their indices into the fitness array.  Higher fitness is better, and
+unscored (None) fitnesses rank below every scored one.  Operators are
+looked up by name in selection_operators.
+"""
+
+from __future__ import absolute_import, division
+
+import numpy
+
+import EvolveProfile
+
+def fitness_array(genotypes):
+    """
+    @param list genotypes: Genotypes, or anything with a fitness attribute
+    @return numpy.ndarray: Their fitnesses, with -inf for unscored ones
+    """
+    return numpy.array(
+        [-numpy.inf if genotype.fitness is None else genotype.fitness for genotype in genotypes],
+        dtype=float,
+    )
+
+def _draw_indices(size, shape, rng):
+    return numpy.minimum((rng.random_sample(shape) * size).astype(int), size - 1)
+
+def _weighted(weights, count, rng):
+    """
+    Draws count indices with probability proportional to weights.  All
+    indices are equally likely if no weight is positive.
+    """
+    weights = numpy.where(numpy.isfinite(weights), weights, 0)
+    weights = numpy.maximum(weights, 0)
+    cumulative = numpy.cumsum(weights)
+    if cumulative[-1] <= 0:
+        return _draw_indices(len(weights), count, rng)
+    points = rng.random_sample(count) * cumulative[-1]
+    return numpy.searchsorted(cumulative, points, side='right')
+
+def _shifted_weights(fitness):
+    scored = fitness[numpy.isfinite(fitness)]
+    shift = min(scored.min(), 0) if len(scored) else 0
+    return numpy.maximum(numpy.where(numpy.isfinite(fitness), fitness - shift, 0), 0)
+
+def select_tournament(fitness, count, rng, size=3):
+    """
+    Runs count tournaments at once.  The members of each tournament are
+    drawn without replacement, and its fittest member wins.
+
+    @param numpy.ndarray fitness: Fitness of each member of the population
+    @param int count: Number of tournaments
+    @param RandomStream rng: Stream to draw from
+    @param int size: Number of members in each tournament
+    @return numpy.ndarray: Index of the winner of each tournament
+    """
+    if size >= len(fitness):
+        raise EvolveProfile.TournamentSizeError
+    # Floyd's sampling: column j draws from the first n - size + j + 1
+    # members, and takes the last of them instead if the draw is taken, so
+    # every tournament is a uniform draw without replacement in size passes
+    members = numpy.empty((count, size), dtype=int)
+    for column, top in enumerate(range(len(fitness) - size, len(fitness))):
+        draws = _draw_indices(top + 1, count, rng)
+        taken = (members[:, :column] == draws[:, None]).any(axis=1)
+        members[:, column] = numpy.where(taken, top, draws)
+    # Floyd's order is not random, and ties go to the first fittest member
+    order = numpy.argsort(rng.random_sample((count, size)), axis=1)
+    members = members[numpy.arange(count)[:, None], order]
+    best = numpy.argmax(fitness[members], axis=1)
+    return members[numpy.arange(count), best]
+
+def select_rank(fitness, count, rng, size=None):
+    """
+    Draws members with probability proportional to their rank, where the
+    least fit member has rank 1.
+
+    @param numpy.ndarray fitness: Fitness of each member of the population
+    @param int count: Number of members to draw
+    @param RandomStream rng: Stream to draw from
+    @param int size: Unused; accepted so all operators share a signature
+    @return numpy.ndarray: Index of each drawn member
+    """
+    ranks = numpy.empty(len(fitness))
+    ranks[numpy.argsort(fitness, kind='mergesort')] = numpy.arange(1, len(fitness) + 1)
+    return _weighted(ranks, count, rng)
+
+def select_roulette(fitness, count, rng, size=None):
+    """
+    Draws members with probability proportional to their fitness, shifted
+    so the least fit scored member has zero weight when fitnesses are negative.
+
+    @param numpy.ndarray fitness: Fitness of each member of the population
+    @param int count: Number of members to draw
+    @param RandomStream rng: Stream to draw from
+    @param int size: Unused; accepted so all operators share a signature
+    @return numpy.ndarray: Index of each drawn member
+    """
+    return _weighted(_shifted_weights(fitness), count, rng)
+
+def select_stochastic_universal(fitness, count, rng, size=None):
+    """
+    Stochastic universal sampling: count evenly spaced pointers with one
+    random offset are laid over the fitness wheel, which keeps the number of
+    times each member is drawn close to its expected value.
+
+    @param numpy.ndarray fitness: Fitness of each member of the population
+    @param int count: Number of members to draw
+    @param RandomStream rng: Stream to draw from
+    @param int size: Unused; accepted so all operators share a signature
+    @return numpy.ndarray: Index of each drawn member
+    """
+    weights = _shifted_weights(fitness)
+    cumulative = numpy.cumsum(weights)
+    if cumulative[-1] <= 0:
+        return _draw_indices(len(fitness), count, rng)
+    step = cumulative[-1] / count
+    points = (rng.random_sample() + numpy.arange(count)) * step
+    chosen = numpy.searchsorted(cumulative, points, side='right')
+    # The pointers come out in population order; shuffle them so pairing
+    # consecutive draws does not pair neighbours.
+    return chosen[numpy.argsort(rng.random_sample(count))]
+
+# Rounds of redrawing identical pairs through the operator before select_pairs
+# draws the partners from selection_probabilities instead.  It only bounds
+# the work; the partners follow the operator either way.
+_MAX_REDRAWS = 10
+
+selection_operators = {
+    'tournament': select_tournament,
+    'rank': select_rank,
+    'roulette': select_roulette,
+    'sus': select_stochastic_universal,
+}
+
+def select(operator, fitness, count, rng, size=None):
+    """
+    Draws count members with the named selection operator.
+
+    @param str operator: Name of the selection operator
+    @param numpy.ndarray fitness: Fitness of each member of the population
+    @param int count: Number of members to draw
+    @param RandomStream rng: Stream to draw from
+    @param int size: Tournament size, for the operators which use one
+    @return numpy.ndarray: Index of each drawn member
+    """
+    selector = selection_operators.get(operator)
+    if selector is None:
+        raise EvolveProfile.UnknownOperatorError(operator)
+    if size is None:
+        return selector(fitness, count, rng)
+    return selector(fitness, count, rng, size)
+
+def _tournament_probabilities(fitness, size):
+    count = len(fitness)
+    order = numpy.argsort(fitness, kind='mergesort')
+    ranked = fitness[order]
+    # Chance that every member of a tournament is among the m least fit
+    below = numpy.prod(
+        (numpy.arange(count + 1, dtype=float)[:, None] - numpy.arange(size)) / (count - numpy.arange(size)),
+        axis=1,
+    )
+    # Tied members share the chance of the fittest member drawn being one of them
+    starts = numpy.flatnonzero(numpy.r_[True, ranked[1:] != ranked[:-1]])
+    ends = numpy.r_[starts[1:], count]
+    probabilities = numpy.empty(count)
+    probabilities[order] = numpy.repeat((below[ends] - below[starts]) / (ends - starts), ends - starts)
+    return probabilities
+
+def selection_probabilities(operator, fitness, size=None):
+    """
+    The chance of each member being drawn by one draw of the named
+    selection operator.  Operators added to selection_operators without a
+    rule here are taken to draw uniformly.
+
+    @param str operator: Name of the selection operator
+    @param numpy.ndarray fitness: Fitness of each member of the population
+    @param int size: Tournament size, for the operators which use one
+    @return numpy.ndarray: Probability of each member
+    """
+    if operator not in selection_operators:
+        raise EvolveProfile.UnknownOperatorError(operator)
+    if operator == 'tournament':
+        # select_tournament's default size
+        size = size if size is not None else 3
+        if size >= len(fitness):
+            raise EvolveProfile.TournamentSizeError
+        return _tournament_probabilities(fitness, size)
+    if operator == 'rank':
+        weights = numpy.empty(len(fitness))
+        weights[numpy.argsort(fitness, kind='mergesort')] = numpy.arange(1, len(fitness) + 1)
+    elif operator in ('roulette', 'sus'):
+        weights = _shifted_weights(fitness)
+    else:
+        weights = numpy.zeros(len(fitness))
+    if weights.sum() <= 0:
+        return numpy.full(len(fitness), 1. / len(fitness))
+    return weights / weights.sum()
+
+def select_pairs(operator, fitness, count, rng, size=None):
+    """
+    Draws count pairs of parents, where the two parents of a pair are
+    always different members.
+
+    @param str operator: Name of the selection operator
+    @param numpy.ndarray fitness: Fitness of each member of the population
+    @param int count: Number of pairs
+    @param RandomStream rng: Stream to draw from
+    @param int size: Tournament size, for the operators which use one
+    @return numpy.ndarray: A (count, 2) array of member indices
+    """
+    if len(fitness) < 2:
+        raise EvolveProfile.TournamentSizeError
+    pairs = select(operator, fitness, 2 * count, rng, size).reshape((count, 2))
+    same = pairs[:, 0] == pairs[:, 1]
+    redraws = 0
+    while same.any() and redraws < _MAX_REDRAWS:
+        pairs[same, 1] = select(operator, fitness, same.sum(), rng, size)
+        same = pairs[:, 0] == pairs[:, 1]
+        redraws += 1
+    # Draw the partners still left over from the operator's chances with the
+    # first parent taken out, which is what redrawing until they differ
+    # would come to.  When no other member can be drawn at all, pair the
+    # first parent with any other member.
+    rows = numpy.flatnonzero(same)
+    if len(rows):
+        probabilities = selection_probabilities(operator, fitness, size)
+        for first in numpy.unique(pairs[rows, 0]):
+            group = rows[pairs[rows, 0] == first]
+            weights = probabilities.copy()
+            weights[first] = 0
+            if weights.sum() > 0:
+                pairs[group, 1] = _weighted(weights, len(group), rng)
+            else:
+                other = _draw_indices(len(fitness) - 1, len(group), rng)
+                pairs[group, 1] = other + (other >= first)
+    return pairs
@@ -0,0 +1,154 @@
+"""
+A fitness calculator which only slices, for a cheap first tier of
+evaluation (see TieredFitnessCalculator).
+
+Every genotype is sliced on the cheapest model and scored from the G-code
+alone: a profile which does not slice, extrudes nothing, mostly travels or
+takes too long is rejected, and the others score the minus minutes their
+print would take.
+"""
+
+from __future__ import unicode_literals, print_function, division
+
+import hashlib
+import json
+import math
+import subprocess
+
+import EvolveProfile
+
+_EXTRUDERS = ('A', 'B', 'E')
+
+def slice_metrics(gcode_path):
+    """
+    Measures a G-code file.  Extruder axes (A, B, E) are taken as absolute
+    and reset with G92.
+
+    @param str gcode_path: Path of the G-code
+    @return dict:
+        moves: Number of moves
+        time: Estimated seconds the moves take at their feedrates
+        extrusion: Length of filament extruded
+        extruding: Distance travelled while extruding
+        travel: Distance travelled without extruding
+        travel_ratio: Share of the distance travelled without extruding
+        layers: Number of heights anything was extruded at
+    """
+    position = {'X': 0., 'Y': 0., 'Z': 0.}
+    extruders = dict((axis, 0.) for axis in _EXTRUDERS)
+    feedrate = None
+    metrics = {'moves': 0, 'time': 0., 'extrusion': 0., 'extruding': 0., 'travel': 0.}
+    layers = set()
+    with open(gcode_path) as f:
+        for line in f:
+            words = line.split(';', 1)[0].split()
+            if not words or words[0] not in ('G0', 'G1', 'G92'):
+                continue
+            values = {}
+            for word in words[1:]:
+                try:
+                    values[word[0].upper()] = float(word[1:])
+                except ValueError:
+                    continue
+            if words[0] == 'G92':
+                for axis, value in values.items():
+                    if axis in position:
+                        position[axis] = value
+                    elif axis in extruders:
+                        extruders[axis] = value
+                continue
+            if 'F' in values:
+                feedrate = values['F']
+            distance = math.sqrt(sum(
+                (values[axis] - position[axis]) ** 2 for axis in position if axis in values
+            ))
+            extruded = sum(
+                max(values[axis] - extruders[axis], 0) for axis in extruders if axis in values
+            )
+            position.update((axis, values[axis]) for axis in position if axis in values)
+            extruders.update((axis, values[axis]) for axis in extruders if axis in values)
+            metrics['moves'] += 1
+            metrics['extrusion'] += extruded
+            if extruded > 0:
+                metrics['extruding'] += distance
+                layers.add(position['Z'])
+            else:
+                metrics['travel'] += distance
+            if feedrate:
+                metrics['time'] += distance / (feedrate / 60)
+    moved = metrics['extruding'] + metrics['travel']
+    metrics['travel_ratio'] = metrics['travel'] / moved if moved else 1.
+    metrics['layers'] = len(layers)
+    return metrics
+
+class SliceFitnessCalculator(EvolveProfile.PhysicalFitnessCalculator):
+
+    def __init__(self, model_dir, profile_path=None):
+        """
+        @param str model_dir: Directory of the models, the cheapest of which is sliced
+        @param str profile_path: Master profile merged into every profile
+        """
+        super(SliceFitnessCalculator, self).__init__(model_dir, profile_path)
+        # Rejected genotypes get rejected_fitness, which should be below any
+        # fitness the tiers after this one give.  Share of the distance a
+        # print may travel without extruding before it is rejected:
+        self.max_travel_ratio = .8
+        # Seconds a print may take, None for no limit
+        self.max_time = None
+
+    def models_fingerprint(self):
+        """
+        Fingerprints the models and master profile, as a physical
+        calculator does, along with the limits a print is rejected on
+
+        @return str: Hex digest
+        """
+        limits = json.dumps(['slice', self.max_travel_ratio, self.max_time, self.rejected_fitness])
+        digest = hashlib.sha1(limits.encode('utf-8'))
+        digest.update(super(SliceFitnessCalculator, self).models_fingerprint().encode('utf-8'))
+        return digest.hexdigest()
+
+    def ascertain_fitness(self, genotypes, on_batch=None):
+        """
+        Slices the genotypes, slice_workers at once, without printing them
+
+        @param list genotypes: Genotypes to evaluate
+        @param function on_batch: Called with the genotypes and their fitnesses once
+            they are all sliced
+        @return list: The fitness of each genotype
+        """
+        model_path = self.racing_models()[0]
+        results = self.slice_all([model_path] * len(genotypes), self.get_profiles(genotypes))
+        fitnesses = []
+        for info, error in results:
+            if isinstance(error, subprocess.CalledProcessError):
+                # The slicer gave up on the profile
+                metrics = None
+            elif error is not None:
+                raise error
+            else:
+                metrics = slice_metrics(info['output_path'])
+            fitnesses.append(self.score(metrics))
+        if on_batch is not None:
+            on_batch(genotypes, fitnesses)
+        return fitnesses
+
+    def degenerate(self, metrics):
+        """
+        @param dict metrics: Metrics of a sliced genotype, see slice_metrics
+        @return bool: True if the G-code is not worth printing
+        """
+        return (
+            metrics['extrusion'] <= 0 or metrics['extruding'] <= 0 or
+            metrics['travel_ratio'] > self.max_travel_ratio or
+            (self.max_time is not None and metrics['time'] > self.max_time)
+        )
+
+    def score(self, metrics):
+        """
+        @param dict metrics: Metrics of a sliced genotype, None if it did not slice
+        @return float: Its fitness, rejected_fitness if it did not slice or is degenerate
+        """
+        if metrics is None or self.degenerate(metrics):
+            return self.rejected_fitness
+        return -metrics['time'] / 60
@@ -0,0 +1,137 @@
+"""
+A steady state genetic algorithm, which breeds as soon as fitness arrives.
+
+Instead of waiting for a whole generation to be evaluated, every result
+is inserted into the population as soon as it comes back, the least fit
+member is dropped, and a new child is bred and sent off right away.  The
+slicer and printers never wait on the slowest member of a generation.
+"""
+
+from __future__ import unicode_literals, print_function
+
+from multiprocessing.pool import ThreadPool
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+import EvolveProfile
+
+class SteadyStateGeneticAlgorithm(EvolveProfile.GeneticAlgorithm):
+
+    @property
+    def population(self):
+        """
+        The scored members, fittest first, followed by the members waiting
+        to be evaluated for the first time
+        """
+        return list(self.ranked) + list(self.unevaluated)
+
+    @population.setter
+    def population(self, population):
+        self.ranked = EvolveProfile.RankedPopulation(
+            genotype for genotype in population if genotype.fitness is not None
+        )
+        self.unevaluated = [genotype for genotype in population if genotype.fitness is None]
+
+    def _tournament(self, exclude=None):
+        """
+        Runs a tournament over the scored members.  They are kept in order
+        of fitness, so the winner is the drawn member with the lowest
+        position, and a tournament costs O(tournament_size).
+
+        @param int exclude: Position of a member which may not take part
+        @return int: Position of the winner
+        """
+        entrants = len(self.ranked) - (exclude is not None)
+        size = min(self.tournament_size, entrants)
+        positions = set()
+        while len(positions) < size:
+            position = self.rng.randrange(entrants)
+            if exclude is not None and position >= exclude:
+                position += 1
+            positions.add(position)
+        return min(positions)
+
+    def next_child(self):
+        """
+        Gets the next genotype to evaluate.  The starting members are handed
+        out first; after that a child is bred from the scored members.
+        Children which copy a genotype handed out before are redrawn.
+
+        @return Genotype: The genotype to evaluate
+        """
+        if self.unevaluated:
+            child = self.unevaluated.pop(0)
+        else:
+            child = self._breed()
+            redraws = 0
+            while self.is_duplicate(child) and redraws < self.duplicate_redraws:
+                child = self._breed()
+                redraws += 1
+        # Children still being evaluated count as seen, so they are not bred twice
+        self.hall_of_fame.see([child])
+        return child
+
+    def _breed(self):
+        if len(self.ranked) < 2:
+            return EvolveProfile.Genotype(self.profilemap, schema=self.schema, rng=self.rng)
+        if self.uniform(0, 1) < self.crossover_share():
+            first = self._tournament()
+            second = self._tournament(exclude=first)
+            return self.crossover_child(self.ranked.at(first), self.ranked.at(second))
+        return self.mutate_child(self.ranked.at(self._tournament()))
+
+    def insert(self, genotype, fitness):
+        """
+        Inserts an evaluated genotype and drops the least fit member if the
+        population is full.
+
+        @param Genotype genotype: The evaluated genotype
+        @param fitness: Its fitness
+        """
+        genotype.fitness = fitness
+        self.hall_of_fame.add(genotype)
+        self.ranked.add(genotype)
+        self.ranked.truncate(self.population_size)
+
+    def run(self, evaluate, max_evaluations, workers=1):
+        """
+        Evolves until max_evaluations genotypes have been evaluated, keeping
+        workers evaluations in flight at all times.
+
+        @param function evaluate: Takes a Genotype and returns its fitness.  Called from
+            worker threads.
+        @param int max_evaluations: Number of evaluations to run
+        @param int workers: Number of evaluations to run at the same time
+        @return Genotype: The fittest genotype found
+        """
+        pool = ThreadPool(workers)
+        results = queue.Queue()
+        in_flight = 0
+        submitted = 0
+        try:
+            while in_flight < workers and submitted < max_evaluations:
+                pool.apply_async(_evaluate, (evaluate, self.next_child(), results))
+                in_flight += 1
+                submitted += 1
+            while in_flight > 0:
+                genotype, fitness, error = results.get()
+                in_flight -= 1
+                if error is not None:
+                    raise error
+                self.insert(genotype, fitness)
+                if submitted < max_evaluations:
+                    pool.apply_async(_evaluate, (evaluate, self.next_child(), results))
+                    in_flight += 1
+                    submitted += 1
+        finally:
+            pool.terminate()
+            pool.join()
+        return self.ranked.best()
+
+def _evaluate(evaluate, genotype, results):
+    try:
+        results.put((genotype, evaluate(genotype), None))
+    except Exception as e:
+        results.put((genotype, None, e))
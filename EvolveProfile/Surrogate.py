@@ -0,0 +1,144 @@
+"""
+A cheap model of fitness, used to screen children before they are printed.
+
+Every evaluated genome is kept as an example.  A Gaussian process over the
+genomes' features (see Population.features) predicts the fitness of a
+child along with how unsure it is, and children are screened on the upper
+confidence bound mean + kappa * std, so a child goes on to be printed if
+it looks promising or if the model knows little about it.
+"""
+
+from __future__ import absolute_import, division
+
+import numbers
+
+import numpy
+
+import EvolveProfile
+
+class GaussianProcess(object):
+    """
+    Gaussian process regression with a squared exponential kernel.  The
+    length scale is picked from length_scales by marginal likelihood each
+    time the process is fitted.
+    """
+
+    def __init__(self, length_scales=(.1, .2, .5, 1., 2.), noise=.01):
+        """
+        @param tuple length_scales: Length scales to pick from, relative to the root
+            of the number of features
+        @param float noise: Variance of the noise on the normalized fitnesses
+        """
+        self.length_scales = length_scales
+        self.noise = noise
+        self.length_scale = None
+
+    def _kernel(self, first, second):
+        distance = ((first[:, None, :] - second[None, :, :]) ** 2).sum(axis=2)
+        return numpy.exp(-.5 * distance / self.length_scale ** 2)
+
+    def fit(self, features, fitnesses):
+        """
+        @param numpy.ndarray features: (N, F) features of the examples
+        @param numpy.ndarray fitnesses: Their fitnesses
+        """
+        self.features = features
+        self.mean = fitnesses.mean()
+        self.scale = fitnesses.std() or 1.
+        targets = (fitnesses - self.mean) / self.scale
+        dimension = numpy.sqrt(max(features.shape[1], 1))
+        best = None
+        for length_scale in self.length_scales:
+            self.length_scale = length_scale * dimension
+            covariance = self._kernel(features, features) + self.noise * numpy.eye(len(features))
+            cholesky = numpy.linalg.cholesky(covariance)
+            weights = numpy.linalg.solve(cholesky.T, numpy.linalg.solve(cholesky, targets))
+            likelihood = -.5 * targets.dot(weights) - numpy.log(numpy.diag(cholesky)).sum()
+            if best is None or likelihood > best[0]:
+                best = likelihood, self.length_scale, cholesky, weights
+        likelihood, self.length_scale, self.cholesky, self.weights = best
+
+    def predict(self, features):
+        """
+        @param numpy.ndarray features: (N, F) features to predict at
+        @return tuple:
+            mean: Predicted fitness of each row
+            std: Standard deviation of each prediction
+        """
+        cross = self._kernel(features, self.features)
+        mean = cross.dot(self.weights) * self.scale + self.mean
+        projected = numpy.linalg.solve(self.cholesky, cross.T)
+        variance = numpy.maximum(1 - (projected ** 2).sum(axis=0), 0)
+        return mean, numpy.sqrt(variance) * self.scale
+
+class Surrogate(object):
+
+    def __init__(self, schema, kappa=1., min_examples=8, model=None):
+        """
+        @param ProfileSchema schema: Schema of the genotypes to model
+        @param float kappa: Weight of uncertainty against predicted fitness when screening
+        @param int min_examples: Number of examples needed before screening
+        @param model: Regressor with fit(features, fitnesses) and predict(features) returning
+            (mean, std).  A GaussianProcess if not given
+        """
+        self.population = EvolveProfile.Population(schema)
+        self.kappa = kappa
+        self.min_examples = min_examples
+        self.model = model if model is not None else GaussianProcess()
+        self.examples = []
+        self._fingerprints = set()
+        self._fitted = 0
+
+    def __len__(self):
+        return len(self.examples)
+
+    def update(self, genotypes):
+        """
+        Adds the scored genotypes as examples.  Genomes already known, and
+        fitnesses which are not a single number, are skipped.
+
+        @param list genotypes: Genotypes to learn from
+        """
+        for genotype in genotypes:
+            if not isinstance(genotype.fitness, numbers.Real):
+                continue
+            if genotype.fingerprint not in self._fingerprints:
+                self._fingerprints.add(genotype.fingerprint)
+                self.examples.append(genotype)
+
+    def ready(self):
+        """
+        @return bool: True if there are enough examples to screen with
+        """
+        return len(self.examples) >= self.min_examples
+
+    def predict(self, genotypes):
+        """
+        @param list genotypes: Genotypes to predict the fitness of
+        @return tuple:
+            mean: Predicted fitness of each genotype
+            std: Standard deviation of each prediction
+        """
+        if self._fitted != len(self.examples):
+            features = self.population.from_genotypes(self.examples).features()
+            fitnesses = numpy.array([genotype.fitness for genotype in self.examples], dtype=float)
+            self.model.fit(features, fitnesses)
+            self._fitted = len(self.examples)
+        return self.model.predict(self.population.from_genotypes(genotypes).features())
+
+    def score(self, genotypes):
+        """
+        @param list genotypes: Genotypes to score
+        @return numpy.ndarray: Upper confidence bound of the fitness of each genotype
+        """
+        mean, std = self.predict(genotypes)
+        return mean + self.kappa * std
+
+    def screen(self, candidates, count):
+        """
+        @param list candidates: Children to pick from
+        @param int count: Number of children to pick
+        @return list: The count candidates with the highest upper confidence bound, best first
+        """
+        order = numpy.argsort(-self.score(candidates), kind='mergesort')
+        return [candidates[index] for index in order[:count]]
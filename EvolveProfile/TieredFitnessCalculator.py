@@ -0,0 +1,135 @@
+"""
+A fitness calculator made of tiers of other calculators, cheapest first.
+
+Every genotype is evaluated by the first tier, and only the ones its gate
+lets through go on to the next tier, e.g. a SliceFitnessCalculator which
+rejects degenerate G-code in front of a PhysicalFitnessCalculator.  A
+genotype's fitness is the one the last tier it reached gave, as a Fitness
+which carries the number of that tier as its fidelity.  The fidelity is
+kept through a journal and a fitness cache (see dump_fitness), and a
+tiered calculator fingerprints its tiers, so a cache never mixes its
+scores up with those of a calculator which prints everything.
+"""
+
+from __future__ import unicode_literals, print_function, division
+
+import hashlib
+import json
+import numbers
+
+class Fitness(float):
+    """
+    A fitness, along with the fidelity of the tier which gave it.  It is
+    used as a plain number everywhere.
+    """
+
+    def __new__(cls, value, fidelity=0):
+        fitness = super(Fitness, cls).__new__(cls, value)
+        fitness.fidelity = fidelity
+        return fitness
+
+    def __getnewargs__(self):
+        return float(self), self.fidelity
+
+def dump_fitness(fitness):
+    """
+    @param fitness: A fitness: a number, a Fitness or a tuple of objectives
+    @return: The fitness in a form JSON can hold, with the fidelity of a Fitness
+    """
+    if isinstance(fitness, Fitness):
+        return {'fitness': float(fitness), 'fidelity': fitness.fidelity}
+    if isinstance(fitness, tuple):
+        return list(fitness)
+    return fitness
+
+def load_fitness(data):
+    """
+    @param data: A fitness written by dump_fitness and read back from JSON
+    @return: The fitness
+    """
+    if isinstance(data, dict):
+        return Fitness(data['fitness'], data['fidelity'])
+    if isinstance(data, list):
+        return tuple(data)
+    return data
+
+class TieredFitnessCalculator(object):
+
+    def __init__(self, tiers, gates=None):
+        """
+        @param list tiers: Fitness calculators, cheapest first
+        @param list gates: For each tier but the last, a function of a fitness which is
+            True if the genotype goes on to the next tier.  If not given, a genotype goes
+            on unless the tier gave it its rejected_fitness, if it has one.
+        """
+        self.tiers = tiers
+        if gates is None:
+            gates = [self._passes(tier) for tier in tiers[:-1]]
+        self.gates = gates
+
+    @property
+    def model_paths(self):
+        return getattr(self.tiers[-1], 'model_paths', None)
+
+    def models_fingerprint(self):
+        """
+        Fingerprints every tier, so a FitnessCache keyed by it only holds
+        scores given by the same tiers
+
+        @return str: Hex digest of the fingerprints of the tiers
+        """
+        fingerprints = [
+            [type(tier).__name__, tier.models_fingerprint() if hasattr(tier, 'models_fingerprint') else None]
+            for tier in self.tiers
+        ]
+        return hashlib.sha1(json.dumps(fingerprints).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _passes(tier):
+        rejected = getattr(tier, 'rejected_fitness', None)
+        return lambda fitness: fitness is not None and fitness != rejected
+
+    def ascertain_fitness(self, genotypes, on_batch=None):
+        """
+        Gets the fitnesses for a set of genotypes, tier by tier
+
+        @param list genotypes: Genotypes to evaluate
+        @param function on_batch: Called with the genotypes which stop at a tier and their
+            fitnesses once the tier is done with them, and with each batch of the last tier
+        @return list: The fitness of each genotype
+        """
+        fitnesses = [None] * len(genotypes)
+        pending = list(range(len(genotypes)))
+        for fidelity, tier in enumerate(self.tiers):
+            if not pending:
+                break
+            last = fidelity == len(self.tiers) - 1
+            batch_callback = None
+            if last and on_batch is not None:
+                batch_callback = lambda batch, scores, fidelity=fidelity: on_batch(
+                    batch, [self._carry(score, fidelity) for score in scores],
+                )
+            scores = tier.ascertain_fitness([genotypes[i] for i in pending], on_batch=batch_callback)
+            passed = []
+            for index, score in zip(pending, scores):
+                fitnesses[index] = self._carry(score, fidelity)
+                if not last and self.gates[fidelity](score):
+                    passed.append(index)
+            stopped = [index for index in pending if index not in passed]
+            if not last and stopped and on_batch is not None:
+                on_batch([genotypes[i] for i in stopped], [fitnesses[i] for i in stopped])
+            pending = passed
+        return fitnesses
+
+    def evaluate(self, genotype):
+        """
+        @param Genotype genotype: The genotype to evaluate
+        @return fitness: Its fitness
+        """
+        return self.ascertain_fitness([genotype])[0]
+
+    @staticmethod
+    def _carry(fitness, fidelity):
+        if isinstance(fitness, numbers.Real) and not isinstance(fitness, bool):
+            return Fitness(fitness, fidelity)
+        return fitness
@@ -1,6 +1,31 @@
 from PhysicalFitnessCalculator import *
+from SliceFitnessCalculator import *
+from TieredFitnessCalculator import *
+from RandomStream import *
+from Mutation import *
+from ProfileSchema import *
 from Genotype import *
+from Population import *
+from GenomeCodec import *
+from Selection import *
+from RankedPopulation import *
+from HallOfFame import *
+from Journal import *
+from FitnessCache import *
+from ProfileHistory import *
+from Surrogate import *
+from Generation import *
 from GeneticAlgorithm import *
-from CmdHCI import *
+from SteadyStateGeneticAlgorithm import *
+from IslandModel import *
+from NSGA2 import *
+from CMAES import *
+from DifferentialEvolution import *
+from BayesianOptimizer import *
+try:
+    from CmdHCI import *
+except ImportError:
+    # The command line interface for scoring prints is optional
+    pass
 from errors import *
 from constants import *
@@ -2,3 +2,37 @@ class TournamentSizeError(Exception):
     """
     Raised when the size of a tournament is >= size of the population
     """
+
+class UnknownOperatorError(Exception):
+    """
+    Raised when an operator is asked for by a name that does not exist
+    """
+
+class SchemaMismatchError(Exception):
+    """
+    Raised when encoded genomes were written against a different profilemap
+    """
+
+class UnknownTopologyError(Exception):
+    """
+    Raised when an island model is asked for a migration topology that does not exist
+    """
+
+class IslandError(Exception):
+    """
+    Raised when an island of an island model fails
+    """
+
+class SliceError(Exception):
+    """
+    Raised when the slicer fails on some of the models of a plate.  The
+    G-code of the others is joined at path, and failures holds an
+    (index, model path, exception) triple per failed model.
+    """
+
+    def __init__(self, path, failures):
+        super(SliceError, self).__init__(
+            'Slicing failed for %s' % ', '.join(model_path for index, model_path, error in failures)
+        )
+        self.path = path
+        self.failures = failures
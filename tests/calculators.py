@@ -0,0 +1,33 @@
+"""
+Fitness calculators for the tests, which score genotypes on a known
+function of a profilemap with 'layer', 'speed', 'shells' and 'fill' entries
+instead of printing them.
+"""
+
+def valley_fitness(profile):
+    # A narrow valley along layer height = speed / 100
+    error = (profile['speed'] - 60.) ** 2 / 100 + (profile['layer'] * 100 - profile['speed']) ** 2
+    return -error - abs(profile['shells'] - 3) - (profile['fill'] != 'hex')
+
+def bowl_fitness(profile):
+    # A smooth bowl around speed 60 and layer height .3
+    error = ((profile['speed'] - 60.) / 90) ** 2 + ((profile['layer'] - .3) / .9) ** 2
+    return -10 * error - abs(profile['shells'] - 3) - (profile['fill'] != 'hex')
+
+class Calculator(object):
+
+    def __init__(self, fitness=valley_fitness, model_paths=None):
+        """
+        @param function fitness: Scores a profile
+        @param list model_paths: Models the calculator claims to print
+        """
+        self.fitness = fitness
+        self.model_paths = model_paths
+        # Number of genotypes scored so far
+        self.printed = 0
+
+    def ascertain_fitness(self, genotypes, on_batch=None):
+        self.printed += len(genotypes)
+        fitnesses = [self.fitness(genotype.profile) for genotype in genotypes]
+        on_batch(genotypes, fitnesses)
+        return fitnesses
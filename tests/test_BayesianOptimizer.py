@@ -0,0 +1,72 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+import numpy
+
+import EvolveProfile
+from calculators import Calculator, bowl_fitness
+
+class TestBayesianOptimizer(unittest.TestCase):
+
+    def setUp(self):
+        self.profilemap = {
+            'layer': ['r', 0.1, 1.0],
+            'speed': ['r', 10.0, 100.0],
+            'shells': ['r', 1, 6],
+            'fill': ['l', 'line', 'hex', 'grid'],
+        }
+        self.calculator = Calculator(bowl_fitness, ['a.stl', 'b.stl', 'c.stl', 'd.stl'])
+        self.bo = EvolveProfile.BayesianOptimizer(
+            self.profilemap, seed=1776, fitness_calculator=self.calculator,
+        )
+
+    def tearDown(self):
+        self.profilemap = None
+        self.bo = None
+
+    def test_batch_size(self):
+        self.assertEqual(4, self.bo.population_size)
+        self.assertEqual(4, len(self.bo.population))
+        self.assertEqual(4, self.bo.offspring_count())
+        bo = EvolveProfile.BayesianOptimizer(self.profilemap, seed=1, fitness_calculator=Calculator(bowl_fitness))
+        self.assertEqual(1, bo.population_size)
+        bo = EvolveProfile.BayesianOptimizer(self.profilemap, 6, seed=1)
+        self.assertEqual(6, bo.population_size)
+
+    def test_expected_improvement(self):
+        mean = numpy.array([0., 1., 0., -1.])
+        std = numpy.array([1., 0., 0., 1.])
+        improvement = EvolveProfile.expected_improvement(mean, std, 0.)
+        self.assertAlmostEqual(1 / numpy.sqrt(2 * numpy.pi), improvement[0])
+        self.assertEqual(1., improvement[1])
+        self.assertEqual(0., improvement[2])
+        self.assertTrue(0 < improvement[3] < improvement[0])
+
+    def test_batch_is_spread(self):
+        self.bo.ascertain_fitness()
+        self.bo.cull_population()
+        self.assertEqual([], self.bo.population)
+        self.assertEqual(4, len(self.bo.model))
+        self.bo.generate_population()
+        self.assertEqual(4, len(self.bo.population))
+        fingerprints = set(genotype.fingerprint for genotype in self.bo.population)
+        self.assertEqual(4, len(fingerprints))
+        for genotype in self.bo.population:
+            self.assertFalse(self.bo.hall_of_fame.seen(genotype))
+            self.assertTrue(isinstance(genotype.profile['shells'], int))
+
+    def test_evolve(self):
+        for generation in self.bo.evolve(max_evaluations=60):
+            self.assertEqual(4, len(generation.population))
+        best = self.bo.hall_of_fame.best()
+        self.assertEqual(60, self.calculator.printed)
+        self.assertEqual(60, len(self.bo.model))
+        self.assertTrue(best.fitness > -.1, best.fitness)
+        self.assertEqual('hex', best.profile['fill'])
+        self.assertEqual(3, best.profile['shells'])
+
+if __name__ == "__main__":
+    unittest.main()
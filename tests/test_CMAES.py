@@ -0,0 +1,71 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+import numpy
+
+import EvolveProfile
+from calculators import Calculator
+
+class TestCMAES(unittest.TestCase):
+
+    def setUp(self):
+        self.profilemap = {
+            'layer': ['r', 0.1, 1.0],
+            'speed': ['r', 10.0, 100.0],
+            'shells': ['r', 1, 6],
+            'fill': ['l', 'line', 'hex', 'grid'],
+        }
+        self.calculator = Calculator()
+        self.cma = EvolveProfile.CMAES(self.profilemap, seed=1776, fitness_calculator=self.calculator)
+
+    def tearDown(self):
+        self.profilemap = None
+        self.cma = None
+
+    def test_default_population_size(self):
+        self.assertEqual(4 + int(3 * numpy.log(3)), self.cma.population_size)
+        self.assertEqual(self.cma.population_size, len(self.cma.population))
+
+    def test_breed(self):
+        children = self.cma.breed(50)
+        self.assertEqual(50, len(children))
+        for child in children:
+            self.assertTrue(0.1 <= child.profile['layer'] <= 1.0)
+            self.assertTrue(10.0 <= child.profile['speed'] <= 100.0)
+            self.assertTrue(child.profile['shells'] in range(1, 7))
+            self.assertTrue(isinstance(child.profile['shells'], int))
+            self.assertTrue(child.profile['fill'] in ['line', 'hex', 'grid'])
+
+    def test_evolve(self):
+        for generation in self.cma.evolve(max_evaluations=400):
+            pass
+        best = self.cma.hall_of_fame.best()
+        self.assertTrue(self.calculator.printed <= 400)
+        self.assertTrue(best.fitness > -2, best.fitness)
+        self.assertEqual('hex', best.profile['fill'])
+        self.assertEqual(3, best.profile['shells'])
+        self.assertTrue(self.cma.categories[0][1] > .8)
+
+    def test_int_ranges_keep_moving(self):
+        self.cma.sigma = 1e-6
+        for i in range(3):
+            self.cma.ascertain_fitness()
+            self.cma.cull_population()
+            self.cma.generate_population()
+        self.assertTrue((numpy.diag(self.cma.covariance) * self.cma.sigma ** 2 >=
+                         (self.cma.min_std ** 2) * (1 - 1e-9)).all())
+
+    def test_keeps_elite(self):
+        self.cma.ascertain_fitness()
+        best = self.cma.hall_of_fame.best()
+        self.cma.cull_population()
+        self.assertEqual([best], self.cma.population)
+        self.cma.generate_population()
+        self.assertEqual(self.cma.population_size, len(self.cma.population))
+        self.assertEqual(self.cma.population_size - 1, self.cma.offspring_count())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+
+import EvolveProfile
+from calculators import Calculator, valley_fitness
+
+class TestDifferentialEvolution(unittest.TestCase):
+
+    def setUp(self):
+        self.profilemap = {
+            'layer': ['r', 0.1, 1.0],
+            'speed': ['r', 10.0, 100.0],
+            'shells': ['r', 1, 6],
+            'fill': ['l', 'line', 'hex', 'grid'],
+        }
+        self.calculator = Calculator()
+        self.de = EvolveProfile.DifferentialEvolution(
+            self.profilemap, 20, seed=1776, fitness_calculator=self.calculator,
+        )
+
+    def tearDown(self):
+        self.profilemap = None
+        self.de = None
+
+    def test_one_trial_per_target(self):
+        self.de.ascertain_fitness()
+        self.de.cull_population()
+        targets = list(self.de.population)
+        self.assertEqual(10, len(targets))
+        self.de.generate_population()
+        self.assertEqual(20, len(self.de.population))
+        self.assertEqual(targets, self.de.population[:10])
+        for trial in self.de.population[10:]:
+            self.assertEqual(None, trial.fitness)
+            self.assertTrue(isinstance(trial.profile['shells'], int))
+            self.assertTrue(trial.profile['fill'] in ['line', 'hex', 'grid'])
+
+    def test_fitter_of_each_pair_survives(self):
+        self.de.ascertain_fitness()
+        self.de.cull_population()
+        self.de.generate_population()
+        self.de.ascertain_fitness()
+        pairs = list(zip(self.de.population[:10], self.de.population[10:]))
+        self.de.cull_population()
+        self.assertEqual(10, len(self.de.population))
+        for (target, trial), survivor in zip(pairs, self.de.population):
+            self.assertTrue(survivor is (trial if trial.fitness >= target.fitness else target))
+
+    def test_evolve(self):
+        for generation in self.de.evolve(max_evaluations=400):
+            pass
+        best = self.de.hall_of_fame.best()
+        self.assertTrue(self.calculator.printed <= 400)
+        self.assertTrue(best.fitness > -3, best.fitness)
+        self.assertEqual('hex', best.profile['fill'])
+
+    def test_surrogate_screens_trials(self):
+        self.de.surrogate = EvolveProfile.Surrogate(self.de.schema)
+        self.de.ascertain_fitness()
+        self.de.cull_population()
+        built = []
+        def record(trials):
+            def wrapper(*args):
+                built.append(trials(*args))
+                return built[-1]
+            return wrapper
+        self.de._trials = record(self.de._trials)
+        self.de.generate_population()
+        self.assertEqual(20, len(self.de.population))
+        self.assertEqual(self.de.screening_factor, len(built))
+        taken = set(genotype.fingerprint for genotype in self.de.population)
+        for index, trial in enumerate(self.de.population[10:]):
+            candidates = [trials[index] for trials in built]
+            self.assertTrue(any(trial is candidate for candidate in candidates))
+            # Only duplicates score higher than the picked trial
+            scores = self.de.surrogate.score(candidates)
+            for candidate, score in zip(candidates, scores):
+                if score > scores[candidates.index(trial)]:
+                    self.assertTrue(self.de.is_duplicate(candidate, taken))
+
+    def test_small_population(self):
+        for size in [6, 7]:
+            with self.assertRaises(ValueError):
+                EvolveProfile.DifferentialEvolution(self.profilemap, size, seed=1776)
+        de = EvolveProfile.DifferentialEvolution(self.profilemap, 8, seed=1776)
+        for genotype in de.population:
+            genotype.fitness = valley_fitness(genotype.profile)
+        de.cull_population()
+        de.generate_population()
+        self.assertEqual(8, len(de.population))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+import shutil
+import tempfile
+import mock
+
+import EvolveProfile
+
+class TestFitnessCache(unittest.TestCase):
+
+    def setUp(self):
+        self.profilemap = {
+            'a': ['r', 0, 100],
+            'b': ['l', 1, 2, 3],
+        }
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'fitness.db')
+        self.cache = EvolveProfile.FitnessCache(self.path, 'models', 'printer')
+        # Distinct genomes, as random ones may coincide in so small a space
+        self.genotypes = [
+            EvolveProfile.Genotype(self.profilemap, {'a': i * 10, 'b': 1}) for i in range(5)
+        ]
+        for i, genotype in enumerate(self.genotypes):
+            genotype.fitness = i
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.directory)
+        self.profilemap = None
+
+    def test_put_and_get(self):
+        self.cache.put_many(self.genotypes[:3])
+        self.assertEqual(3, len(self.cache))
+        self.assertEqual([0, 1, 2, None, None], self.cache.get_many(self.genotypes))
+        self.assertEqual(1, self.cache.get(self.genotypes[1]))
+
+    def test_first_fitness_is_kept(self):
+        self.cache.put(self.genotypes[0])
+        copy = self.genotypes[0].copy()
+        copy.fitness = 100
+        self.cache.put(copy)
+        self.assertEqual(0, self.cache.get(copy))
+
+    def test_shared_between_runs(self):
+        genotype = self.genotypes[0]
+        genotype.fitness = (1.5, 2)
+        self.cache.put(genotype)
+        self.cache.close()
+        self.cache = EvolveProfile.FitnessCache(self.path, 'models', 'printer')
+        self.assertEqual((1.5, 2), self.cache.get(genotype))
+
+    def test_keyed_by_models_and_printer(self):
+        self.cache.put_many(self.genotypes)
+        for models, printer in [('other', 'printer'), ('models', 'other')]:
+            other = EvolveProfile.FitnessCache(self.path, models, printer)
+            self.assertEqual([None] * 5, other.get_many(self.genotypes))
+            other.close()
+
+    def test_many_genotypes(self):
+        profilemap = {'a': ['r', 0.0, 1.0]}
+        genotypes = [EvolveProfile.Genotype(profilemap) for i in range(1200)]
+        for i, genotype in enumerate(genotypes):
+            genotype.fitness = i
+        self.cache.put_many(genotypes)
+        self.assertEqual(list(range(1200)), self.cache.get_many(genotypes))
+
+    def test_ga_only_prints_new_genomes(self):
+        ga = EvolveProfile.GeneticAlgorithm(self.profilemap, 10, seed=1776)
+        ga.fitness_cache = self.cache
+        ga.fitness_calculator = mock.Mock()
+        printed = []
+        def ascertain_fitness(genotypes, on_batch=None):
+            printed.extend(genotypes)
+            fitnesses = [genotype.profile['a'] for genotype in genotypes]
+            on_batch(genotypes, fitnesses)
+            return fitnesses
+        ga.fitness_calculator.ascertain_fitness = mock.Mock(side_effect=ascertain_fitness)
+        ga.population[0].fitness = None
+        ga.population[1] = ga.population[0].copy()
+        ga.population[2].fitness = None
+        self.cache.put(self.genotypes[0])
+        ga.population[3] = self.genotypes[0].copy()
+        ga.ascertain_fitness()
+        self.assertEqual(8, len(printed))
+        self.assertEqual(ga.population[0].fitness, ga.population[1].fitness)
+        self.assertEqual(0, ga.population[3].fitness)
+        self.assertEqual(9, len(self.cache))
+        del printed[:]
+        again = EvolveProfile.GeneticAlgorithm(self.profilemap, 10, seed=1776)
+        again.population = [genotype.copy() for genotype in ga.population]
+        again.fitness_cache = self.cache
+        again.fitness_calculator = ga.fitness_calculator
+        again.ascertain_fitness()
+        self.assertEqual(
+            [genotype.fitness for genotype in ga.population],
+            [genotype.fitness for genotype in again.population],
+        )
+        self.assertEqual([], printed)
+
+if __name__ == "__main__":
+    unittest.main()
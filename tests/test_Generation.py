@@ -0,0 +1,37 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+import mock
+
+import EvolveProfile
+
+class TestGeneration(unittest.TestCase):
+
+    def population(self, fitnesses):
+        population = []
+        for fitness in fitnesses:
+            population.append(mock.Mock())
+            population[-1].fitness = fitness
+        return population
+
+    def test_stats(self):
+        population = self.population([4, None, 1, 7])
+        generation = EvolveProfile.Generation(3, population, 12, 1.5)
+        self.assertTrue(generation.best is population[3])
+        self.assertEqual(7, generation.best_fitness)
+        self.assertEqual(4, generation.mean_fitness)
+        self.assertEqual(1, generation.worst_fitness)
+        self.assertAlmostEqual(6 ** .5, generation.std_fitness)
+        self.assertEqual(None, generation.stop_reason)
+
+    def test_no_scalar_fitness(self):
+        generation = EvolveProfile.Generation(0, self.population([(1, 2), None]), 0, 0, 'budget')
+        self.assertEqual(None, generation.best)
+        self.assertEqual(None, generation.mean_fitness)
+        self.assertEqual('budget', generation.stop_reason)
+
+if __name__ == "__main__":
+    unittest.main()
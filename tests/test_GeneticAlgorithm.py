@@ -33,6 +33,92 @@ class TesGA(unittest.TestCase):
         self.ga.generate_population()
         self.assertTrue(len(self.ga.population) == self.ga.population_size)
 
+    def test_cull_population_keeps_elites(self):
+        # Distinct fitnesses, so the best two are the same however ties break
+        for i, genotype in enumerate(self.ga.population):
+            genotype.fitness = i
+        best = self.ga.get_top(2)
+        self.ga.update_hall_of_fame()
+        self.ga.elitism = 2
+        self.ga.population = self.ga.population[:1] + [
+            genotype for genotype in self.ga.population if genotype not in best
+        ]
+        self.ga.cull_population()
+        self.assertEqual(self.population_size // 2, len(self.ga.population))
+        for genotype in best:
+            self.assertTrue(genotype in self.ga.population)
+
+    def test_generate_population_rejects_duplicates(self):
+        self.ga.cull_population()
+        self.ga.generate_population()
+        fingerprints = [genotype.fingerprint for genotype in self.ga.population]
+        self.assertEqual(len(fingerprints), len(set(fingerprints)))
+        self.ga.population = self.ga.population[:10]
+        copy = self.ga.population[0].copy
+        self.ga.breed = mock.Mock(side_effect=lambda count: [copy() for i in range(count)])
+        self.ga.duplicate_redraws = 5
+        self.ga.generate_population()
+        self.assertEqual([10, 5], [call[0][0] for call in self.ga.breed.call_args_list])
+        self.assertEqual(self.population_size, len(self.ga.population))
+
+    def test_breed(self):
+        self.ga.cull_population()
+        self.ga.select_parents = mock.Mock(wraps=self.ga.select_parents)
+        self.ga.select_parent = mock.Mock(wraps=self.ga.select_parent)
+        for count in [1, 7, 10, 40]:
+            children = self.ga.breed(count)
+            self.assertEqual(count, len(children))
+            for child in children:
+                self.assertTrue(isinstance(child, EvolveProfile.Genotype))
+                self.assertEqual(None, child.fitness)
+        calls = len(self.ga.select_parents.mock_calls) + len(self.ga.select_parent.mock_calls)
+        self.assertTrue(calls <= 8)
+
+    def test_breed_plan(self):
+        self.ga.cull_population()
+        drawn = []
+        def record(select):
+            def wrapper(count):
+                drawn.append(select(count))
+                return drawn[-1]
+            return wrapper
+        self.ga.select_parents = mock.Mock(side_effect=record(self.ga.select_parents))
+        self.ga.select_parent = mock.Mock(side_effect=record(self.ga.select_parent))
+        self.ga.crossover_rate = 1
+        self.ga.mutation_rate = 0
+        children = self.ga.breed(6)
+        self.assertFalse(self.ga.select_parent.called)
+        for child, (first, second) in zip(children, drawn.pop()):
+            parents = zip(self.ga.population[first].slots, self.ga.population[second].slots)
+            for slot, options in zip(child.slots, parents):
+                self.assertTrue(slot in options)
+        self.ga.crossover_rate = 0
+        self.ga.mutation_rate = 1
+        for operator in ['reset', 'creep']:
+            self.ga.mutation_operator = operator
+            children = self.ga.breed(6)
+            self.assertEqual(1, self.ga.select_parents.call_count)
+            # Every mutant changes exactly one value of its parent
+            for child, parent in zip(children, drawn.pop()):
+                changed = [a != b for a, b in zip(child.slots, self.ga.population[parent].slots)]
+                self.assertEqual(1, sum(changed), operator)
+
+    def test_breed_counts(self):
+        self.ga.cull_population()
+        self.ga.select_parents = mock.Mock(wraps=self.ga.select_parents)
+        self.ga.select_parent = mock.Mock(wraps=self.ga.select_parent)
+        # As create_next_child: crossovers and mutants in the ratio .5 to .1
+        self.assertAlmostEqual(5 / 6., self.ga.crossover_share())
+        for i in range(20):
+            self.assertEqual(10, len(self.ga.breed(10)))
+        pairs = [call[0][0] for call in self.ga.select_parents.call_args_list]
+        parents = [call[0][0] for call in self.ga.select_parent.call_args_list]
+        self.assertTrue(set(pairs) <= set([8, 9]), pairs)
+        self.assertTrue(set(parents) <= set([1, 2]), parents)
+        self.assertEqual(200, sum(pairs) + sum(parents))
+        self.ga.crossover_rate = self.ga.mutation_rate = 0
+        self.assertRaises(ValueError, self.ga.breed, 10)
+
     def test_get_next_child_mutation(self):
         values = [.05, .9]
         def side_effect(*args, **kwargs):
@@ -109,6 +195,15 @@ class TestGAMockPopulation(unittest.TestCase):
         self.ga.cull_population()
         self.assertTrue(len(self.ga.population) == self.ga.population_size/2)
 
+    def test_cull_population_keeps_fittest(self):
+        self.ga.population.reverse()
+        self.ga.population[0].fitness = None
+        self.ga.cull_population()
+        self.assertEqual(list(range(48, 23, -1)), [c.fitness for c in self.ga.population])
+
+    def test_get_top(self):
+        self.assertEqual([49, 48, 47], [c.fitness for c in self.ga.get_top(3)])
+
     def test_get_candidates(self):
         for i in range(0, 10):
             candidates = self.ga.get_candidates(i)
@@ -136,6 +231,13 @@ class TestGAMockPopulation(unittest.TestCase):
             with self.assertRaises(EvolveProfile.TournamentSizeError):
                 self.ga.get_candidates(case)
 
+    def test_select_parents(self):
+        for operator in EvolveProfile.selection_operators:
+            self.ga.selection_operator = operator
+            pairs = self.ga.select_parents(20)
+            self.assertEqual((20, 2), pairs.shape)
+            self.assertFalse((pairs[:, 0] == pairs[:, 1]).any())
+
     def test_tournament_selection_best_two(self):
         self.ga.population = self.ga.population[:3]
         got_members = self.ga.tournament_selection(num_candidates=2)
@@ -144,5 +246,77 @@ class TestGAMockPopulation(unittest.TestCase):
         got_members = sorted(got_members, cmp=lambda x,y: cmp(x.fitness, y.fitness))
         self.assertTrue(got_members[1].fitness > got_members[0].fitness)
 
+class Calculator(object):
+    """
+    Scores genotypes on a known function, reporting one batch of three at a time
+    """
+
+    def __init__(self):
+        self.printed = 0
+
+    def ascertain_fitness(self, genotypes, on_batch=None):
+        fitnesses = []
+        for start in range(0, len(genotypes), 3):
+            batch = genotypes[start:start + 3]
+            fitness = [-abs(genotype.profile['a'] - 70) for genotype in batch]
+            self.printed += len(batch)
+            on_batch(batch, fitness)
+            fitnesses.extend(fitness)
+        return fitnesses
+
+class TestEvolve(unittest.TestCase):
+
+    def setUp(self):
+        self.profilemap = {
+            'a': ['r', 0, 100],
+            'b': ['l', 1, 2, 3],
+        }
+        self.calculator = Calculator()
+        self.ga = EvolveProfile.GeneticAlgorithm(
+            self.profilemap, 10, seed=1776, fitness_calculator=self.calculator,
+        )
+
+    def tearDown(self):
+        self.profilemap = None
+        self.ga = None
+
+    def test_generations(self):
+        generations = list(self.ga.evolve(max_generations=4))
+        self.assertEqual([0, 1, 2, 3, 4], [generation.number for generation in generations])
+        self.assertEqual([None] * 4 + ['generations'], [g.stop_reason for g in generations])
+        for generation in generations:
+            self.assertEqual(10, len(generation.population))
+            for genotype in generation.population:
+                self.assertEqual(-abs(genotype.profile['a'] - 70), genotype.fitness)
+        best = [generation.best_fitness for generation in generations]
+        self.assertEqual(sorted(best), best)
+        self.assertEqual(10 + 4 * 5, generations[-1].evaluations)
+        self.assertEqual(self.calculator.printed, generations[-1].evaluations)
+
+    def test_budget(self):
+        generations = list(self.ga.evolve(max_evaluations=27))
+        self.assertEqual('budget', generations[-1].stop_reason)
+        self.assertEqual(25, self.calculator.printed)
+
+    def test_target(self):
+        generations = list(self.ga.evolve(target=-3))
+        self.assertEqual('target', generations[-1].stop_reason)
+        self.assertTrue(generations[-1].best_fitness >= -3)
+        for generation in generations[:-1]:
+            self.assertTrue(generation.best_fitness < -3)
+
+    def test_stagnation(self):
+        self.calculator.ascertain_fitness = lambda genotypes, on_batch=None: [0] * len(genotypes)
+        generations = list(self.ga.evolve(stagnation=3))
+        self.assertEqual('stagnation', generations[-1].stop_reason)
+        self.assertEqual(4, len(generations))
+
+    def test_runs_until_stopped(self):
+        evolution = self.ga.evolve()
+        for i in range(6):
+            generation = next(evolution)
+        self.assertEqual(None, generation.stop_reason)
+        self.assertEqual(5, generation.number)
+
 if __name__ == "__main__":
     unittest.main()
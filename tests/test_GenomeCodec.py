@@ -0,0 +1,62 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+
+import EvolveProfile
+
+class TestGenomeCodec(unittest.TestCase):
+
+    def setUp(self):
+        self.profilemap = {
+            'small': ['r', 0, 100],
+            'negative': ['r', -1000, 1000],
+            'huge': ['r', 0, 2 ** 40],
+            'real': ['r', -5.0, 5.0],
+            'choice': ['l', 'a', 'b', 'c'],
+            'extruderProfiles': [
+                None,
+                {'retractDistance': ['r', 0.0, 3.0]},
+            ],
+        }
+        self.schema = EvolveProfile.ProfileSchema(self.profilemap)
+        self.codec = EvolveProfile.GenomeCodec(self.schema)
+
+    def tearDown(self):
+        self.profilemap = None
+        self.schema = None
+        self.codec = None
+
+    def test_round_trip(self):
+        genotype = EvolveProfile.Genotype(self.profilemap, schema=self.schema)
+        data = self.codec.encode(genotype)
+        self.assertEqual(self.codec.record.size, len(data))
+        decoded = self.codec.decode(data, self.profilemap)
+        self.assertEqual(genotype, decoded)
+        self.assertEqual(genotype.profile, decoded.profile)
+
+    def test_record_size(self):
+        # b + h + q + d + B + d
+        self.assertEqual(1 + 2 + 8 + 8 + 1 + 8, self.codec.record.size)
+
+    def test_population_round_trip(self):
+        genotypes = [EvolveProfile.Genotype(self.profilemap, schema=self.schema) for i in range(25)]
+        data = self.codec.encode_population(genotypes)
+        self.assertEqual(self.codec.header.size + 25 * self.codec.record.size, len(data))
+        self.assertEqual(genotypes, self.codec.decode_population(data, self.profilemap))
+
+    def test_empty_population(self):
+        data = self.codec.encode_population([])
+        self.assertEqual([], self.codec.decode_population(data, self.profilemap))
+
+    def test_schema_mismatch(self):
+        genotypes = [EvolveProfile.Genotype(self.profilemap, schema=self.schema)]
+        data = self.codec.encode_population(genotypes)
+        other = EvolveProfile.GenomeCodec(EvolveProfile.ProfileSchema({'small': ['r', 0, 100]}))
+        with self.assertRaises(EvolveProfile.SchemaMismatchError):
+            other.decode_population(data, {'small': ['r', 0, 100]})
+
+if __name__ == "__main__":
+    unittest.main()
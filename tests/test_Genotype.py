@@ -3,6 +3,8 @@ import sys
 lib_path = os.path.abspath('./')
 sys.path.insert(0, lib_path)
 
+import json
+import pickle
 import unittest
 import random
 
@@ -31,6 +33,70 @@ class TestGenotype(unittest.TestCase):
         copy.profile = {}
         self.assertFalse(self.genotype == copy)
 
+    def test_copy_mutate_does_not_alias(self):
+        profile = self.genotype.profile
+        expected_profile = {
+            'paramA': profile['paramA'],
+            'paramB': profile['paramB'],
+            'subConfig': dict(profile['subConfig']),
+        }
+        copy = self.genotype.copy()
+        for i in range(20):
+            copy.mutate()
+        self.assertEqual(expected_profile, self.genotype.profile)
+        self.assertFalse(self.genotype == copy)
+
+    def test_copy_shares_untouched_subtrees(self):
+        self.genotype.profile
+        copy = self.genotype.copy()
+        self.assertTrue(copy.profilemap is self.genotype.profilemap)
+        copy._set_slot(copy.schema.index[('paramA',)], 1000)
+        self.assertEqual(1000, copy.profile['paramA'])
+        self.assertTrue(copy.profile['subConfig'] is self.genotype.profile['subConfig'])
+
+    def test_profile_is_read_only(self):
+        copy = self.genotype.copy()
+        profile = copy.profile
+        fingerprint = copy.fingerprint
+        with self.assertRaises(TypeError):
+            profile['paramA'] = 1000
+        with self.assertRaises(TypeError):
+            profile['subConfig'].update({'paramD': 150})
+        self.assertEqual(fingerprint, self.genotype.fingerprint)
+        self.assertEqual(profile, self.genotype.profile)
+        self.assertEqual(profile, pickle.loads(pickle.dumps(profile, 2)))
+        self.assertEqual(profile, json.loads(json.dumps(profile)))
+        edited = dict(profile)
+        edited['paramA'] = 1000
+        copy.profile = edited
+        edited['paramA'] = 0
+        self.assertEqual(1000, copy.profile['paramA'])
+        self.assertEqual(1000, copy.slots[copy.schema.index[('paramA',)]])
+        self.assertNotEqual(fingerprint, copy.fingerprint)
+        self.assertEqual(fingerprint, self.genotype.fingerprint)
+
+    def test_fingerprint_stable(self):
+        genotype = EvolveProfile.Genotype({
+            'a': ['r', 0, 10],
+            'b': {'c': ['l', 'x', 'y']},
+        }, ingenotype={'a': 3, 'b': {'c': 'y'}})
+        self.assertEqual(
+            genotype.fingerprint,
+            EvolveProfile.Genotype(genotype.profilemap, ingenotype={'a': 3, 'b': {'c': 'y'}}).fingerprint,
+        )
+
+    def test_fingerprint_invalidated_on_mutate(self):
+        fingerprint = self.genotype.fingerprint
+        self.genotype.mutate()
+        self.assertNotEqual(fingerprint, self.genotype.fingerprint)
+
+    def test_hash(self):
+        copy = self.genotype.copy()
+        self.assertEqual(hash(self.genotype), hash(copy))
+        self.assertEqual(1, len(set([self.genotype, copy])))
+        copy.mutate()
+        self.assertEqual(2, len(set([self.genotype, copy])))
+
     def test_equal_same_profile_same_profilemap(self):
         equal_genotype = EvolveProfile.Genotype(self.profile)
         equal_genotype.profile = self.genotype.profile.copy()
@@ -0,0 +1,56 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+import mock
+
+import EvolveProfile
+
+class TestHallOfFame(unittest.TestCase):
+
+    def setUp(self):
+        self.hall_of_fame = EvolveProfile.HallOfFame(max_size=3)
+
+    def tearDown(self):
+        self.hall_of_fame = None
+
+    def genotype(self, fingerprint, fitness):
+        genotype = mock.Mock()
+        genotype.fingerprint = fingerprint
+        genotype.fitness = fitness
+        return genotype
+
+    def test_keeps_fittest(self):
+        genotypes = [self.genotype(str(i), i) for i in [4, 1, 7, 3, 9]]
+        self.hall_of_fame.update(genotypes)
+        self.assertEqual([9, 7, 4], [g.fitness for g in self.hall_of_fame])
+        self.assertEqual(3, len(self.hall_of_fame))
+        self.assertTrue(self.hall_of_fame.best() is genotypes[4])
+        self.assertEqual([9, 7], [g.fitness for g in self.hall_of_fame.top(2)])
+
+    def test_dropped_genomes_are_still_seen(self):
+        genotypes = [self.genotype(str(i), i) for i in range(5)]
+        self.hall_of_fame.update(genotypes)
+        for genotype in genotypes:
+            self.assertTrue(self.hall_of_fame.seen(genotype))
+        self.assertFalse(genotypes[0] in self.hall_of_fame)
+        self.assertTrue(genotypes[4] in self.hall_of_fame)
+
+    def test_genome_kept_once(self):
+        self.assertTrue(self.hall_of_fame.add(self.genotype('a', 5)))
+        self.assertFalse(self.hall_of_fame.add(self.genotype('a', 8)))
+        self.assertEqual([5], [g.fitness for g in self.hall_of_fame])
+
+    def test_unscored(self):
+        genotype = self.genotype('a', None)
+        self.assertFalse(self.hall_of_fame.add(genotype))
+        self.assertFalse(self.hall_of_fame.seen(genotype))
+        self.assertEqual(None, self.hall_of_fame.best())
+        self.hall_of_fame.see([genotype])
+        self.assertTrue(self.hall_of_fame.seen(genotype))
+        self.assertEqual(0, len(self.hall_of_fame))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+import Queue
+
+import EvolveProfile
+from EvolveProfile.IslandModel import _run_island
+
+def surrogate_fitness(genotype):
+    return genotype.profile['a'] + genotype.profile['sub']['b']
+
+def broken_fitness(genotype):
+    raise ValueError('surrogate on fire')
+
+class TestIslandModel(unittest.TestCase):
+
+    def setUp(self):
+        self.profilemap = {
+            'a': ['r', 0, 1000],
+            'sub': {
+                'b': ['l', 0, 10, 20],
+            },
+        }
+
+    def tearDown(self):
+        self.profilemap = None
+
+    def test_neighbours(self):
+        ring = EvolveProfile.IslandModel(self.profilemap, surrogate_fitness, num_islands=4)
+        self.assertEqual([[1], [2], [3], [0]], [ring.neighbours(i) for i in range(4)])
+        complete = EvolveProfile.IslandModel(self.profilemap, surrogate_fitness, num_islands=3, topology='complete')
+        self.assertEqual([[1, 2], [0, 2], [0, 1]], [complete.neighbours(i) for i in range(3)])
+        single = EvolveProfile.IslandModel(self.profilemap, surrogate_fitness, num_islands=1)
+        self.assertEqual([], single.neighbours(0))
+
+    def test_unknown_topology(self):
+        with self.assertRaises(EvolveProfile.UnknownTopologyError):
+            EvolveProfile.IslandModel(self.profilemap, surrogate_fitness, topology='star')
+
+    def run_model(self, seed, topology):
+        model = EvolveProfile.IslandModel(
+            self.profilemap, surrogate_fitness, num_islands=3, island_size=10,
+            migration_interval=2, migration_size=2, topology=topology, seed=seed,
+        )
+        best = model.run(6)
+        return model, best
+
+    def test_run(self):
+        for topology in ['ring', 'complete']:
+            model, best = self.run_model(1776, topology)
+            self.assertEqual(3, len(model.islands))
+            for island in model.islands:
+                self.assertEqual(10, len(island))
+                for genotype in island:
+                    self.assertEqual(surrogate_fitness(genotype), genotype.fitness)
+            self.assertEqual(max(g.fitness for island in model.islands for g in island), best.fitness)
+
+    def test_replay_from_seed(self):
+        first = self.run_model(1776, 'complete')[0].islands
+        second = self.run_model(1776, 'complete')[0].islands
+        self.assertEqual(first, second)
+
+    def test_migrants_from_a_neighbour_ahead(self):
+        model = EvolveProfile.IslandModel(
+            self.profilemap, surrogate_fitness, num_islands=2, island_size=10,
+            migration_interval=2, migration_size=1,
+        )
+        codec = EvolveProfile.GenomeCodec(model.schema)
+        rng = EvolveProfile.RandomStream(1)
+        def message(generation, fitness):
+            data = codec.encode_population([EvolveProfile.Genotype(self.profilemap, rng=rng)])
+            return (generation, 1, data, [fitness])
+        inboxes = [Queue.Queue(), Queue.Queue()]
+        # The neighbour's next migrants arrive before those of this migration
+        inboxes[0].put(message(4, 9000))
+        inboxes[0].put(message(2, 5000))
+        results = Queue.Queue()
+        _run_island(0, model, EvolveProfile.RandomStream(2), 2, inboxes, 1, results)
+        index, data, fitnesses = results.get_nowait()
+        self.assertTrue(data is not None, fitnesses)
+        self.assertTrue(5000 in fitnesses)
+        self.assertFalse(9000 in fitnesses)
+
+    def test_island_failure(self):
+        model = EvolveProfile.IslandModel(self.profilemap, broken_fitness, num_islands=2, island_size=5)
+        with self.assertRaises(EvolveProfile.IslandError):
+            model.run(2)
+
+if __name__ == "__main__":
+    unittest.main()
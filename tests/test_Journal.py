@@ -0,0 +1,156 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+import shutil
+import tempfile
+import mock
+
+import EvolveProfile
+
+class Crash(Exception):
+    pass
+
+class TestJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.profilemap = {
+            'a': ['r', 0, 100],
+            'b': ['r', 0.0, 1.0],
+            'c': ['l', 'x', 'y', 'z'],
+        }
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'run.journal')
+        self.printed = []
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        self.profilemap = None
+
+    def make_ga(self, crash_after=None):
+        ga = EvolveProfile.GeneticAlgorithm(self.profilemap, 10, seed=1776)
+        ga.fitness_calculator = mock.Mock()
+        def ascertain_fitness(genotypes, on_batch=None):
+            fitnesses = []
+            for start in range(0, len(genotypes), 3):
+                if crash_after is not None and start // 3 == crash_after:
+                    raise Crash
+                batch = genotypes[start:start + 3]
+                self.printed.extend(genotype.fingerprint for genotype in batch)
+                fitness = [genotype.profile['a'] + genotype.profile['b'] for genotype in batch]
+                on_batch(batch, fitness)
+                fitnesses.extend(fitness)
+            return fitnesses
+        ga.fitness_calculator.ascertain_fitness = mock.Mock(side_effect=ascertain_fitness)
+        return ga
+
+    def evolve(self, ga, generations):
+        for generation in range(generations):
+            ga.cull_population()
+            ga.generate_population()
+            ga.ascertain_fitness()
+
+    def test_resume_mid_generation(self):
+        expected = self.make_ga()
+        expected.ascertain_fitness()
+        self.evolve(expected, 3)
+
+        ga = self.make_ga()
+        self.assertFalse(ga.resume(EvolveProfile.Journal(self.path, self.profilemap)))
+        ga.ascertain_fitness()
+        self.evolve(ga, 1)
+        ga.cull_population()
+        ga.generate_population()
+        ga.fitness_calculator.ascertain_fitness.side_effect = self.make_ga(
+            crash_after=1,
+        ).fitness_calculator.ascertain_fitness.side_effect
+        with self.assertRaises(Crash):
+            ga.ascertain_fitness()
+
+        self.printed = []
+        resumed = self.make_ga()
+        self.assertTrue(resumed.resume(EvolveProfile.Journal(self.path, self.profilemap)))
+        self.assertEqual(2, resumed.generation)
+        self.assertEqual(8, len([g for g in resumed.population if g.fitness is not None]))
+        resumed.ascertain_fitness()
+        # Only the batch that was never printed is printed again
+        self.assertEqual(2, len(self.printed))
+        self.evolve(resumed, 1)
+        self.assertEqual(
+            [g.fingerprint for g in expected.population],
+            [g.fingerprint for g in resumed.population],
+        )
+        self.assertEqual(
+            [g.fitness for g in expected.population],
+            [g.fitness for g in resumed.population],
+        )
+
+    def test_writes_are_incremental(self):
+        ga = self.make_ga()
+        ga.resume(EvolveProfile.Journal(self.path, self.profilemap))
+        ga.ascertain_fitness()
+        size = os.path.getsize(self.path)
+        ga.ascertain_fitness()
+        with open(self.path) as f:
+            lines = f.read().splitlines()
+        # Only a population record is added when nothing changed
+        self.assertTrue('"population"' in lines[-1])
+        self.assertFalse('"genomes"' in lines[-2])
+        self.assertTrue(os.path.getsize(self.path) > size)
+
+    def test_torn_record_is_dropped(self):
+        ga = self.make_ga()
+        ga.resume(EvolveProfile.Journal(self.path, self.profilemap))
+        ga.ascertain_fitness()
+        with open(self.path, 'ab') as f:
+            f.write(b'{"type": "fitness", "res')
+        journal = EvolveProfile.Journal(self.path, self.profilemap)
+        generation, population, rng_state, evaluated = journal.load()
+        self.assertEqual(10, len(evaluated))
+        journal.record_fitness(population)
+        journal = EvolveProfile.Journal(self.path, self.profilemap)
+        self.assertEqual(10, len(journal.load()[3]))
+
+    def test_schema_mismatch(self):
+        ga = self.make_ga()
+        ga.resume(EvolveProfile.Journal(self.path, self.profilemap))
+        ga.ascertain_fitness()
+        self.profilemap['d'] = ['r', 0, 1]
+        with self.assertRaises(EvolveProfile.SchemaMismatchError):
+            EvolveProfile.Journal(self.path, self.profilemap).load()
+
+    def test_append_without_resume(self):
+        ga = self.make_ga()
+        ga.resume(EvolveProfile.Journal(self.path, self.profilemap))
+        ga.ascertain_fitness()
+        # A second run journals to the same file without resuming it
+        other = EvolveProfile.GeneticAlgorithm(self.profilemap, 10, seed=1)
+        other.fitness_calculator = ga.fitness_calculator
+        other.journal = EvolveProfile.Journal(self.path, self.profilemap)
+        other.ascertain_fitness()
+        generation, population, rng_state, evaluated = EvolveProfile.Journal(
+            self.path, self.profilemap,
+        ).load()
+        self.assertEqual(
+            [genotype.fingerprint for genotype in other.population],
+            [genotype.fingerprint for genotype in population],
+        )
+        self.assertEqual([genotype.fitness for genotype in other.population],
+                         [genotype.fitness for genotype in population])
+        self.assertEqual(20, len(evaluated))
+
+    def test_append_with_other_schema(self):
+        ga = self.make_ga()
+        ga.resume(EvolveProfile.Journal(self.path, self.profilemap))
+        ga.ascertain_fitness()
+        self.profilemap['d'] = ['r', 0, 1]
+        other = EvolveProfile.GeneticAlgorithm(self.profilemap, 10, seed=1)
+        with self.assertRaises(EvolveProfile.SchemaMismatchError):
+            EvolveProfile.Journal(self.path, self.profilemap).record_population(
+                0, other.population, other.rng,
+            )
+
+if __name__ == "__main__":
+    unittest.main()
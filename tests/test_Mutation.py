@@ -0,0 +1,92 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+
+import EvolveProfile
+
+class TestMutation(unittest.TestCase):
+
+    def setUp(self):
+        self.specs = [
+            ['r', 0, 1],
+            ['r', 0, 100],
+            ['r', -1.0, 1.0],
+            ['l', 'a', 'b'],
+            ['l', 0, 1, 2, 3, 4, 5],
+        ]
+
+    def tearDown(self):
+        self.specs = None
+
+    def check_mutates(self, operator):
+        for spec in self.specs:
+            value = EvolveProfile.ProfileSchema.randomize_value(spec)
+            for i in range(100):
+                new_value = operator(spec, value)
+                self.assertNotEqual(value, new_value)
+                if spec[0] == 'r':
+                    self.assertTrue(spec[1] <= new_value <= spec[2])
+                    self.assertEqual(type(spec[1]), type(new_value))
+                else:
+                    self.assertTrue(new_value in spec[1:])
+                value = new_value
+
+    def test_uniform_reset(self):
+        self.check_mutates(EvolveProfile.uniform_reset)
+
+    def test_gaussian_creep(self):
+        self.check_mutates(EvolveProfile.gaussian_creep)
+
+    def test_gaussian_creep_at_bounds(self):
+        self.assertEqual(1, EvolveProfile.gaussian_creep(['r', 0, 10], 0, sigma=0))
+        self.assertEqual(9, EvolveProfile.gaussian_creep(['r', 0, 10], 10, sigma=0))
+
+    def test_can_mutate(self):
+        self.assertTrue(all(EvolveProfile.can_mutate(spec) for spec in self.specs))
+        self.assertFalse(EvolveProfile.can_mutate(['r', 3, 3]))
+        self.assertFalse(EvolveProfile.can_mutate(['l', 'only']))
+
+class TestGenotypeMutate(unittest.TestCase):
+
+    def setUp(self):
+        self.profilemap = {
+            'single': ['l', 'only'],
+            'fixed': ['r', 3, 3],
+            'narrow': ['r', 0, 1],
+            'sub': {
+                'choice': ['l', 'a', 'b'],
+            },
+        }
+        self.genotype = EvolveProfile.Genotype(self.profilemap)
+
+    def tearDown(self):
+        self.profilemap = None
+        self.genotype = None
+
+    def test_mutate_skips_single_values(self):
+        for i in range(50):
+            loci = self.genotype.mutate()
+            self.assertEqual(1, len(loci))
+            self.assertTrue(loci[0] in self.genotype.schema.mutable)
+
+    def test_mutate_nothing_mutable(self):
+        genotype = EvolveProfile.Genotype({'single': ['l', 'only']})
+        self.assertEqual([], genotype.mutate())
+
+    def test_mutate_rate(self):
+        before = list(self.genotype.slots)
+        loci = self.genotype.mutate(rate=1)
+        self.assertEqual(self.genotype.schema.mutable, loci)
+        for index in loci:
+            self.assertNotEqual(before[index], self.genotype.slots[index])
+        self.assertEqual([], self.genotype.mutate(rate=0))
+
+    def test_mutate_unknown_operator(self):
+        with self.assertRaises(EvolveProfile.UnknownOperatorError):
+            self.genotype.mutate('no_such_operator')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+import numpy
+import mock
+
+import EvolveProfile
+
+class TestNonDominatedSort(unittest.TestCase):
+
+    def test_fronts(self):
+        objectives = numpy.array([
+            [1.0, 5.0],
+            [5.0, 1.0],
+            [3.0, 3.0],
+            [2.0, 2.0],
+            [1.0, 1.0],
+            [0.0, 0.0],
+        ])
+        fronts = EvolveProfile.fast_non_dominated_sort(objectives)
+        self.assertEqual([[0, 1, 2], [3], [4], [5]], [list(front) for front in fronts])
+
+    def test_equal_members_share_a_front(self):
+        objectives = numpy.array([[1.0, 1.0], [1.0, 1.0], [0.0, 2.0]])
+        fronts = EvolveProfile.fast_non_dominated_sort(objectives)
+        self.assertEqual([[0, 1, 2]], [list(front) for front in fronts])
+
+    def test_crowding_distance(self):
+        objectives = numpy.array([
+            [0.0, 4.0],
+            [1.0, 3.0],
+            [3.0, 1.0],
+            [4.0, 0.0],
+        ])
+        distance = EvolveProfile.crowding_distance(objectives)
+        self.assertTrue(numpy.isinf(distance[0]) and numpy.isinf(distance[3]))
+        self.assertAlmostEqual(1.5, distance[1])
+        self.assertAlmostEqual(1.5, distance[2])
+
+class TestParetoArchive(unittest.TestCase):
+
+    def genotype(self, name):
+        genotype = mock.Mock()
+        genotype.name = name
+        return genotype
+
+    def test_add(self):
+        archive = EvolveProfile.ParetoArchive()
+        a, b, c, d = [self.genotype(name) for name in 'abcd']
+        self.assertTrue(archive.add(a, [1.0, 1.0]))
+        self.assertTrue(archive.add(b, [2.0, 0.0]))
+        self.assertFalse(archive.add(c, [0.5, 0.5]))
+        self.assertTrue(archive.add(d, [3.0, 1.0]))
+        self.assertEqual([d], archive.members)
+
+    def test_max_size(self):
+        archive = EvolveProfile.ParetoArchive(max_size=3)
+        for i in range(10):
+            archive.add(self.genotype(i), [i, 9 - i])
+        self.assertEqual(3, len(archive))
+        names = sorted(member.name for member in archive.members)
+        self.assertEqual(0, names[0])
+        self.assertEqual(9, names[-1])
+
+class TestNSGA2(unittest.TestCase):
+
+    def setUp(self):
+        self.profilemap = {
+            'x': ['r', 0.0, 1.0],
+            'y': ['r', 0.0, 1.0],
+        }
+        self.nsga = EvolveProfile.NSGA2(self.profilemap, 20, weights=[1, -1], seed=1776)
+
+    def tearDown(self):
+        self.profilemap = None
+        self.nsga = None
+
+    def score(self):
+        for genotype in self.nsga.population:
+            if genotype.fitness is None:
+                x = genotype.profile['x']
+                genotype.fitness = (x, x ** 2 + genotype.profile['y'])
+
+    def test_evolve(self):
+        self.score()
+        for generation in range(10):
+            self.nsga.cull_population()
+            self.assertEqual(10, len(self.nsga.population))
+            self.nsga.generate_population()
+            self.assertEqual(20, len(self.nsga.population))
+            self.score()
+        self.nsga.rank_population()
+        front = self.nsga.pareto_front()
+        self.assertTrue(len(front) > 1)
+        objectives = self.nsga.objectives(front)
+        dominates = EvolveProfile.dominance_matrix(objectives)
+        self.assertFalse(dominates.any())
+
+    def test_scores_follow_genomes(self):
+        self.score()
+        self.nsga.rank_population()
+        scores = self.nsga.selection_fitness(self.nsga.population)
+        copies = [genotype.copy() for genotype in self.nsga.population]
+        self.assertTrue(numpy.array_equal(scores, self.nsga.selection_fitness(copies)))
+        newcomer = EvolveProfile.Genotype(self.profilemap, rng=self.nsga.rng)
+        self.assertEqual(-numpy.inf, self.nsga.selection_fitness([newcomer])[0])
+
+    def test_cull_keeps_first_front(self):
+        self.score()
+        fronts = self.nsga.rank_population()
+        self.nsga.cull_population()
+        for genotype in fronts[0][:10]:
+            self.assertTrue(any(genotype is member for member in self.nsga.population))
+
+class Calculator(object):
+
+    def ascertain_fitness(self, genotypes, on_batch=None):
+        fitnesses = [(g.profile['x'], g.profile['x'] ** 2 + g.profile['y']) for g in genotypes]
+        on_batch(genotypes, fitnesses)
+        return fitnesses
+
+class TestNSGA2Evolve(unittest.TestCase):
+
+    def setUp(self):
+        self.profilemap = {
+            'x': ['r', 0, 3],
+            'y': ['r', 0, 3],
+        }
+        self.nsga = EvolveProfile.NSGA2(
+            self.profilemap, 8, weights=[1, -1], seed=1776, fitness_calculator=Calculator(),
+        )
+
+    def tearDown(self):
+        self.profilemap = None
+        self.nsga = None
+
+    def test_stagnation(self):
+        generations = list(self.nsga.evolve(max_generations=50, stagnation=2))
+        self.assertEqual('stagnation', generations[-1].stop_reason)
+        self.assertTrue(len(generations) < 50)
+        # The whole front of the small space was found
+        self.assertEqual(
+            set([(x, 0) for x in range(4)]),
+            set((g.profile['x'], g.profile['y']) for g in self.nsga.pareto_front()),
+        )
+
+    def test_stagnation_with_bounded_archive(self):
+        nsga = EvolveProfile.NSGA2(
+            self.profilemap, 8, weights=[1, -1], seed=1776, archive_size=2,
+            fitness_calculator=Calculator(),
+        )
+        generations = list(nsga.evolve(max_generations=50, stagnation=2))
+        self.assertEqual('stagnation', generations[-1].stop_reason)
+        self.assertTrue(len(generations) < 50)
+        self.assertEqual(2, len(nsga.archive))
+        # Members dropped for crowding and offered again are not progress,
+        # so no more can be added than the 16 genomes of the space
+        self.assertTrue(nsga.archive.additions <= 16, nsga.archive.additions)
+
+    def test_progress(self):
+        self.assertEqual(None, self.nsga.progress())
+        self.nsga.ascertain_fitness()
+        self.assertEqual(self.nsga.archive.additions, self.nsga.progress())
+        self.assertTrue(self.nsga.progress() > 0)
+
+    def test_no_target(self):
+        self.assertRaises(ValueError, self.nsga.evolve, target=0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,8 @@ sys.path.insert(0, lib_path)
 import unittest
 import json
 import tempfile
+import time
+import subprocess
 import mock
 
 import EvolveProfile
@@ -36,6 +38,142 @@ class TestPhysicalFitnessCalculator(unittest.TestCase):
         calls = self.pfc.HCI.ask_fitness.mock_calls
         self.assertTrue(len(calls) == 2)
        
+    def test_ascertain_fitness_reports_batches(self):
+        self.pfc.check_call = mock.Mock()
+        self.pfc.HCI = mock.Mock()
+        fitnesses = [range(10, 15), range(0, 10)]
+        self.pfc.HCI.ask_fitness = mock.Mock(side_effect=lambda *args: fitnesses.pop())
+        genotypes = [EvolveProfile.Genotype({}) for i in range(15)]
+        on_batch = mock.Mock()
+        self.pfc.ascertain_fitness(genotypes, on_batch=on_batch)
+        self.assertEqual([
+            mock.call(genotypes[:10], range(0, 10)),
+            mock.call(genotypes[10:], range(10, 15)),
+        ], on_batch.mock_calls)
+
+    def test_race(self):
+        self.pfc.racing = True
+        self.pfc.model_paths = self.pfc.model_paths[:4]
+        costs = dict(zip(sorted(self.pfc.model_paths), [3, 1, 4, 2]))
+        self.pfc.model_cost = costs.get
+        printed = []
+        def print_batch(model_paths, genotypes):
+            printed.append((model_paths, [g.profile['a'] for g in genotypes]))
+            return [g.profile['a'] for g in genotypes]
+        self.pfc.print_batch = mock.Mock(side_effect=print_batch)
+        genotypes = [EvolveProfile.Genotype({}) for i in range(6)]
+        for i, g in enumerate(genotypes):
+            g.profile = {'a': [3, 0, 5, 1, 4, 2][i]}
+        on_batch = mock.Mock()
+        fitnesses = self.pfc.ascertain_fitness(genotypes, on_batch=on_batch)
+        self.assertEqual([3, 0, 5, 1, 4, 2], fitnesses)
+        models = sorted(self.pfc.model_paths, key=costs.get)
+        self.assertEqual(models, self.pfc.racing_models())
+        self.assertEqual([
+            ([models[0]] * 4, [3, 0, 5, 1]),
+            ([models[0]] * 2, [4, 2]),
+            ([models[1]] * 3, [3, 5, 4]),
+            ([models[2]] * 2, [5, 4]),
+            ([models[3]], [5]),
+        ], printed)
+        self.assertEqual([
+            mock.call([genotypes[1], genotypes[3], genotypes[5]], [0, 1, 2]),
+            mock.call([genotypes[0]], [3]),
+            mock.call([genotypes[4]], [4]),
+            mock.call([genotypes[2]], [5]),
+        ], on_batch.mock_calls)
+
+    def test_race_keeps_elimination_order(self):
+        self.pfc.racing = True
+        self.pfc.model_paths = self.pfc.model_paths[:2]
+        scores = [[9, 8], [7.9, 1], [1, 3]]
+        self.pfc.print_batch = mock.Mock(side_effect=lambda models, genotypes: scores.pop(0))
+        genotypes = [EvolveProfile.Genotype({}) for i in range(4)]
+        on_batch = mock.Mock()
+        fitnesses = self.pfc.ascertain_fitness(genotypes, on_batch=on_batch)
+        # The finalists averaged 5 and 5.5, below the 7.9 of a dropout
+        self.assertEqual([7.9, 1], fitnesses[2:])
+        self.assertTrue(fitnesses[1] > fitnesses[0] > 7.9)
+        self.assertAlmostEqual(.5, fitnesses[1] - fitnesses[0])
+        self.assertEqual([
+            mock.call([genotypes[2], genotypes[3]], [7.9, 1]),
+            mock.call([genotypes[0], genotypes[1]], fitnesses[:2]),
+        ], on_batch.mock_calls)
+
+    def test_race_averages_models(self):
+        self.pfc.racing = True
+        self.pfc.model_paths = self.pfc.model_paths[:2]
+        scores = [[1, 2], [3]]
+        self.pfc.print_batch = mock.Mock(side_effect=lambda models, genotypes: scores.pop(0))
+        genotypes = [EvolveProfile.Genotype({}) for i in range(2)]
+        self.assertEqual([1, 2.5], self.pfc.ascertain_fitness(genotypes))
+
+    def fake_slice(self, failing=()):
+        def slice_(model_path, profile):
+            # Later models finish first
+            time.sleep(.05 * (5 - profile['a']))
+            if profile['a'] in failing:
+                raise subprocess.CalledProcessError(1, 'miracle_grue')
+            with tempfile.NamedTemporaryFile(suffix='.gcode', delete=False) as f:
+                f.write('G1 X%d\n' % profile['a'])
+            return {'output_path': f.name}
+        return slice_
+
+    def test_slice_models_in_parallel(self):
+        self.pfc.slice_workers = 5
+        self.pfc._slice = mock.Mock(side_effect=self.fake_slice())
+        model_paths = self.pfc.model_paths[:5]
+        started = time.time()
+        path = self.pfc.slice_models(model_paths, [{'a': i} for i in range(5)])
+        self.assertTrue(time.time() - started < .6)
+        with open(path) as f:
+            lines = [line for line in f if line.startswith('G1 X') and 'Transition' not in line]
+        self.assertEqual(['G1 X%d\n' % i for i in range(5)], lines)
+        with open(path) as f:
+            comments = [line for line in f if line.startswith('; Here follows')]
+        self.assertEqual(['; Here follows %s\n' % model for model in model_paths], comments)
+
+    def test_slice_failures(self):
+        self.pfc.slice_workers = 3
+        self.pfc._slice = mock.Mock(side_effect=self.fake_slice(failing=(1, 3)))
+        model_paths = self.pfc.model_paths[:5]
+        try:
+            self.pfc.slice_models(model_paths, [{'a': i} for i in range(5)])
+        except EvolveProfile.SliceError as e:
+            self.assertEqual([1, 3], [index for index, model_path, error in e.failures])
+            self.assertEqual([model_paths[1], model_paths[3]], [m for i, m, error in e.failures])
+            with open(e.path) as f:
+                lines = [line for line in f if line.startswith('G1 X') and 'Transition' not in line]
+            self.assertEqual(['G1 X0\n', 'G1 X2\n', 'G1 X4\n'], lines)
+        else:
+            self.fail('SliceError not raised')
+        self.assertEqual(5, self.pfc._slice.call_count)
+
+    def test_print_batch_rejects_failed_slices(self):
+        self.pfc.check_call = mock.Mock()
+        self.pfc.HCI = mock.Mock()
+        self.pfc.HCI.ask_fitness = mock.Mock(return_value=[5, 6, 7])
+        self.pfc._slice = mock.Mock(side_effect=self.fake_slice(failing=(1,)))
+        genotypes = [EvolveProfile.Genotype({}) for i in range(4)]
+        for i, g in enumerate(genotypes):
+            g.profile = {'a': i}
+        fitnesses = self.pfc.print_batch(self.pfc.model_paths[:4], genotypes)
+        self.assertEqual([5, -1000, 6, 7], fitnesses)
+        self.pfc.HCI.ask_fitness.assert_called_once_with(3)
+
+    def test_print_batch_missing_slicer(self):
+        self.pfc.check_call = mock.Mock(side_effect=OSError)
+        self.pfc.HCI = mock.Mock()
+        genotypes = [EvolveProfile.Genotype({}) for i in range(2)]
+        self.assertRaises(OSError, self.pfc.print_batch, self.pfc.model_paths[:2], genotypes)
+        self.assertFalse(self.pfc.HCI.ask_fitness.called)
+
+    def test_models_fingerprint(self):
+        fingerprint = self.pfc.models_fingerprint()
+        self.assertEqual(fingerprint, self.pfc.models_fingerprint())
+        self.pfc.master_profile['layerHeight'] = 1000
+        self.assertNotEqual(fingerprint, self.pfc.models_fingerprint())
+
     def test_get_model_paths(self):
         expected_model_paths = []
         for path in os.listdir(self.model_path):
@@ -0,0 +1,123 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+import numpy
+
+import EvolveProfile
+
+class TestPopulation(unittest.TestCase):
+
+    def setUp(self):
+        self.profilemap = {
+            'paramA': ['r', 0, 3],
+            'paramB': ['l', 'a', 'b', 'c'],
+            'paramC': ['r', -1.0, 1.0],
+            'paramD': ['l', 'only'],
+            'subConfig': {
+                'paramE': ['r', 5, 5],
+            },
+        }
+        self.schema = EvolveProfile.ProfileSchema(self.profilemap)
+        self.population = EvolveProfile.Population(self.schema).randomize(200)
+
+    def tearDown(self):
+        self.profilemap = None
+        self.schema = None
+        self.population = None
+
+    def check_genotype(self, genotype):
+        profile = genotype.profile
+        self.assertTrue(isinstance(profile['paramA'], int))
+        self.assertTrue(0 <= profile['paramA'] <= 3)
+        self.assertTrue(profile['paramB'] in ['a', 'b', 'c'])
+        self.assertTrue(isinstance(profile['paramC'], float))
+        self.assertTrue(-1.0 <= profile['paramC'] <= 1.0)
+        self.assertEqual('only', profile['paramD'])
+        self.assertEqual(5, profile['subConfig']['paramE'])
+
+    def test_randomize(self):
+        self.assertEqual(200, len(self.population))
+        for genotype in self.population.to_genotypes(self.profilemap):
+            self.check_genotype(genotype)
+
+    def test_genotype_round_trip(self):
+        genotypes = self.population.to_genotypes(self.profilemap)
+        population = EvolveProfile.Population(self.schema).from_genotypes(genotypes)
+        self.assertEqual(genotypes, population.to_genotypes(self.profilemap))
+
+    def test_mutate_all(self):
+        mutants = self.population.mutate(1)
+        before = self.population.to_genotypes(self.profilemap)
+        after = mutants.to_genotypes(self.profilemap)
+        for old, new in zip(before, after):
+            self.check_genotype(new)
+            self.assertNotEqual(old.profile['paramA'], new.profile['paramA'])
+            self.assertNotEqual(old.profile['paramB'], new.profile['paramB'])
+            self.assertNotEqual(old.profile['paramC'], new.profile['paramC'])
+
+    def test_mutate_none(self):
+        mutants = self.population.mutate(0)
+        self.assertEqual(
+            self.population.to_genotypes(self.profilemap),
+            mutants.to_genotypes(self.profilemap),
+        )
+
+    def test_mutate_one_slot(self):
+        rows = numpy.arange(200) % 2 == 0
+        mutants = self.population.mutate(rows=rows)
+        changed = (mutants.genes != self.population.genes).sum(axis=1)
+        self.assertTrue((changed[rows] == 1).all())
+        self.assertTrue((changed[~rows] == 0).all())
+        # Only the first three slots can take more than one value
+        self.assertTrue((mutants.genes[:, 3:] == self.population.genes[:, 3:]).all())
+        for genotype in mutants.to_genotypes(self.profilemap):
+            self.check_genotype(genotype)
+
+    def test_from_genotypes_bad_option(self):
+        genotype = self.population.to_genotypes(self.profilemap)[0]
+        genotype.profile = dict(genotype.profile, paramB='z')
+        with self.assertRaises(ValueError):
+            EvolveProfile.Population(self.schema).from_genotypes([genotype])
+
+    def test_uniform_crossover(self):
+        first = range(0, 100)
+        second = range(100, 200)
+        children = self.population.uniform_crossover(first, second)
+        self.assertEqual(100, len(children))
+        for i, child in enumerate(children.genes):
+            for j, gene in enumerate(child):
+                self.assertTrue(gene in (self.population.genes[first[i], j], self.population.genes[second[i], j]))
+
+    def test_latin_hypercube(self):
+        population = EvolveProfile.Population(self.schema).latin_hypercube(8)
+        self.assertEqual((8, len(self.schema)), population.genes.shape)
+        self.assertTrue((population.genes >= population.lows).all())
+        self.assertTrue((population.genes <= population.highs).all())
+        column = self.schema.paths.index(('paramC',))
+        strata = numpy.floor((population.genes[:, column] + 1) / 2 * 8)
+        self.assertEqual(list(range(8)), sorted(strata))
+        column = self.schema.paths.index(('paramA',))
+        self.assertEqual([0, 0, 1, 1, 2, 2, 3, 3], sorted(population.genes[:, column]))
+
+    def test_features(self):
+        schema = EvolveProfile.ProfileSchema({
+            'paramA': ['r', 0, 4],
+            'paramB': ['l', 'a', 'b', 'c'],
+        })
+        column = schema.paths.index(('paramA',))
+        genes = numpy.zeros((2, 2))
+        genes[:, column] = [1, 4]
+        genes[:, 1 - column] = [0, 2]
+        features = EvolveProfile.Population(schema, genes).features()
+        one_hot = numpy.array([[1, 0, 0], [0, 0, 1]]) / numpy.sqrt(2)
+        if column == 0:
+            expected = numpy.hstack([[[.25], [1]], one_hot])
+        else:
+            expected = numpy.hstack([one_hot, [[.25], [1]]])
+        self.assertTrue(numpy.allclose(expected, features))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+import shutil
+import tempfile
+import mock
+
+import EvolveProfile
+
+class TestProfileHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.profilemap = {
+            'a': ['r', 0, 100],
+            'b': ['l', 1, 2, 3],
+        }
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'history.db')
+        self.history = EvolveProfile.ProfileHistory(self.path, 'printer', 'pla', 'models')
+        self.rng = EvolveProfile.RandomStream(1)
+        self.genotypes = [
+            EvolveProfile.Genotype(self.profilemap, {'a': i * 10, 'b': 1}, rng=self.rng)
+            for i in range(5)
+        ]
+        for i, genotype in enumerate(self.genotypes):
+            genotype.fitness = i
+
+    def tearDown(self):
+        self.history.close()
+        shutil.rmtree(self.directory)
+        self.profilemap = None
+
+    def test_record(self):
+        self.genotypes[0].fitness = None
+        self.genotypes[1].fitness = (1, 2)
+        self.history.record(self.genotypes)
+        self.assertEqual(3, len(self.history))
+        self.assertEqual(
+            [({'a': 40, 'b': 1}, 4), ({'a': 30, 'b': 1}, 3), ({'a': 20, 'b': 1}, 2)],
+            list(self.history.profiles()),
+        )
+
+    def test_similar_profiles_first(self):
+        self.history.record(self.genotypes[:2])
+        other_models = EvolveProfile.ProfileHistory(self.path, 'printer', 'pla', 'other')
+        other_models.record(self.genotypes[2:4])
+        other_printer = EvolveProfile.ProfileHistory(self.path, 'other', 'pla', 'models')
+        other_printer.record(self.genotypes[4:])
+        self.assertEqual(
+            [10, 0, 30, 20], [profile['a'] for profile, fitness in self.history.profiles()],
+        )
+        self.assertEqual([40], [profile['a'] for profile, fitness in other_printer.profiles()])
+
+    def test_seed(self):
+        self.history.record(self.genotypes + [genotype.copy() for genotype in self.genotypes])
+        profilemap = {
+            'a': ['r', 0, 35],
+            'b': ['l', 1, 2, 3],
+            'c': ['r', 0.0, 1.0],
+        }
+        seeds = self.history.seed(profilemap, 8, self.rng)
+        self.assertEqual(8, len(seeds))
+        self.assertEqual(8, len(set(genotype.fingerprint for genotype in seeds)))
+        self.assertEqual([35, 30, 20, 10], [genotype.profile['a'] for genotype in seeds[:4]])
+        for genotype in seeds:
+            self.assertEqual(None, genotype.fitness)
+            self.assertTrue(0 <= genotype.profile['c'] <= 1)
+            self.assertTrue(genotype.profile['b'] in (1, 2, 3))
+
+    def test_seed_without_history(self):
+        seeds = self.history.seed(self.profilemap, 6, self.rng)
+        self.assertEqual(6, len(seeds))
+        self.assertEqual(6, len(set(genotype.fingerprint for genotype in seeds)))
+
+    def test_warm_start(self):
+        self.history.record(self.genotypes)
+        ga = EvolveProfile.GeneticAlgorithm(self.profilemap, 6, seed=1)
+        ga.warm_start(self.history)
+        self.assertEqual(6, len(ga.population))
+        self.assertEqual([40, 30, 20], [genotype.profile['a'] for genotype in ga.population[:3]])
+        ga.fitness_calculator = mock.Mock()
+        ga.fitness_calculator.ascertain_fitness = lambda genotypes, on_batch: [100] * len(genotypes)
+        ga.ascertain_fitness()
+        self.assertEqual(5 + 6, len(self.history))
+
+if __name__ == "__main__":
+    unittest.main()
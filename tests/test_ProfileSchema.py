@@ -0,0 +1,184 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+
+import EvolveProfile
+
+class TestProfileSchema(unittest.TestCase):
+
+    def setUp(self):
+        self.profilemap = {
+            'paramA': ['r', 0, 100],
+            'paramB': ['l', 0, 1, 2, 3, 4, 5],
+            'subConfig': {
+                'paramD': ['r', 100.0, 200.0],
+                'paramE': ['l', 'a', 'b', 'c', 'd'],
+                'subSubConfig': {
+                    'paramF': ['r', -5, 5],
+                },
+            },
+        }
+        self.schema = EvolveProfile.ProfileSchema(self.profilemap)
+
+    def tearDown(self):
+        self.profilemap = None
+        self.schema = None
+
+    def test_paths_are_sorted(self):
+        expected_paths = [
+            ('paramA',),
+            ('paramB',),
+            ('subConfig', 'paramD'),
+            ('subConfig', 'paramE'),
+            ('subConfig', 'subSubConfig', 'paramF'),
+        ]
+        self.assertEqual(expected_paths, self.schema.paths)
+        self.assertEqual(len(expected_paths), len(self.schema))
+
+    def test_build_profile(self):
+        slots = [1, 2, 150.0, 'c', 0]
+        expected_profile = {
+            'paramA': 1,
+            'paramB': 2,
+            'subConfig': {
+                'paramD': 150.0,
+                'paramE': 'c',
+                'subSubConfig': {
+                    'paramF': 0,
+                },
+            },
+        }
+        self.assertEqual(expected_profile, self.schema.build_profile(slots))
+
+    def test_flatten_round_trip(self):
+        slots = self.schema.randomize()
+        profile = self.schema.build_profile(slots)
+        self.assertEqual(slots, self.schema.flatten(profile))
+
+    def test_flatten_missing_entries(self):
+        profile = {'paramA': 4, 'subConfig': {}}
+        self.assertEqual([4, None, None, None, None], self.schema.flatten(profile))
+
+    def test_repair(self):
+        profile = {
+            'paramA': 140.6,
+            'paramB': 9,
+            'removed': 3,
+            'subConfig': {
+                'paramD': 120,
+                'paramE': 'b',
+            },
+        }
+        slots = self.schema.repair(profile, EvolveProfile.RandomStream(1))
+        self.assertEqual([100, 120.0, 'b'], [slots[0], slots[2], slots[3]])
+        self.assertTrue(isinstance(slots[0], int))
+        self.assertTrue(isinstance(slots[2], float))
+        self.assertTrue(slots[1] in range(6))
+        self.assertTrue(slots[4] in range(-5, 6))
+        self.assertEqual(slots, self.schema.repair(self.schema.build_profile(slots)))
+
+    def test_empty_submap(self):
+        schema = EvolveProfile.ProfileSchema({'a': ['r', 0, 1], 'empty': {}})
+        self.assertEqual([('a',)], schema.paths)
+        self.assertEqual({'a': 1, 'empty': {}}, schema.build_profile([1]))
+
+    def test_equal(self):
+        same = EvolveProfile.ProfileSchema(dict(self.profilemap))
+        different = EvolveProfile.ProfileSchema({'paramA': ['r', 0, 100]})
+        self.assertTrue(self.schema == same)
+        self.assertTrue(self.schema != different)
+
+class TestProfileSchemaLists(unittest.TestCase):
+
+    def setUp(self):
+        self.profilemap = {
+            'layerHeight': ['r', 0.1, 0.3],
+            'extruderProfiles': [
+                None,
+                {
+                    'retractDistance': ['r', 0.0, 3.0],
+                    'retractRate': ['r', 10, 40],
+                },
+            ],
+            'extrusionProfiles': {
+                'infill': {
+                    'temperature': ['r', 200.0, 240.0],
+                },
+            },
+        }
+        self.schema = EvolveProfile.ProfileSchema(self.profilemap)
+        self.master = {
+            'layerHeight': 0.15,
+            'doRaft': False,
+            'extruderProfiles': [
+                {'retractDistance': 1, 'retractRate': 20, 'nozzleDiameter': 0.4},
+                {'retractDistance': 1, 'retractRate': 20, 'nozzleDiameter': 0.4},
+            ],
+            'extrusionProfiles': {
+                'infill': {'temperature': 230.0, 'feedrate': 80},
+                'insets': {'temperature': 230.0, 'feedrate': 80},
+            },
+        }
+
+    def tearDown(self):
+        self.profilemap = None
+        self.schema = None
+        self.master = None
+
+    def test_paths(self):
+        expected_paths = [
+            ('extruderProfiles', 1, 'retractDistance'),
+            ('extruderProfiles', 1, 'retractRate'),
+            ('extrusionProfiles', 'infill', 'temperature'),
+            ('layerHeight',),
+        ]
+        self.assertEqual(expected_paths, self.schema.paths)
+
+    def test_build_profile_and_flatten(self):
+        slots = [2.5, 30, 210.0, 0.2]
+        expected_profile = {
+            'layerHeight': 0.2,
+            'extruderProfiles': [
+                None,
+                {'retractDistance': 2.5, 'retractRate': 30},
+            ],
+            'extrusionProfiles': {
+                'infill': {'temperature': 210.0},
+            },
+        }
+        profile = self.schema.build_profile(slots)
+        self.assertEqual(expected_profile, profile)
+        self.assertEqual(slots, self.schema.flatten(profile))
+        self.assertEqual(slots, self.schema.flatten(self.schema.assoc(profile, 0, 2.5)))
+
+    def test_assoc_does_not_change_profile(self):
+        profile = self.schema.build_profile([2.5, 30, 210.0, 0.2])
+        updated = self.schema.assoc(profile, 0, 0.5)
+        self.assertEqual(2.5, profile['extruderProfiles'][1]['retractDistance'])
+        self.assertEqual(0.5, updated['extruderProfiles'][1]['retractDistance'])
+        self.assertTrue(updated['extrusionProfiles'] is profile['extrusionProfiles'])
+
+    def test_merge_profile(self):
+        profile = self.schema.build_profile([2.5, 30, 210.0, 0.2])
+        merged = EvolveProfile.merge_profile(self.master, profile)
+        self.assertEqual(0.2, merged['layerHeight'])
+        self.assertEqual(False, merged['doRaft'])
+        self.assertEqual(self.master['extruderProfiles'][0], merged['extruderProfiles'][0])
+        self.assertEqual(
+            {'retractDistance': 2.5, 'retractRate': 30, 'nozzleDiameter': 0.4},
+            merged['extruderProfiles'][1],
+        )
+        self.assertEqual({'temperature': 210.0, 'feedrate': 80}, merged['extrusionProfiles']['infill'])
+        self.assertEqual(1, self.master['extruderProfiles'][1]['retractDistance'])
+
+    def test_genotype_mutate(self):
+        genotype = EvolveProfile.Genotype(self.profilemap, schema=self.schema)
+        genotype.profile
+        genotype.mutate(rate=1)
+        self.assertEqual(genotype.slots, self.schema.flatten(genotype.profile))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+
+import EvolveProfile
+
+class TestRandomStream(unittest.TestCase):
+
+    def draw(self, rng):
+        return [rng.random() for i in range(5)] + list(rng.random_sample(5))
+
+    def test_same_seed_same_stream(self):
+        self.assertEqual(
+            self.draw(EvolveProfile.RandomStream(1776)),
+            self.draw(EvolveProfile.RandomStream(1776)),
+        )
+        self.assertNotEqual(
+            self.draw(EvolveProfile.RandomStream(1776)),
+            self.draw(EvolveProfile.RandomStream(1777)),
+        )
+
+    def test_spawn(self):
+        first = EvolveProfile.RandomStream(1776).spawn(3)
+        second = EvolveProfile.RandomStream(1776)
+        second = second.spawn(1) + second.spawn(2)
+        draws = [self.draw(rng) for rng in first]
+        self.assertEqual(draws, [self.draw(rng) for rng in second])
+        self.assertNotEqual(draws[0], draws[1])
+        self.assertNotEqual(draws[0], self.draw(EvolveProfile.RandomStream(1776)))
+
+    def test_state(self):
+        rng = EvolveProfile.RandomStream(1776)
+        rng.spawn(2)
+        state = rng.getstate()
+        expected = self.draw(rng) + [self.draw(child) for child in rng.spawn(1)]
+        rng.setstate(state)
+        self.assertEqual(expected, self.draw(rng) + [self.draw(child) for child in rng.spawn(1)])
+
+class TestSeededRun(unittest.TestCase):
+
+    def setUp(self):
+        self.profilemap = {
+            'a': ['l', 1, 2, 3],
+            'b': ['r', 0, 100],
+            'c': ['r', -1.0, 1.0],
+        }
+
+    def tearDown(self):
+        self.profilemap = None
+
+    def run_ga(self, seed):
+        ga = EvolveProfile.GeneticAlgorithm(self.profilemap, 10, seed=seed)
+        for i, genotype in enumerate(ga.population):
+            genotype.fitness = i
+        ga.cull_population()
+        ga.generate_population()
+        return [genotype.fingerprint for genotype in ga.population]
+
+    def test_replay_from_seed(self):
+        self.assertEqual(self.run_ga(1776), self.run_ga(1776))
+        self.assertNotEqual(self.run_ga(1776), self.run_ga(1777))
+
+if __name__ == "__main__":
+    unittest.main()
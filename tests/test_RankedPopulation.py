@@ -0,0 +1,63 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+import random
+import mock
+
+import EvolveProfile
+
+class TestRankedPopulation(unittest.TestCase):
+
+    def setUp(self):
+        self.genotypes = []
+        for fitness in [5, 1, None, 9, 5, 3]:
+            self.genotypes.append(mock.Mock())
+            self.genotypes[-1].fitness = fitness
+        self.ranked = EvolveProfile.RankedPopulation(self.genotypes)
+
+    def tearDown(self):
+        self.genotypes = None
+        self.ranked = None
+
+    def test_order(self):
+        self.assertEqual([9, 5, 5, 3, 1, None], [g.fitness for g in self.ranked])
+        # Ties keep the order they were added in
+        self.assertTrue(self.ranked.top(3)[1] is self.genotypes[0])
+        self.assertTrue(self.ranked.top(3)[2] is self.genotypes[4])
+
+    def test_best_and_worst(self):
+        self.assertTrue(self.ranked.best() is self.genotypes[3])
+        self.assertTrue(self.ranked.worst() is self.genotypes[2])
+        empty = EvolveProfile.RankedPopulation()
+        self.assertEqual(None, empty.best())
+        self.assertEqual(None, empty.worst())
+
+    def test_add_and_remove(self):
+        genotype = mock.Mock()
+        genotype.fitness = 4
+        member_id = self.ranked.add(genotype)
+        self.assertEqual([9, 5, 5, 4, 3, 1, None], [g.fitness for g in self.ranked])
+        self.assertTrue(self.ranked.remove(member_id) is genotype)
+        self.assertFalse(member_id in self.ranked)
+        self.assertEqual([9, 5, 5, 3, 1, None], [g.fitness for g in self.ranked])
+
+    def test_truncate(self):
+        dropped = self.ranked.truncate(2)
+        self.assertEqual([9, 5], [g.fitness for g in self.ranked])
+        self.assertEqual([5, 3, 1, None], [g.fitness for g in dropped])
+        self.assertEqual(2, len(self.ranked))
+
+    def test_random_inserts_stay_sorted(self):
+        ranked = EvolveProfile.RankedPopulation()
+        for i in range(200):
+            genotype = mock.Mock()
+            genotype.fitness = random.randint(0, 50)
+            ranked.add(genotype)
+        fitnesses = [g.fitness for g in ranked]
+        self.assertEqual(sorted(fitnesses, reverse=True), fitnesses)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+import numpy
+
+import EvolveProfile
+
+class TestSelection(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = EvolveProfile.RandomStream(1776)
+        self.fitness = numpy.arange(50, dtype=float)
+
+    def tearDown(self):
+        self.rng = None
+        self.fitness = None
+
+    def test_tournament(self):
+        winners = EvolveProfile.select_tournament(self.fitness, 1000, self.rng, size=3)
+        self.assertEqual((1000,), winners.shape)
+        # The two least fit members can never win a tournament of three
+        self.assertTrue((winners >= 2).all())
+
+    def test_large_tournament(self):
+        fitness = numpy.arange(30, dtype=float)
+        winners = EvolveProfile.select_tournament(fitness, 20000, self.rng, size=25)
+        self.assertTrue((winners >= 24).all())
+        # The fittest member is in a tournament with probability 25 / 30
+        self.assertAlmostEqual(25 / 30., (winners == 29).mean(), delta=.02)
+
+    def test_tournament_ties(self):
+        winners = EvolveProfile.select_tournament(numpy.zeros(3), 30000, self.rng, size=2)
+        counts = numpy.bincount(winners, minlength=3) / 30000.
+        self.assertTrue(numpy.allclose(1 / 3., counts, atol=.02), counts)
+
+    def test_tournament_bad_size(self):
+        with self.assertRaises(EvolveProfile.TournamentSizeError):
+            EvolveProfile.select_tournament(self.fitness, 10, self.rng, size=50)
+
+    def test_operators_prefer_fitter(self):
+        for operator in EvolveProfile.selection_operators:
+            chosen = EvolveProfile.select(operator, self.fitness, 2000, self.rng)
+            self.assertEqual(2000, len(chosen))
+            self.assertTrue(((chosen >= 0) & (chosen < 50)).all())
+            self.assertTrue((chosen >= 25).sum() > (chosen < 25).sum(), operator)
+
+    def test_unscored_never_chosen(self):
+        fitness = numpy.array([-numpy.inf, -numpy.inf, 1.0, 2.0, 3.0])
+        for operator in ['roulette', 'sus', 'tournament']:
+            chosen = EvolveProfile.select(operator, fitness, 200, self.rng, size=3 if operator == 'tournament' else None)
+            self.assertTrue((chosen >= 2).all(), operator)
+
+    def test_stochastic_universal_spread(self):
+        fitness = numpy.array([1.0, 1.0, 2.0])
+        chosen = EvolveProfile.select_stochastic_universal(fitness, 100, self.rng)
+        self.assertTrue(abs(numpy.sum(chosen == 2) - 50) <= 1)
+
+    def test_pairs_are_distinct(self):
+        for operator in EvolveProfile.selection_operators:
+            pairs = EvolveProfile.select_pairs(operator, self.fitness, 500, self.rng)
+            self.assertEqual((500, 2), pairs.shape)
+            self.assertFalse((pairs[:, 0] == pairs[:, 1]).any())
+
+    def test_pairs_one_dominant_member(self):
+        fitness = numpy.array([0.0, 0.0, 0.0, 10.0])
+        pairs = EvolveProfile.select_pairs('roulette', fitness, 100, self.rng)
+        self.assertFalse((pairs[:, 0] == pairs[:, 1]).any())
+
+    def test_pairs_fallback(self):
+        # Redrawing never pairs the only member with any fitness with
+        # another, so every pair falls back to a uniform partner
+        fitness = numpy.array([0.0, 0.0, 0.0, 10.0])
+        pairs = EvolveProfile.select_pairs('roulette', fitness, 3000, EvolveProfile.RandomStream(1))
+        self.assertTrue((pairs[:, 0] == 3).all())
+        counts = numpy.bincount(pairs[:, 1], minlength=4) / 3000.
+        self.assertTrue(numpy.allclose([1 / 3., 1 / 3., 1 / 3., 0], counts, atol=.04), counts)
+        again = EvolveProfile.select_pairs('roulette', fitness, 3000, EvolveProfile.RandomStream(1))
+        self.assertTrue((pairs == again).all())
+
+    def test_pairs_follow_operator(self):
+        # The least fit of three members never wins a tournament of two,
+        # even when the pair has to be redrawn past _MAX_REDRAWS
+        pairs = EvolveProfile.select_pairs('tournament', numpy.arange(3.), 5000, self.rng, 2)
+        self.assertFalse((pairs == 0).any())
+        self.assertFalse((pairs[:, 0] == pairs[:, 1]).any())
+
+    def test_selection_probabilities(self):
+        fitness = numpy.array([3., 0., 4., 1., 2.])
+        probabilities = EvolveProfile.selection_probabilities('tournament', fitness, 3)
+        # A member wins if it is drawn along with two of the members below it
+        self.assertTrue(numpy.allclose([.3, 0, .6, 0, .1], probabilities))
+        self.assertTrue(numpy.allclose(
+            [.2] * 5, EvolveProfile.selection_probabilities('tournament', numpy.ones(5), 3),
+        ))
+        self.assertTrue(numpy.allclose(
+            [4 / 15., 1 / 15., 5 / 15., 2 / 15., 3 / 15.],
+            EvolveProfile.selection_probabilities('rank', fitness),
+        ))
+        for operator in ['roulette', 'sus']:
+            self.assertTrue(numpy.allclose(fitness / 10, EvolveProfile.selection_probabilities(operator, fitness)))
+        with self.assertRaises(EvolveProfile.UnknownOperatorError):
+            EvolveProfile.selection_probabilities('no_such_operator', fitness)
+
+    def test_tournament_probabilities_match_draws(self):
+        fitness = numpy.array([1., 5., 5., 2., -numpy.inf, 3.])
+        winners = EvolveProfile.select_tournament(fitness, 30000, self.rng, size=2)
+        counts = numpy.bincount(winners, minlength=6) / 30000.
+        expected = EvolveProfile.selection_probabilities('tournament', fitness, 2)
+        self.assertTrue(numpy.allclose(expected, counts, atol=.02), (expected, counts))
+
+    def test_unknown_operator(self):
+        with self.assertRaises(EvolveProfile.UnknownOperatorError):
+            EvolveProfile.select('no_such_operator', self.fitness, 1, self.rng)
+
+if __name__ == "__main__":
+    unittest.main()
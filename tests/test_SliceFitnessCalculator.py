@@ -0,0 +1,97 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+import subprocess
+import tempfile
+import mock
+
+import EvolveProfile
+
+GCODE = """; Made by a slicer
+G21
+G90
+G1 Z0.2 F600
+G1 X10 Y0 F1200 ; travel
+G1 X20 Y0 A1.5
+G1 X20 Y10 A3.0
+G92 A0
+G1 Z0.4
+G1 X10 Y10 A1.0 F600
+M18
+"""
+
+def write_gcode(text):
+    with tempfile.NamedTemporaryFile(suffix='.gcode', delete=False) as f:
+        f.write(text)
+        return f.name
+
+class TestSliceFitnessCalculator(unittest.TestCase):
+
+    def setUp(self):
+        self.model_path = os.path.join(
+            os.path.abspath(os.path.dirname(__file__)),
+            'test_models'
+        )
+        self.sfc = EvolveProfile.SliceFitnessCalculator(self.model_path)
+
+    def tearDown(self):
+        self.sfc = None
+
+    def test_slice_metrics(self):
+        metrics = EvolveProfile.slice_metrics(write_gcode(GCODE))
+        self.assertEqual(6, metrics['moves'])
+        self.assertAlmostEqual(4., metrics['extrusion'])
+        self.assertAlmostEqual(30., metrics['extruding'])
+        self.assertAlmostEqual(10.4, metrics['travel'])
+        self.assertAlmostEqual(10.4 / 40.4, metrics['travel_ratio'])
+        self.assertEqual(2, metrics['layers'])
+        expected_time = .2 / 10 + 10 / 20. + 10 / 20. + 10 / 20. + .2 / 20 + 10 / 10.
+        self.assertAlmostEqual(expected_time, metrics['time'])
+
+    def test_slice_metrics_of_nothing(self):
+        metrics = EvolveProfile.slice_metrics(write_gcode('G21\nM18\n'))
+        self.assertEqual(0, metrics['moves'])
+        self.assertEqual(1., metrics['travel_ratio'])
+        self.assertTrue(self.sfc.degenerate(metrics))
+
+    def test_ascertain_fitness(self):
+        paths = {
+            'good': write_gcode(GCODE),
+            'travel': write_gcode('G1 X100 Y100 F6000\nG1 X101 A.1\n'),
+        }
+        def slice_(model_path, profile):
+            if profile['name'] == 'broken':
+                raise subprocess.CalledProcessError(1, 'miracle_grue')
+            return {'output_path': paths[profile['name']]}
+        self.sfc._slice = mock.Mock(side_effect=slice_)
+        genotypes = [EvolveProfile.Genotype({}) for i in range(3)]
+        for genotype, name in zip(genotypes, ['good', 'travel', 'broken']):
+            genotype.profile = {'name': name}
+        on_batch = mock.Mock()
+        fitnesses = self.sfc.ascertain_fitness(genotypes, on_batch=on_batch)
+        metrics = EvolveProfile.slice_metrics(paths['good'])
+        self.assertEqual([-metrics['time'] / 60., -1000., -1000.], fitnesses)
+        on_batch.assert_called_once_with(genotypes, fitnesses)
+        model_path = self.sfc.racing_models()[0]
+        self.sfc._slice.assert_has_calls(
+            [mock.call(model_path, g.profile) for g in genotypes], any_order=True,
+        )
+        self.assertEqual(3, self.sfc._slice.call_count)
+
+    def test_missing_slicer(self):
+        self.sfc.check_call = mock.Mock(side_effect=OSError)
+        genotypes = [EvolveProfile.Genotype({})]
+        self.assertRaises(OSError, self.sfc.ascertain_fitness, genotypes)
+
+    def test_max_time(self):
+        metrics = EvolveProfile.slice_metrics(write_gcode(GCODE))
+        self.assertFalse(self.sfc.degenerate(metrics))
+        self.sfc.max_time = 1
+        self.assertTrue(self.sfc.degenerate(metrics))
+        self.assertEqual(-1000., self.sfc.score(metrics))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+import threading
+
+import EvolveProfile
+
+class TestSteadyStateGA(unittest.TestCase):
+
+    def setUp(self):
+        self.population_size = 10
+        self.profilemap = {
+            'a': ['r', 0, 100],
+            'b': ['l', 1, 2, 3],
+        }
+        self.ga = EvolveProfile.SteadyStateGeneticAlgorithm(self.profilemap, self.population_size, seed=1776)
+
+    def tearDown(self):
+        self.profilemap = None
+        self.ga = None
+
+    def evaluate(self, genotype):
+        return genotype.profile['a'] * genotype.profile['b']
+
+    def test_starting_members_evaluated_first(self):
+        starting = self.ga.population
+        self.assertEqual(self.population_size, len(starting))
+        for genotype in starting:
+            self.assertTrue(self.ga.next_child() is genotype)
+
+    def test_insert_keeps_fittest(self):
+        for i in range(self.population_size):
+            self.ga.insert(self.ga.next_child(), i)
+        self.ga.insert(self.ga.next_child(), 100)
+        fitnesses = [genotype.fitness for genotype in self.ga.population]
+        self.assertEqual([100] + list(range(9, 0, -1)), fitnesses)
+
+    def test_children_are_not_duplicates(self):
+        fingerprints = set()
+        for i in range(40):
+            child = self.ga.next_child()
+            self.assertFalse(child.fingerprint in fingerprints)
+            fingerprints.add(child.fingerprint)
+            self.ga.insert(child, self.evaluate(child))
+        self.assertEqual(self.ga.population[0].fitness, self.ga.hall_of_fame.best().fitness)
+
+    def test_run(self):
+        calls = []
+        def evaluate(genotype):
+            calls.append(threading.current_thread())
+            return self.evaluate(genotype)
+        best = self.ga.run(evaluate, 60, workers=4)
+        self.assertEqual(60, len(calls))
+        self.assertEqual(self.population_size, len(self.ga.population))
+        self.assertTrue(best is self.ga.population[0])
+        self.assertEqual(max(g.fitness for g in self.ga.population), best.fitness)
+
+    def test_run_reports_errors(self):
+        def evaluate(genotype):
+            raise ValueError('printer on fire')
+        with self.assertRaises(ValueError):
+            self.ga.run(evaluate, 5, workers=2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+import numpy
+import mock
+
+import EvolveProfile
+
+class TestGaussianProcess(unittest.TestCase):
+
+    def test_fit_and_predict(self):
+        features = numpy.linspace(0, 1, 9)[:, None]
+        fitnesses = numpy.sin(6 * features[:, 0])
+        process = EvolveProfile.GaussianProcess()
+        process.fit(features, fitnesses)
+        mean, std = process.predict(features)
+        self.assertTrue(numpy.allclose(fitnesses, mean, atol=.1))
+        between = numpy.linspace(1 / 16., 15 / 16., 8)[:, None]
+        mean, std = process.predict(between)
+        self.assertTrue(numpy.allclose(numpy.sin(6 * between[:, 0]), mean, atol=.1))
+        far_mean, far_std = process.predict(numpy.array([[5.]]))
+        self.assertTrue(far_std[0] > std.max())
+
+class TestSurrogate(unittest.TestCase):
+
+    def setUp(self):
+        self.profilemap = {
+            'x': ['r', 0.0, 1.0],
+            'y': ['l', 0, 1, 2],
+        }
+        self.schema = EvolveProfile.ProfileSchema(self.profilemap)
+        self.rng = EvolveProfile.RandomStream(1)
+        self.surrogate = EvolveProfile.Surrogate(self.schema)
+
+    def tearDown(self):
+        self.profilemap = None
+        self.surrogate = None
+
+    def genotypes(self, count):
+        population = EvolveProfile.Population(self.schema, rng=self.rng).randomize(count)
+        genotypes = population.to_genotypes(self.profilemap)
+        for genotype in genotypes:
+            genotype.fitness = self.fitness(genotype)
+        return genotypes
+
+    def fitness(self, genotype):
+        return -(genotype.profile['x'] - .7) ** 2 + genotype.profile['y']
+
+    def test_update(self):
+        genotypes = self.genotypes(10)
+        genotypes[0].fitness = None
+        genotypes[1].fitness = (1, 2)
+        self.surrogate.update(genotypes + genotypes)
+        self.assertEqual(8, len(self.surrogate))
+        self.assertTrue(self.surrogate.ready())
+
+    def test_screen_prefers_fit_children(self):
+        self.surrogate.kappa = 0
+        self.surrogate.update(self.genotypes(40))
+        candidates = self.genotypes(40)
+        chosen = self.surrogate.screen(candidates, 10)
+        self.assertEqual(10, len(chosen))
+        fitnesses = sorted((genotype.fitness for genotype in candidates), reverse=True)
+        self.assertTrue(numpy.mean([genotype.fitness for genotype in chosen]) >
+                        numpy.mean(fitnesses[10:]))
+
+    def test_screen_explores_unknown_children(self):
+        self.surrogate.kappa = 100
+        examples = [g for g in self.genotypes(40) if g.profile['y'] != 2]
+        self.surrogate.update(examples)
+        candidates = self.genotypes(40)
+        chosen = self.surrogate.screen(candidates, 5)
+        self.assertEqual([2] * 5, [genotype.profile['y'] for genotype in chosen])
+
+    def test_ga_screens_children(self):
+        ga = EvolveProfile.GeneticAlgorithm(self.profilemap, 10, seed=1776)
+        ga.surrogate = self.surrogate
+        ga.surrogate.model = mock.Mock(wraps=ga.surrogate.model)
+        for genotype in ga.population:
+            genotype.fitness = self.fitness(genotype)
+        ga.breed = mock.Mock(side_effect=self.genotypes)
+        ga.cull_population()
+        ga.generate_population()
+        self.assertEqual(10, len(ga.population))
+        self.assertEqual([5], [call[0][0] for call in ga.breed.call_args_list])
+        self.surrogate.update(self.genotypes(10))
+        ga.cull_population()
+        ga.generate_population()
+        self.assertEqual(10, len(ga.population))
+        self.assertEqual([5, 5 * ga.screening_factor], [call[0][0] for call in ga.breed.call_args_list])
+        self.assertEqual(1, ga.surrogate.model.fit.call_count)
+
+if __name__ == "__main__":
+    unittest.main()
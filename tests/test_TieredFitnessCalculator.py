@@ -0,0 +1,132 @@
+import os
+import sys
+lib_path = os.path.abspath('./')
+sys.path.insert(0, lib_path)
+
+import unittest
+import json
+import pickle
+import shutil
+import tempfile
+import mock
+
+import EvolveProfile
+
+class Tier(object):
+
+    def __init__(self, scores, rejected_fitness=None):
+        self.scores = scores
+        self.rejected_fitness = rejected_fitness
+        self.evaluated = []
+
+    def ascertain_fitness(self, genotypes, on_batch=None):
+        self.evaluated.append(list(genotypes))
+        fitnesses = [self.scores[g.profile['a']] for g in genotypes]
+        if on_batch is not None:
+            on_batch(genotypes, fitnesses)
+        return fitnesses
+
+class TestTieredFitnessCalculator(unittest.TestCase):
+
+    def setUp(self):
+        self.genotypes = [EvolveProfile.Genotype({}) for i in range(4)]
+        for i, genotype in enumerate(self.genotypes):
+            genotype.profile = {'a': i}
+        self.cheap = Tier([-1, -1000, -2, -1000], rejected_fitness=-1000)
+        self.dear = Tier([5, 6, 7, 8])
+        self.tiered = EvolveProfile.TieredFitnessCalculator([self.cheap, self.dear])
+
+    def tearDown(self):
+        self.tiered = None
+
+    def test_gates(self):
+        on_batch = mock.Mock()
+        fitnesses = self.tiered.ascertain_fitness(self.genotypes, on_batch=on_batch)
+        self.assertEqual([5, -1000, 7, -1000], fitnesses)
+        self.assertEqual([1, 0, 1, 0], [fitness.fidelity for fitness in fitnesses])
+        self.assertEqual([self.genotypes], self.cheap.evaluated)
+        self.assertEqual([[self.genotypes[0], self.genotypes[2]]], self.dear.evaluated)
+        self.assertEqual([
+            mock.call([self.genotypes[1], self.genotypes[3]], [-1000, -1000]),
+            mock.call([self.genotypes[0], self.genotypes[2]], [5, 7]),
+        ], on_batch.mock_calls)
+        self.assertEqual([1, 1], [f.fidelity for f in on_batch.mock_calls[1][1][1]])
+
+    def test_custom_gate(self):
+        tiered = EvolveProfile.TieredFitnessCalculator(
+            [self.cheap, self.dear], gates=[lambda fitness: fitness > -1.5],
+        )
+        fitnesses = tiered.ascertain_fitness(self.genotypes)
+        self.assertEqual([5, -1000, -2, -1000], fitnesses)
+        self.assertEqual([1, 0, 0, 0], [fitness.fidelity for fitness in fitnesses])
+
+    def test_everything_rejected(self):
+        self.cheap.scores = [-1000] * 4
+        self.assertEqual([-1000] * 4, self.tiered.ascertain_fitness(self.genotypes))
+        self.assertEqual([], self.dear.evaluated)
+
+    def test_fitness(self):
+        fitness = EvolveProfile.Fitness(2.5, 1)
+        self.assertEqual(2.5, fitness)
+        self.assertTrue(fitness > 2)
+        self.assertEqual(2.5, json.loads(json.dumps(fitness)))
+        copied = pickle.loads(pickle.dumps(fitness, 2))
+        self.assertEqual((2.5, 1), (copied, copied.fidelity))
+
+    def test_dump_fitness(self):
+        for fitness in [2.5, EvolveProfile.Fitness(2.5, 1), (1.5, 2), None]:
+            data = json.loads(json.dumps(EvolveProfile.dump_fitness(fitness)))
+            loaded = EvolveProfile.load_fitness(data)
+            self.assertEqual(fitness, loaded)
+            self.assertEqual(type(fitness), type(loaded))
+        self.assertEqual(1, EvolveProfile.load_fitness(
+            EvolveProfile.dump_fitness(EvolveProfile.Fitness(2.5, 1))
+        ).fidelity)
+
+    def test_fidelity_kept_by_cache_and_journal(self):
+        directory = tempfile.mkdtemp()
+        try:
+            genotype = EvolveProfile.Genotype({'a': ['r', 0, 3]}, {'a': 1})
+            genotype.fitness = EvolveProfile.Fitness(-1000, 0)
+            cache = EvolveProfile.FitnessCache(os.path.join(directory, 'fitness.db'))
+            cache.put(genotype)
+            self.assertEqual(0, cache.get(genotype).fidelity)
+            cache.close()
+            journal = EvolveProfile.Journal(os.path.join(directory, 'run.journal'), {'a': ['r', 0, 3]})
+            journal.record_population(0, [genotype], EvolveProfile.RandomStream(1))
+            generation, population, state, evaluated = journal.load()
+            self.assertEqual((-1000, 0), (population[0].fitness, population[0].fitness.fidelity))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_models_fingerprint(self):
+        model_dir = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'test_models')
+        physical = EvolveProfile.PhysicalFitnessCalculator(model_dir)
+        sliced = EvolveProfile.SliceFitnessCalculator(model_dir)
+        tiered = EvolveProfile.TieredFitnessCalculator([sliced, physical])
+        fingerprints = [physical.models_fingerprint(), sliced.models_fingerprint(), tiered.models_fingerprint()]
+        self.assertEqual(3, len(set(fingerprints)))
+        # Slice-only scores depend on the limits they were rejected on
+        sliced.max_time = 600
+        self.assertNotEqual(fingerprints[1], sliced.models_fingerprint())
+        self.assertNotEqual(fingerprints[2], tiered.models_fingerprint())
+        # Tiers without a fingerprint of their own still fingerprint by kind
+        self.assertEqual(
+            self.tiered.models_fingerprint(),
+            EvolveProfile.TieredFitnessCalculator([Tier([]), Tier([])]).models_fingerprint(),
+        )
+
+    def test_model_paths(self):
+        self.dear.model_paths = ['a.stl', 'b.stl']
+        self.assertEqual(['a.stl', 'b.stl'], self.tiered.model_paths)
+
+    def test_run(self):
+        profilemap = {'a': ['r', 0, 3]}
+        ga = EvolveProfile.GeneticAlgorithm(profilemap, 8, seed=1, fitness_calculator=self.tiered)
+        for generation in ga.evolve(max_generations=3):
+            pass
+        self.assertEqual(7, ga.hall_of_fame.best().fitness)
+        self.assertEqual(1, ga.hall_of_fame.best().fitness.fidelity)
+
+if __name__ == "__main__":
+    unittest.main()